@@ -12,6 +12,73 @@ import copy
 import zipfile
 from io import BytesIO
 
+
+class FeatherFrameReference:
+    """
+    A frame of the DataBundle, stored on disk in Arrow IPC (feather) format and not yet loaded.
+    The file is memory-mapped, so opening it and reading its metadata do not load the data.
+    Note that ``read`` converts the requested columns to pandas, which copies all their rows into memory:
+    the memory map saves the memory of the columns that are not requested, not of the rows.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self._table = None
+        self._loaded = None  # type: Optional[pd.DataFrame]
+
+    def _get_table(self):
+        if getattr(self, '_table', None) is None:
+            import pyarrow.feather as feather
+            self._table = feather.read_table(str(self.path), memory_map=True)
+        return self._table
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_table'] = None
+        state['_loaded'] = None
+        return state
+
+    def _read_metadata(self):
+        table = self._get_table()
+        return table.schema, table.num_rows
+
+    def get_index_columns(self) -> List[str]:
+        schema, _ = self._read_metadata()
+        metadata = schema.pandas_metadata
+        if metadata is None:
+            return []
+        return [c for c in metadata['index_columns'] if isinstance(c, str)]
+
+    def get_columns(self) -> List[str]:
+        schema, _ = self._read_metadata()
+        index_columns = set(self.get_index_columns())
+        return [c for c in schema.names if c not in index_columns]
+
+    def get_row_count(self) -> int:
+        _, row_count = self._read_metadata()
+        return row_count
+
+    def load_columns(self, columns: List[str]) -> pd.DataFrame:
+        """
+        Reads the given columns (those that exist in the file), adding them to the columns loaded by the previous calls.
+        Returns the frame of all the columns loaded so far.
+        """
+        loaded = getattr(self, '_loaded', None)
+        available = set(self.get_columns())
+        missing = [c for c in columns if c in available and (loaded is None or c not in loaded.columns)]
+        if loaded is None or len(missing) > 0:
+            df = self.read(missing)
+            loaded = df if loaded is None else pd.concat([loaded, df], axis=1)
+            self._loaded = loaded
+        return loaded
+
+    def read(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        table = self._get_table()
+        if columns is not None:
+            columns = list(columns) + [c for c in self.get_index_columns() if c not in columns]
+            table = table.select(columns)
+        return table.to_pandas()
+
+
 class DataBundle:
     def __init__(self, **frames: pd.DataFrame):
         self.data_frames = {}
@@ -26,15 +93,33 @@ class DataBundle:
         db.additional_information = copy.deepcopy(self.additional_information)
         return db
 
+    def _resolve(self, key):
+        value = self.data_frames[key]
+        if isinstance(value, FeatherFrameReference):
+            value = value.read()
+            self.data_frames[key] = value
+        return value
+
     def __getitem__(self, key):
-        return self.data_frames[key]
+        return self._resolve(key)
+
+    def load_columns(self, key, columns: List[str]) -> pd.DataFrame:
+        """
+        If the frame is not loaded yet, loads only the given columns of it (those that exist in the frame),
+        in addition to the columns loaded before, and returns the frame of these columns. The frame itself stays lazy,
+        so ``bundle[key]`` still returns all the columns. For the loaded frames, returns the frame.
+        """
+        value = self.data_frames[key]
+        if isinstance(value, FeatherFrameReference):
+            return value.load_columns(columns)
+        return value
 
     def __setitem__(self, key, value):
         self.data_frames[key] = value
 
     def __getattr__(self, key):
         try:
-            return self.data_frames[key]
+            return self._resolve(key)
         except KeyError:
             raise AttributeError(key)
 
@@ -48,6 +133,11 @@ class DataBundle:
         self.data_frames, self.additional_information = state
 
     def describe_dataframe(self, value, limits: Optional[int] = None):
+        if isinstance(value, FeatherFrameReference):
+            r = {}
+            r['shape'] = (value.get_row_count(), len(value.get_columns()))
+            r['lazy'] = True
+            return r
         if not isinstance(value, pd.DataFrame):
             return type(value).__name__
         r = {}
@@ -98,6 +188,13 @@ class DataBundle:
                  .to_list()
                  )
         data_frames = Query.en(files).to_dictionary(lambda z: z.name.split('.')[0], lambda z: pd.read_parquet(z))
+        feather_files = (Query
+                         .folder(path)
+                         .where(lambda z: z.name.endswith('.feather'))
+                         .to_list()
+                         )
+        for file in feather_files:
+            data_frames[file.name.split('.')[0]] = FeatherFrameReference(file)
         bundle = DataBundle(**data_frames)
 
         pkl_fname = str(path / 'add_info.pkl')
@@ -125,16 +222,32 @@ class DataBundle:
 
     def save_as_zip(self, fname):
         with zipfile.ZipFile(fname, 'w', zipfile.ZIP_DEFLATED) as file:
-            for name, data in self.data_frames.items():
+            for name in self.data_frames:
                 bytes = BytesIO()
-                data.to_parquet(bytes)
+                self[name].to_parquet(bytes)
                 file.writestr(name + '.parquet', bytes.getbuffer())
 
 
-    def save(self, folder: Union[str, Path]) -> None:
+    def save(self, folder: Union[str, Path], format: str = 'parquet') -> None:
+        """
+        Saves bundle to the folder.
+
+        Args:
+            folder: destination folder
+            format: `parquet` or `feather`. Feather files are stored uncompressed, and ``DataBundle.load``
+                memory-maps them lazily, loading each frame only when it is accessed.
+        """
         if isinstance(folder, str):
             folder = Path(folder)
+        if format not in ('parquet', 'feather'):
+            raise ValueError(f'`format` is expected to be `parquet` or `feather`, but was {format}')
         os.makedirs(folder, exist_ok=True)
-        for key, value in self.data_frames.items():
-            value.to_parquet(folder.joinpath(key + '.parquet'))
+        for key in self.data_frames:
+            value = self[key]
+            if format == 'parquet':
+                value.to_parquet(folder.joinpath(key + '.parquet'))
+            else:
+                import pyarrow as pa
+                import pyarrow.feather as feather
+                feather.write_feather(pa.Table.from_pandas(value), str(folder.joinpath(key + '.feather')), compression='uncompressed')
         FileIO.write_pickle(self.additional_information, folder / 'add_info.pkl')
@@ -1,5 +1,6 @@
 from .arch import DataSource, CacheableDataSource, MockDfDataSource, CacheMode, AbstractCacheDataSource
 from .zip_file_cache import ZippedFileDataSource
+from .parquet_file_cache import ParquetFileDataSource
 from .sql_wrapper import SqlShardedDataSource, IntFieldShardedJob, UpdateDataSource, DayShardedSource
 from ..._common import Loc
 from .df_source import DataFrameSource, InMemoryDataFrameSource, LambdaDataFrameSource, DataFrameSourceOverDataSource, DataBundleSourceLoader
@@ -0,0 +1,315 @@
+from typing import *
+
+import pickle
+import shutil
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pathlib import Path
+from yo_fluq_ds import agg, Queryable
+
+from .arch import AbstractCacheDataSource
+
+
+_PICKLED_COLUMNS_KEY = b'tg_pickled_columns'
+_MAX_EXACT_FLOAT_INT = 2 ** 53
+
+
+class ParquetFileDataSource(AbstractCacheDataSource):
+    """
+    File cache in .parquet format. Records must be dictionaries. They are buffered into chunks (1000 records in each),
+    and each chunk is stored as a compressed row group of a single parquet file.
+
+    The schema is inferred from the first chunk. The fields that cannot be represented with a flat arrow type
+    (nested dicts and lists, arbitrary objects, or fields that are None in the whole first chunk) are stored as pickled
+    binary columns, and unpickled on reading. If the record misses some field of the schema, it is read back as None.
+
+    If the later chunk does not fit the schema, the schema is widened: new fields are added (None in the earlier records),
+    integer fields are promoted to float if all their values are exactly representable as floats, and the fields
+    with incompatible values become pickled. As the parquet file has a single schema, the already written chunks
+    are then rewritten, so the changes of the schema should be rare.
+
+    Compared to ZippedFileDataSource, reading is much faster, as the flat fields are not unpickled,
+    and the chunks can be accessed randomly and returned as dataframes.
+    """
+
+    def __init__(self, path, buffer_size=1000, compression='snappy'):
+        path = str(path)
+        self.path = path
+        self.buffer_size = buffer_size
+        self.compression = compression
+
+    def cache_from(self, src: Queryable, cnt=None) -> None:
+        """
+        Caches data from a given queryable (for instance, from one produced by DataSource::get_data).
+        Args:
+            src: Queryable to cache from
+            cnt: amount of objects to cache
+
+        Returns:
+
+        """
+        q = src
+        if cnt is not None:
+            q = q.take(cnt)
+        full_path = str(self.path)
+        os.makedirs(Path(full_path).parent.__str__(), exist_ok=True)
+        tmp_path = full_path + '.tmp'
+        q.feed(_ToParquetBuffered(tmp_path, buffer_size=self.buffer_size, compression=self.compression))
+        if os.path.isfile(full_path):
+            os.remove(full_path)
+        shutil.move(tmp_path, full_path)
+
+    def is_available(self):
+        return os.path.isfile(self.path)
+
+    def _get_pickled_columns(self, file: pq.ParquetFile) -> List[str]:
+        metadata = file.schema_arrow.metadata or {}
+        if _PICKLED_COLUMNS_KEY not in metadata:
+            return []
+        return [c for c in metadata[_PICKLED_COLUMNS_KEY].decode('utf-8').split(',') if c != '']
+
+    def _read_chunk(self, file: pq.ParquetFile, pickled_columns: List[str], index: int, as_dataframe: bool):
+        table = file.read_row_group(index)
+        if as_dataframe:
+            df = table.to_pandas()
+            for column in pickled_columns:
+                df[column] = [pickle.loads(v) for v in df[column]]
+            return df
+        columns = {}
+        for name in table.column_names:
+            values = table.column(name).to_pylist()
+            if name in pickled_columns:
+                values = [pickle.loads(v) for v in values]
+            columns[name] = values
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+    def get_chunk_count(self) -> int:
+        return pq.ParquetFile(self.path).num_row_groups
+
+    def get_chunk(self, index: int, as_dataframe: bool = False) -> Union[List[Dict], pd.DataFrame]:
+        """
+        Reads one chunk of the cache, as the list of records or as a dataframe
+        """
+        file = pq.ParquetFile(self.path)
+        if index < 0 or index >= file.num_row_groups:
+            raise ValueError(f'Chunk {index} is out of range, the cache has {file.num_row_groups} chunks')
+        return self._read_chunk(file, self._get_pickled_columns(file), index, as_dataframe)
+
+    def _get_chunks_iter(self, as_dataframe: bool):
+        file = pq.ParquetFile(self.path)
+        pickled_columns = self._get_pickled_columns(file)
+        for index in range(file.num_row_groups):
+            yield self._read_chunk(file, pickled_columns, index, as_dataframe)
+
+    def _get_data_iter(self):
+        for chunk in self._get_chunks_iter(False):
+            for element in chunk:
+                yield element
+
+    def get_data(self) -> Queryable:
+        length = pq.ParquetFile(self.path).metadata.num_rows
+        return Queryable(self._get_data_iter(), length)
+
+    def get_data_frames(self) -> Queryable:
+        """
+        Returns the cache chunk-by-chunk, each chunk as a dataframe
+        """
+        return Queryable(self._get_chunks_iter(True), self.get_chunk_count())
+
+
+class _ToParquetBuffered(agg.PushQueryElement):
+    def __init__(self, filename: Union[str, Path], buffer_size=1000, compression='snappy'):
+        self.filename = str(filename)
+        self.buffer_size = buffer_size
+        self.compression = compression
+
+    def on_enter(self, instance):
+        if os.path.isfile(self.filename):
+            os.remove(self.filename)
+        instance.writer = None
+        instance.schema = None
+        instance.pickled_columns = None
+        instance.max_abs_ints = {}
+        instance.buffer = []
+
+    @staticmethod
+    def _infer_type(values: List) -> Optional[pa.DataType]:
+        """
+        Returns the flat arrow type of the values, or None if the values must be stored pickled
+        """
+        try:
+            arrow_type = pa.array(values).type
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            return None
+        if pa.types.is_nested(arrow_type) or pa.types.is_null(arrow_type):
+            return None
+        return arrow_type
+
+    @staticmethod
+    def _max_abs_int(values: List) -> int:
+        return max((abs(v) for v in values if isinstance(v, int) and not isinstance(v, bool)), default=0)
+
+    @staticmethod
+    def _promote_type(old_type: pa.DataType, values: List, old_max_abs_int: int = 0) -> Optional[pa.DataType]:
+        """
+        Returns the type that holds both the values of ``old_type`` and the given values,
+        or None if the values must be stored pickled. ``old_max_abs_int`` is the maximal absolute value
+        of the integers already written in the field.
+        """
+        if all(v is None for v in values):
+            return old_type
+        new_type = _ToParquetBuffered._infer_type(values)
+        if new_type is None:
+            return None
+        if new_type == old_type:
+            return old_type
+        if pa.types.is_integer(old_type) and pa.types.is_integer(new_type):
+            return pa.int64()
+        numeric = lambda t: pa.types.is_integer(t) or pa.types.is_floating(t)
+        if numeric(old_type) and numeric(new_type):
+            # Integers are promoted to float only if they are represented exactly
+            if max(old_max_abs_int, _ToParquetBuffered._max_abs_int(values)) > _MAX_EXACT_FLOAT_INT:
+                return None
+            return pa.float64()
+        if numeric(old_type) or numeric(new_type) or pa.types.is_boolean(old_type) or pa.types.is_boolean(new_type):
+            # arrow converts between these types silently, e.g. truncating floats, so the conversion is not tried
+            return None
+        try:
+            pa.array(values, type=old_type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, OverflowError):
+            return None
+        return old_type
+
+    def _create_schema(self, fields: List[pa.Field], pickled_columns: List[str]) -> pa.Schema:
+        return pa.schema(fields, metadata={_PICKLED_COLUMNS_KEY: ','.join(pickled_columns).encode('utf-8')})
+
+    def _get_names(self, instance) -> List[str]:
+        names = []
+        for record in instance.buffer:
+            for name in record:
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def _infer_schema(self, instance):
+        fields = []
+        pickled_columns = []
+        for name in self._get_names(instance):
+            arrow_type = self._infer_type([record.get(name) for record in instance.buffer])
+            if arrow_type is None:
+                arrow_type = pa.binary()
+                pickled_columns.append(name)
+            fields.append(pa.field(name, arrow_type))
+        instance.pickled_columns = set(pickled_columns)
+        instance.schema = self._create_schema(fields, pickled_columns)
+
+    def _widen_schema(self, instance) -> bool:
+        """
+        Adapts the schema to the buffer: the new fields are appended, numeric types are promoted,
+        and the fields with incompatible values are turned into pickled ones.
+        Returns True if the schema has changed.
+        """
+        fields = []
+        pickled_columns = [name for name in instance.schema.names if name in instance.pickled_columns]
+        changed = False
+        for field in instance.schema:
+            if field.name not in instance.pickled_columns:
+                arrow_type = self._promote_type(
+                    field.type,
+                    [record.get(field.name) for record in instance.buffer],
+                    instance.max_abs_ints.get(field.name, 0)
+                )
+                if arrow_type is None:
+                    arrow_type = pa.binary()
+                    pickled_columns.append(field.name)
+                if arrow_type != field.type:
+                    field = pa.field(field.name, arrow_type)
+                    changed = True
+            fields.append(field)
+        for name in self._get_names(instance):
+            if instance.schema.get_field_index(name) >= 0:
+                continue
+            arrow_type = self._infer_type([record.get(name) for record in instance.buffer])
+            if arrow_type is None:
+                arrow_type = pa.binary()
+                pickled_columns.append(name)
+            fields.append(pa.field(name, arrow_type))
+            changed = True
+        if changed:
+            instance.pickled_columns = set(pickled_columns)
+            instance.schema = self._create_schema(fields, pickled_columns)
+        return changed
+
+    def _convert_table(self, table: pa.Table, old_pickled_columns: Set[str], instance) -> pa.Table:
+        arrays = []
+        for field in instance.schema:
+            if field.name not in table.column_names:
+                if field.name in instance.pickled_columns:
+                    arrays.append(pa.array([pickle.dumps(None)] * table.num_rows, type=field.type))
+                else:
+                    arrays.append(pa.nulls(table.num_rows, type=field.type))
+                continue
+            column = table.column(field.name)
+            if field.name in instance.pickled_columns and field.name not in old_pickled_columns:
+                arrays.append(pa.array([pickle.dumps(v) for v in column.to_pylist()], type=field.type))
+            else:
+                arrays.append(column.cast(field.type))
+        return pa.Table.from_arrays(arrays, schema=instance.schema)
+
+    def _rewrite(self, instance, old_pickled_columns: Set[str]):
+        """
+        Rewrites the already written chunks with the current schema, as the parquet file has a single schema
+        """
+        instance.writer.close()
+        old_filename = self.filename + '.old'
+        shutil.move(self.filename, old_filename)
+        old_file = pq.ParquetFile(old_filename)
+        instance.writer = pq.ParquetWriter(self.filename, instance.schema, compression=self.compression)
+        for index in range(old_file.num_row_groups):
+            table = old_file.read_row_group(index)
+            instance.writer.write_table(self._convert_table(table, old_pickled_columns, instance))
+        os.remove(old_filename)
+
+    def _flush(self, instance):
+        if len(instance.buffer) == 0:
+            return
+        if instance.schema is None:
+            self._infer_schema(instance)
+            instance.writer = pq.ParquetWriter(self.filename, instance.schema, compression=self.compression)
+        else:
+            old_pickled_columns = instance.pickled_columns
+            if self._widen_schema(instance):
+                self._rewrite(instance, old_pickled_columns)
+        arrays = []
+        for field in instance.schema:
+            values = [record.get(field.name) for record in instance.buffer]
+            if field.name in instance.pickled_columns:
+                values = [pickle.dumps(v) for v in values]
+            elif pa.types.is_integer(field.type):
+                instance.max_abs_ints[field.name] = max(instance.max_abs_ints.get(field.name, 0), self._max_abs_int(values))
+            arrays.append(pa.array(values, type=field.type))
+        instance.writer.write_table(pa.Table.from_arrays(arrays, schema=instance.schema))
+        instance.buffer = []
+
+    def on_process(self, instance, element):
+        if not isinstance(element, dict):
+            raise ValueError(f'Only dictionaries can be cached in parquet, but was {type(element)}')
+        instance.buffer.append(element)
+        if len(instance.buffer) >= self.buffer_size:
+            self._flush(instance)
+
+    def on_report(self, instance):
+        return None
+
+    def on_exit(self, instance, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self._flush(instance)
+            if instance.writer is None:
+                self._infer_schema(instance)
+                instance.writer = pq.ParquetWriter(self.filename, instance.schema, compression=self.compression)
+        if instance.writer is not None:
+            instance.writer.close()
@@ -1,9 +1,15 @@
 from typing import *
 
 import datetime
+import hashlib
+import os
+import shutil
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import timedelta
-from yo_fluq_ds import Query, fluq
+from pathlib import Path
+from yo_fluq_ds import Query, fluq, FileIO
 
 from .arch import DataSource
 from ..._common import Logger
@@ -21,12 +27,27 @@ class SqlShardedDataSource(DataSource):
 
     It is unknown if sharding reduces the overall time of the query.
 
+    The following fields may be set after construction to speed up and secure the download:
+      * ``max_parallel_shards``: if greater than 1, this amount of shards is downloaded concurrently
+      * ``ordered``: if False, the shards are returned in the order of completion, otherwise in the order of ``get_splits``
+      * ``retry_count``: how many times a failed shard is retried before the error is raised
+      * ``checkpoint_folder`` and ``checkpoint_run_id``: if set, each completed shard is stored in the subfolder
+        ``checkpoint_run_id`` of ``checkpoint_folder``. Resuming is opt-in per run: if the download of a shard fails,
+        the completed shards are kept, and the next run with the same ``checkpoint_run_id`` reads them instead of
+        querying them again. The checkpoints are removed when all the data are read, and also when the reading is
+        stopped by the consumer, as the shards of an incomplete read must not be served to another run.
+
     """
 
     def __init__(self, query_template: str, downloader_factory: Callable[[str], DataSource]):
         self.query_template = query_template
         self.downloader_factory = downloader_factory
         self.with_progress_bar = False
+        self.max_parallel_shards = 1
+        self.ordered = True
+        self.retry_count = 0
+        self.checkpoint_folder = None  # type: Optional[Union[str, Path]]
+        self.checkpoint_run_id = None  # type: Optional[str]
 
     def get_splits(self, query_template) -> List[str]:
         """
@@ -34,13 +55,97 @@ class SqlShardedDataSource(DataSource):
         """
         raise NotImplementedError()
 
+    def _get_checkpoint_run_folder(self) -> Optional[Path]:
+        if self.checkpoint_folder is None:
+            return None
+        run_id = getattr(self, 'checkpoint_run_id', None)
+        if run_id is None:
+            raise ValueError('`checkpoint_run_id` must be set when `checkpoint_folder` is set')
+        return Path(self.checkpoint_folder) / str(run_id)
+
+    def _get_checkpoint_path(self, index: int, query: str) -> Optional[Path]:
+        folder = self._get_checkpoint_run_folder()
+        if folder is None:
+            return None
+        query_hash = hashlib.md5(query.encode('utf-8')).hexdigest()
+        return folder / f'{index}_{query_hash}.pkl'
+
+    def _remove_checkpoints(self, splits: List[str]):
+        folder = self._get_checkpoint_run_folder()
+        if folder is None:
+            return
+        for index, query in enumerate(splits):
+            checkpoint_path = self._get_checkpoint_path(index, query)
+            if os.path.isfile(checkpoint_path):
+                os.remove(checkpoint_path)
+        if os.path.isdir(folder) and len(os.listdir(folder)) == 0:
+            os.rmdir(folder)
+
+    def _download_shard(self, index: int, query: str) -> List:
+        checkpoint_path = self._get_checkpoint_path(index, query)
+        if checkpoint_path is not None and os.path.isfile(checkpoint_path):
+            Logger.info(f'Shard {index} is read from checkpoint')
+            return FileIO.read_pickle(checkpoint_path)
+        for attempt in range(self.retry_count + 1):
+            try:
+                records = list(self.downloader_factory(query).get_data())
+                break
+            except Exception:
+                if attempt == self.retry_count:
+                    raise
+                Logger.warning(f'Shard {index} has failed, retrying', attempt=attempt)
+        if checkpoint_path is not None:
+            os.makedirs(checkpoint_path.parent, exist_ok=True)
+            tmp_path = str(checkpoint_path) + '.tmp'
+            FileIO.write_pickle(records, tmp_path)
+            shutil.move(tmp_path, checkpoint_path)
+        return records
+
+    def _get_shards_iter(self, splits: List[str]):
+        try:
+            for records in self._download_shards_iter(splits):
+                yield records
+        except GeneratorExit:
+            self._remove_checkpoints(splits)
+            raise
+        self._remove_checkpoints(splits)
+
+    def _download_shards_iter(self, splits: List[str]):
+        if self.max_parallel_shards <= 1:
+            for index, query in enumerate(splits):
+                yield self._download_shard(index, query)
+        else:
+            executor = ThreadPoolExecutor(max_workers=self.max_parallel_shards)
+            try:
+                pending = deque(enumerate(splits))
+                in_flight = deque()
+                while len(pending) > 0 or len(in_flight) > 0:
+                    while len(pending) > 0 and len(in_flight) < self.max_parallel_shards:
+                        index, query = pending.popleft()
+                        in_flight.append(executor.submit(self._download_shard, index, query))
+                    if self.ordered:
+                        future = in_flight.popleft()
+                    else:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        future = next(iter(done))
+                        in_flight.remove(future)
+                    yield future.result()
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
     def get_data(self):
         splits = list(self.get_splits(self.query_template))
-        query = Query.en(splits)
+        if self.max_parallel_shards <= 1 and self.retry_count == 0 and self.checkpoint_folder is None:
+            query = Query.en(splits)
+            if self.with_progress_bar:
+                query = query.feed(fluq.with_progress_bar())
+            query = query.select_many(lambda z: self.downloader_factory(z).get_data())
+            return query
+        self._get_checkpoint_run_folder()
+        query = Query.en(self._get_shards_iter(splits))
         if self.with_progress_bar:
-            query = query.feed(fluq.with_progress_bar())
-        query = query.select_many(lambda z: self.downloader_factory(z).get_data())
-        return query
+            query = query.feed(fluq.with_progress_bar(total=len(splits)))
+        return query.select_many(lambda z: z)
 
 
 class IntFieldShardedJob(SqlShardedDataSource):
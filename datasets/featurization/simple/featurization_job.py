@@ -1,7 +1,10 @@
 from typing import *
 
+import multiprocessing
 import os
+import queue
 import shutil
+import traceback
 import uuid
 
 from pathlib import Path
@@ -11,6 +14,39 @@ from ...._common import Loc, FileSyncer, Logger
 from ...access import DataSource, CacheableDataSource
 
 
+def _collect_to_location(location: Path, df, name):
+    df_uid = str(uuid.uuid4())
+    file_path = location.joinpath(f"{name}/{df_uid}.parquet")
+    os.makedirs(file_path.parent, exist_ok=True)
+    df.to_parquet(file_path)
+
+
+def _featurization_worker(worker_index: int, location: Path, featurizers: Dict[str, StreamFeaturizer], input_queue, output_queue):
+    try:
+        for featurizer in featurizers.values():
+            featurizer.start()
+        while True:
+            chunk = input_queue.get()
+            if chunk is None:
+                break
+            for item in chunk:
+                for name, featurizer in featurizers.items():
+                    df = featurizer.observe_data_point(item)
+                    if df is not None:
+                        _collect_to_location(location, df, name)
+        reducers = {}
+        for name, featurizer in featurizers.items():
+            if featurizer.is_reducer():
+                reducers[name] = featurizer
+            else:
+                df = featurizer.finish()
+                if df is not None:
+                    _collect_to_location(location, df, name)
+        output_queue.put((worker_index, 'done', reducers))
+    except:
+        output_queue.put((worker_index, 'error', traceback.format_exc()))
+
+
 class FeaturizationJob:
     def __init__(self,
                  name: str,
@@ -20,8 +56,16 @@ class FeaturizationJob:
                  syncer: Optional[FileSyncer],
                  location: Optional[Union[str, Path]] = None,
                  status_report_frequency: Optional[int] = None,
-                 count_of_data_objects: Optional[int] = None
+                 count_of_data_objects: Optional[int] = None,
+                 process_count: Optional[int] = None,
+                 records_per_chunk: int = 1000
                  ):
+        """
+        Args:
+            process_count: if greater than 1, the records are distributed in chunks of ``records_per_chunk`` between
+                this amount of worker processes, each having its own copy of featurizers and writing its own parquet files.
+                See ``StreamFeaturizer.is_reducer`` for how the featurizers are finalized in this case.
+        """
         self.name = name
         self.version = version
         self.source = source
@@ -39,20 +83,138 @@ class FeaturizationJob:
 
         self.status_report_frequency = status_report_frequency
         self.count_of_data_objects = count_of_data_objects
+        self.process_count = process_count
+        self.records_per_chunk = records_per_chunk
 
     def get_name_and_version(self):
         return self.name, self.version
 
     def _collect(self, df, name):
-        df_uid = str(uuid.uuid4())
-        file_path = self.location.joinpath(f"{name}/{df_uid}.parquet")
-        os.makedirs(file_path.parent, exist_ok=True)
-        df.to_parquet(file_path)
+        _collect_to_location(self.location, df, name)
 
     def _send(self):
         if self.syncer is not None:
             self.syncer.upload_folder('')
 
+    def _report_status(self, index):
+        if self.status_report_frequency is not None and (index + 1) % self.status_report_frequency == 0:
+            Logger.info(f"{index+1} data objects are processed")
+
+    def _run_serial(self, flow):
+        for featurizer in self.featurizers.values():
+            featurizer.start()
+
+        for index, item in enumerate(flow):
+            self.records_processed_ += 1
+            for name, featurizer in self.featurizers.items():
+                df = featurizer.observe_data_point(item)
+                if df is not None:
+                    self._collect(df, name)
+            self._report_status(index)
+
+        Logger.info(f"Data fetched, finalizing")
+        for name, featurizer in self.featurizers.items():
+            df = featurizer.finish()
+            if df is not None:
+                self._collect(df, name)
+
+    @staticmethod
+    def _store_worker_result(results: Dict[int, Any], message):
+        worker_index, status, payload = message
+        if status == 'error':
+            raise ValueError(f'Error in featurization worker:\n{payload}')
+        results[worker_index] = payload
+
+    def _drain_worker_results(self, output_queue, results: Dict[int, Any], timeout: Optional[float] = None):
+        while True:
+            try:
+                if timeout is None:
+                    message = output_queue.get_nowait()
+                else:
+                    message = output_queue.get(timeout=timeout)
+            except queue.Empty:
+                return
+            self._store_worker_result(results, message)
+
+    def _check_workers(self, output_queue, workers, results: Dict[int, Any]):
+        """
+        Re-raises the error sent by a worker, or raises if a worker has exited without sending its result
+        """
+        self._drain_worker_results(output_queue, results)
+        for index, worker in enumerate(workers):
+            if index in results or worker.is_alive():
+                continue
+            # The result may still be on its way through the queue
+            self._drain_worker_results(output_queue, results, timeout=1)
+            if index not in results:
+                raise ValueError(f'Featurization worker {index} has terminated unexpectedly with exit code {worker.exitcode}')
+
+    def _put_to_workers(self, input_queue, output_queue, chunk, workers, results: Dict[int, Any]):
+        while True:
+            try:
+                input_queue.put(chunk, timeout=1)
+                return
+            except queue.Full:
+                self._check_workers(output_queue, workers, results)
+
+    def _get_worker_results(self, output_queue, workers, results: Dict[int, Any]) -> List[Any]:
+        while len(results) < len(workers):
+            try:
+                self._store_worker_result(results, output_queue.get(timeout=1))
+            except queue.Empty:
+                self._check_workers(output_queue, workers, results)
+        return [results[index] for index in range(len(workers))]
+
+    def _run_parallel(self, flow):
+        input_queue = multiprocessing.Queue(maxsize=2 * self.process_count)
+        output_queue = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(
+                target=_featurization_worker,
+                args=(index, self.location, self.featurizers, input_queue, output_queue),
+                daemon=True
+            )
+            for index in range(self.process_count)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            # The results drained while putting the chunks are kept, as a finished worker sends its result only once
+            results = {}
+            chunk = []
+            for index, item in enumerate(flow):
+                self.records_processed_ += 1
+                chunk.append(item)
+                if len(chunk) >= self.records_per_chunk:
+                    self._put_to_workers(input_queue, output_queue, chunk, workers, results)
+                    chunk = []
+                self._report_status(index)
+            if len(chunk) > 0:
+                self._put_to_workers(input_queue, output_queue, chunk, workers, results)
+            for _ in workers:
+                self._put_to_workers(input_queue, output_queue, None, workers, results)
+
+            Logger.info(f"Data fetched, finalizing")
+            reducer_states = self._get_worker_results(output_queue, workers, results)
+            for index, worker in enumerate(workers):
+                worker.join()
+                if worker.exitcode != 0:
+                    raise ValueError(f'Featurization worker {index} has terminated with exit code {worker.exitcode}')
+        finally:
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+
+        for name, featurizer in self.featurizers.items():
+            if not featurizer.is_reducer():
+                continue
+            featurizer.start()
+            for states in reducer_states:
+                featurizer.merge(states[name])
+            df = featurizer.finish()
+            if df is not None:
+                self._collect(df, name)
+
     def run(self, cache=None):
         Logger.info(f"Featurization Job {self.name} at version {self.version} has started")
         if os.path.exists(self.location):
@@ -70,27 +232,14 @@ class FeaturizationJob:
         if self.count_of_data_objects is not None:
             flow = flow.take(self.count_of_data_objects)
 
-        for featurizer in self.featurizers.values():
-            featurizer.start()
-
         Logger.info(f"Fetching data")
 
         self.records_processed_ = 0
 
-        for index, item in enumerate(flow):
-            self.records_processed_ += 1
-            for name, featurizer in self.featurizers.items():
-                df = featurizer.observe_data_point(item)
-                if df is not None:
-                    self._collect(df, name)
-            if self.status_report_frequency is not None and (index + 1) % self.status_report_frequency == 0:
-                Logger.info(f"{index+1} data objects are processed")
-
-        Logger.info(f"Data fetched, finalizing")
-        for name, featurizer in self.featurizers.items():
-            df = featurizer.finish()
-            if df is not None:
-                self._collect(df, name)
+        if self.process_count is not None and self.process_count > 1:
+            self._run_parallel(flow)
+        else:
+            self._run_serial(flow)
 
         Logger.info(f"Uploading data")
         self._send()
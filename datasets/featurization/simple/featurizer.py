@@ -6,6 +6,8 @@ from collections import Counter, defaultdict
 
 from yo_fluq_ds import Query
 
+from ...selectors import CombinedSelector
+
 
 # helper method needed to pickel defauldict
 def dc():
@@ -22,6 +24,22 @@ class StreamFeaturizer:
     def finish(self) -> Optional[pd.DataFrame]:
         raise NotImplementedError()
 
+    def is_reducer(self) -> bool:
+        """
+        Reducers accumulate a state over the whole stream and produce the output only in ``finish``.
+        When ``FeaturizationJob`` runs in several processes, reducers are not finished in the workers:
+        instead, their states are merged with ``merge`` in the main process, and then ``finish`` is called once.
+        Other featurizers are finished in each worker independently.
+        """
+        return False
+
+    def merge(self, other: 'StreamFeaturizer') -> None:
+        """
+        Absorbs the state of ``other``, which is the copy of this featurizer that has observed another part of the stream.
+        Must be implemented by reducers.
+        """
+        raise NotImplementedError()
+
 
 class DataframeFeaturizer(StreamFeaturizer):
     def __init__(self, buffer_size: Optional[int] = None, row_selector: Optional[Callable] = None):
@@ -42,14 +60,28 @@ class DataframeFeaturizer(StreamFeaturizer):
     def _validate(self):
         pass
 
+    def _selects_many(self) -> bool:
+        # When the rows are produced by CombinedSelector, the items are buffered as they are,
+        # and the selector is applied to the whole buffer at once
+        return (
+                isinstance(self.row_selector, CombinedSelector)
+                and type(self)._featurize is DataframeFeaturizer._featurize
+        )
+
     def observe_data_point(self, item) -> Optional[pd.DataFrame]:
-        rows = self._featurize(item)
-        self.buffer.extend(rows)
+        if self._selects_many():
+            self.buffer.append(item)
+        else:
+            rows = self._featurize(item)
+            self.buffer.extend(rows)
         if self.buffer_size is not None and len(self.buffer) >= self.buffer_size:
             return self._flush()
 
     def _flush(self) -> pd.DataFrame:
-        df = pd.DataFrame(self.buffer)
+        if self._selects_many():
+            df = self.row_selector.select_many(self.buffer)
+        else:
+            df = pd.DataFrame(self.buffer)
         df = self._postprocess(df)
         self.buffer = []
         return df
@@ -96,5 +128,14 @@ class AggegatedStatsFeaturizer(StreamFeaturizer):
         # # extract counts for given item
         self._extract_counts(row)
 
+    def is_reducer(self) -> bool:
+        return True
+
+    def merge(self, other: 'AggegatedStatsFeaturizer') -> None:
+        for aggregation_level in self.aggregation_levels:
+            for key, counters in other.stats[aggregation_level].items():
+                for field, counter in counters.items():
+                    self.stats[aggregation_level][key][field].update(counter)
+
     def finish(self):
         raise NotImplementedError()
@@ -1,5 +1,7 @@
 from typing import *
 
+import pandas as pd
+
 
 def _get_selector_name(selector) -> Optional[str]:
     if isinstance(selector, str):
@@ -171,6 +173,14 @@ class SelectorException(Exception):
             return 'FAILED TO PRODUCE MESSAGE FOR FEATURIZATION CALLSTACK'
 
 
+class _TracingRequired(Exception):
+    """
+    Raised by compiled selectors when the situation requires the selection context (e.g. a warning must be logged with the code path),
+    so the call must be repeated in the traced mode
+    """
+    pass
+
+
 class CombinedSelector:
     """
     Abstract class for the selector, that enables the compositions of other selectors and traces errors in their structure
@@ -213,6 +223,45 @@ class CombinedSelector:
         """
         raise NotImplementedError()
 
+    def compile(self) -> Callable[[Any], Any]:
+        """
+        Flattens the selector's tree into a function that does not create selection contexts, call stacks and data paths.
+        If an error occurs, or the selectors require the context (e.g., to log a warning about a missing field),
+        the object is processed again by the original selector, so the errors and warnings are exactly the same as without compilation.
+
+        Returns: the function that takes an object and returns the result of selection
+        """
+        compiled = self._compile()
+
+        def _call(obj):
+            try:
+                return compiled(obj)
+            except Exception:
+                return self(obj)
+
+        return _call
+
+    def select_many(self, objects: Iterable[Any]) -> pd.DataFrame:
+        """
+        Applies the selector to each object and returns the results (which must be dictionaries) as a dataframe,
+        one row per object.
+        """
+        compiled = self.compile()
+        return pd.DataFrame([compiled(obj) for obj in objects])
+
+    def _compile(self) -> Callable[[Any], Any]:
+        """
+        May be overriden by descendants to provide a fast function without tracing.
+        The function may raise any exception, in which case the call is repeated in the traced mode.
+        """
+        return lambda obj: self(obj)
+
+    @staticmethod
+    def _compile_selector(selector: Callable) -> Callable[[Any], Any]:
+        if isinstance(selector, CombinedSelector):
+            return selector._compile()
+        return selector
+
     def _further_call(self, obj: Any, context: SelectionContext, selector: Callable):
         """
         Must be called by descendants.
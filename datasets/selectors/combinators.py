@@ -1,6 +1,6 @@
 from typing import *
 
-from .architecture import CombinedSelector, SelectionContext, SelectorException
+from .architecture import CombinedSelector, SelectionContext, SelectorException, _TracingRequired
 from .architecture import _get_selector_name
 from ..._common import Logger
 
@@ -57,6 +57,16 @@ class Pipeline(AbstractPipeline):
     def get_structure(self):
         return {key: value for key, value in self.selectors}
 
+    def _compile(self):
+        compiled = [CombinedSelector._compile_selector(selector) for _, selector in self.selectors]
+
+        def _call(obj):
+            for selector in compiled:
+                obj = selector(obj)
+            return obj
+
+        return _call
+
 
 class MergeException(Exception):
     """
@@ -138,6 +148,27 @@ class Ensemble(AbstractEnsemble):
             result[key] = selector
         return result
 
+    def _compile(self):
+        unnamed = [CombinedSelector._compile_selector(selector) for selector in self.selectors]
+        named = [(key, CombinedSelector._compile_selector(selector)) for key, selector in self.named_selectors.items()]
+
+        def _call(obj):
+            result = {}
+            for selector in unnamed:
+                res = selector(obj)
+                for key in res:
+                    if key in result:
+                        raise _TracingRequired()
+                    result[key] = res[key]
+            for key, selector in named:
+                res = selector(obj)
+                if key in result:
+                    raise _TracingRequired()
+                result[key] = res
+            return result
+
+        return _call
+
 
 class FieldGetter(CombinedSelector):
     """
@@ -175,6 +206,32 @@ class FieldGetter(CombinedSelector):
                            )
             return None
 
+    def _compile(self):
+        field = self.field
+        if not self.none_propagation:
+            def _call(obj):
+                try:
+                    return obj[field]
+                except:
+                    return getattr(obj, field)
+            return _call
+
+        def _call_with_none_propagation(obj):
+            if isinstance(obj, dict) and field in obj:
+                return obj[field]
+            if isinstance(obj, list) or isinstance(obj, tuple):
+                try:
+                    index = int(field)
+                except:
+                    return None
+                if 0 <= index < len(obj):
+                    return obj[index]
+            if hasattr(obj, field):
+                return getattr(obj, field)
+            raise _TracingRequired()
+
+        return _call_with_none_propagation
+
     def __repr__(self):
         return self.name
 
@@ -202,6 +259,18 @@ class FunctionFeed(CombinedSelector):
                 return None
         return self.callable(obj)
 
+    def _compile(self):
+        callable = self.callable
+        if not self.none_propagation:
+            return callable
+
+        def _call(obj):
+            if obj is None:
+                raise _TracingRequired()
+            return callable(obj)
+
+        return _call
+
     def __repr__(self):
         return self._name
 
@@ -227,6 +296,16 @@ class Listwise(AbstractEnsemble):
     def get_structure(self):
         return {'*': self._build_pipeline('*')}
 
+    def _compile(self):
+        selector = CombinedSelector._compile_selector(self.selector)
+
+        def _call(obj):
+            if not isinstance(obj, list) and not isinstance(obj, tuple):
+                raise _TracingRequired()
+            return [selector(item) for item in obj]
+
+        return _call
+
 
 class Dictwise(AbstractEnsemble):
     """
@@ -249,6 +328,16 @@ class Dictwise(AbstractEnsemble):
     def get_structure(self):
         return {'*': self._build_pipeline('*')}
 
+    def _compile(self):
+        selector = CombinedSelector._compile_selector(self.selector)
+
+        def _call(obj):
+            if not isinstance(obj, dict):
+                raise _TracingRequired()
+            return {key: selector(value) for key, value in obj.items()}
+
+        return _call
+
 
 def transpose_list_of_dicts_to_dict_of_lists(obj):
     fields = dict()  # type: Dict[str,List]
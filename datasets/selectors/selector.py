@@ -1,5 +1,7 @@
 from typing import *
 
+import pandas as pd
+
 from .combinators import CombinedSelector, FieldGetter, Ensemble, FunctionFeed, Pipeline, SelectionContext
 
 
@@ -105,6 +107,72 @@ class Selector(CombinedSelector):
     def _internal_call(self, obj, context: SelectionContext):
         return self._ensemble(obj, context)
 
+    def _compile(self):
+        return self._ensemble._compile()
+
+    def _get_columnar_plan(self) -> Optional[List[Tuple[Optional[Callable], List[Tuple[str, Callable]]]]]:
+        plan = []
+        keys = set()
+        for selector in self._ensemble.selectors:
+            prefix = None
+            if isinstance(selector, Pipeline) and len(selector.selectors) == 2 and isinstance(selector.selectors[1][1], Ensemble):
+                prefix = CombinedSelector._compile_selector(selector.selectors[0][1])
+                selector = selector.selectors[1][1]
+            if not isinstance(selector, Ensemble) or len(selector.selectors) > 0:
+                return None
+            columns = []
+            for key, field_selector in selector.named_selectors.items():
+                if key in keys:
+                    return None
+                keys.add(key)
+                columns.append((key, CombinedSelector._compile_selector(field_selector)))
+            plan.append((prefix, columns))
+        return plan
+
+    def select_many(self, objects: Iterable[Any]) -> pd.DataFrame:
+        """
+        Applies the selector to each object and returns the results as a dataframe, one row per object.
+        Each field is evaluated across all the objects at once and written directly into its column, without creating a dictionary per object.
+        In case of errors or warnings, the corresponding object is processed by the traced selector, as in ``compile``.
+        """
+        plan = self._get_columnar_plan()
+        if plan is None:
+            return super(Selector, self).select_many(objects)
+        objects = list(objects)
+        traced_rows = {}
+
+        def traced_row(index):
+            if index not in traced_rows:
+                traced_rows[index] = self(objects[index])
+            return traced_rows[index]
+
+        columns = {}
+        for prefix, fields in plan:
+            if prefix is None:
+                sources = objects
+                prefix_failed = set()
+            else:
+                sources = []
+                prefix_failed = set()
+                for index, obj in enumerate(objects):
+                    try:
+                        sources.append(prefix(obj))
+                    except Exception:
+                        sources.append(None)
+                        prefix_failed.add(index)
+            for key, field in fields:
+                column = []
+                for index, source in enumerate(sources):
+                    if index in prefix_failed:
+                        column.append(traced_row(index)[key])
+                        continue
+                    try:
+                        column.append(field(source))
+                    except Exception:
+                        column.append(traced_row(index)[key])
+                columns[key] = column
+        return pd.DataFrame(columns)
+
     @staticmethod
     def identity(x):
         return x
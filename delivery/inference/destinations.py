@@ -73,7 +73,7 @@ class SqlBundleDestination:
     def upload_bundle(self, db: DataBundle):
         Logger.info(f'Uploading frame {self.dataframe_name_in_bundle} to sql, schema {self.schema_name}, table {self.table_name}')
         engine = self._create_engine()
-        self._upload(engine, db.data_frames[self.dataframe_name_in_bundle])
+        self._upload(engine, db[self.dataframe_name_in_bundle])
         Logger.info('Done')
 
 
@@ -1,9 +1,10 @@
 from ..training_core import *
 
 from .data_bundle import DataBundle, IndexedDataBundle
-from .samplers import Sampler, SequencialSampler, PriorityRandomSampler
+from .samplers import Sampler, SequencialSampler, PriorityRandomSampler, ShuffledSampler
 from .extractors import Extractor, CombinedExtractor
-from .batcher import Batcher
+from .batcher import Batcher, MiniBatchSlicer
+from .prefetcher import BatchPrefetcher
 from .model_handler import BatchedModelHandler
 from .training_task import TrainingSettings, BatchedTrainingTask
 from .precomputing_extractor import PrecomputingExtractor
@@ -1,5 +1,6 @@
 from typing import *
 
+import numpy as np
 import pandas as pd
 
 from .samplers import Sampler, SequencialSampler
@@ -35,12 +36,44 @@ class Batcher:
         for extractor in self.extractors:
             extractor.preprocess_bundle(ibundle)
 
-    def fit_extract(self, batch_size: int, ibundle: IndexedDataBundle) -> IndexedDataBundle:
+    def load_required_columns(self, ibundle: IndexedDataBundle):
+        """
+        For the frames of the bundle that are not loaded yet, loads only the columns that extractors require.
+        """
+        required = Extractor.merge_required_columns([extractor.get_required_columns() for extractor in self.extractors])
+        if required is None:
+            return
+        for key, columns in required.items():
+            if columns is not None and key in ibundle.bundle:
+                ibundle.bundle.load_columns(key, columns)
+
+    def fit_extract(self, batch_size: int, ibundle: IndexedDataBundle, fitting_batch_count: Optional[int] = None) -> IndexedDataBundle:
+        """
+        Fits the extractors on the first training batch and returns the extraction from it.
+        If ``fitting_batch_count`` is set, the extractors that support ``partial_fit`` are instead fitted on this amount
+        of the training batches, one by one.
+        """
         index_df = self.get_batch_index(batch_size, ibundle, 0, False)
-        ibundle = ibundle.change_index(index_df)
-        for extractor in self.extractors:
-            extractor.fit(ibundle)
-        batch = Extractor.make_extraction(ibundle, self.extractors)
+        first_batch = ibundle.change_index(index_df)
+        if fitting_batch_count is None or fitting_batch_count <= 1:
+            for extractor in self.extractors:
+                extractor.fit(first_batch)
+        else:
+            for extractor in self.extractors:
+                extractor.begin_partial_fit(first_batch)
+            partial_extractors = [extractor for extractor in self.extractors if extractor.supports_partial_fit()]
+            for extractor in self.extractors:
+                if extractor not in partial_extractors:
+                    extractor.fit(first_batch)
+            batch_count = min(fitting_batch_count, self.get_batch_count(batch_size, ibundle))
+            for i in range(batch_count):
+                if i == 0:
+                    batch = first_batch
+                else:
+                    batch = ibundle.change_index(self.get_batch_index(batch_size, ibundle, i, False))
+                for extractor in partial_extractors:
+                    extractor.partial_fit(batch)
+        batch = Extractor.make_extraction(first_batch, self.extractors)
         return batch
 
     def _get_strategy(self, in_inference):
@@ -52,7 +85,7 @@ class Batcher:
     def get_batch_count(self, batch_size:int,  db: IndexedDataBundle, in_inference=False) -> int:
         return self._get_strategy(in_inference).get_batch_count(batch_size, db)
 
-    def get_batch_index(self, batch_size: int, db: IndexedDataBundle, batch_index: int, in_inference: bool) -> pd.DataFrame:
+    def get_batch_index(self, batch_size: int, db: IndexedDataBundle, batch_index: int, in_inference: bool) -> Union[pd.DataFrame, np.ndarray]:
         index_df = self._get_strategy(in_inference).get_batch_index_frame(batch_size, db, batch_index)
         return index_df
 
@@ -66,12 +99,36 @@ class Batcher:
         Returns: a dictionary with batch component, one per key of ``self.transformers``
         """
         index_df = self.get_batch_index(batch_size, db, batch_index, in_inference)
+        return self.get_batch_from_index(db, index_df)
+
+    def get_batch_from_index(self, db: IndexedDataBundle, index_df: Union[pd.DataFrame, np.ndarray]) -> IndexedDataBundle:
         batch = Extractor.make_extraction(db.change_index(index_df), self.extractors)
         return batch
 
     def get_mini_batch_indices(self, mini_batch_size, batch: DataBundle) -> List[pd.Index]:
         n = self.mini_batching_sampler.get_batch_count(mini_batch_size, batch)
-        mini_batches = [self.mini_batching_sampler.get_batch_index_frame(mini_batch_size, batch, i).index for i in range(n)]
+        mini_batches = []
+        for i in range(n):
+            index = self.mini_batching_sampler.get_batch_index_frame(mini_batch_size, batch, i)
+            if isinstance(index, np.ndarray):
+                mini_batches.append(batch.get_index()[index])
+            else:
+                mini_batches.append(index.index)
+        return mini_batches
+
+    def get_mini_batch_positions(self, mini_batch_size, batch: IndexedDataBundle) -> List[np.ndarray]:
+        """
+        Same as ``get_mini_batch_indices``, but returns the positions of mini-batches' rows in ``batch.index_frame``
+        """
+        n = self.mini_batching_sampler.get_batch_count(mini_batch_size, batch)
+        index = batch.get_index()
+        mini_batches = []
+        for i in range(n):
+            frame = self.mini_batching_sampler.get_batch_index_frame(mini_batch_size, batch, i)
+            if isinstance(frame, np.ndarray):
+                mini_batches.append(frame)
+            else:
+                mini_batches.append(index.get_indexer(frame.index))
         return mini_batches
 
     def get_mini_batch(self, index: pd.Index, batch: IndexedDataBundle) -> IndexedDataBundle:
@@ -85,6 +142,16 @@ class Batcher:
                 raise ValueError(f"Unknown batch element type: {type(df)}")
         return IndexedDataBundle(batch.index_frame.loc[index], mini_batch)
 
+    @staticmethod
+    def create_mini_batch_slicer(batch: IndexedDataBundle) -> Optional['MiniBatchSlicer']:
+        """
+        Returns the slicer for the batch, or None if the batch's index is not unique and the mini-batches can only be
+        produced with ``get_mini_batch``
+        """
+        if not batch.get_index().is_unique:
+            return None
+        return MiniBatchSlicer(batch)
+
     @staticmethod
     def generate_sample(
             bundle: Union[DataBundle, IndexedDataBundle],
@@ -95,3 +162,44 @@ class Batcher:
             bundle = IndexedDataBundle(bundle['index'], bundle)
         batcher = Batcher(extractors)
         return batcher.fit_extract(batch_size, bundle)
+
+
+class MiniBatchSlicer:
+    """
+    Produces the mini-batches of one batch by the positions of their rows in the batch's index frame.
+
+    For each element of the batch, the map from these positions to the positions in the element is computed once,
+    so producing a mini-batch takes a positional ``take`` on dataframes and ``index_select`` on annotated tensors,
+    without the label lookups of ``Batcher.get_mini_batch``.
+    """
+    def __init__(self, batch: IndexedDataBundle):
+        self.batch = batch
+        index = batch.get_index()
+        self.position_maps = {}  # type: Dict[str, Optional[np.ndarray]]
+        for key, df in batch.bundle.data_frames.items():
+            if isinstance(df, pd.DataFrame):
+                if df.index.equals(index):
+                    self.position_maps[key] = None
+                else:
+                    self.position_maps[key] = MiniBatchSlicer._get_map(df.index.get_indexer(index), key)
+            elif hasattr(df, 'get_positions'):
+                self.position_maps[key] = MiniBatchSlicer._get_map(df.get_positions(index), key)
+            else:
+                raise ValueError(f"Unknown batch element type: {type(df)}")
+
+    @staticmethod
+    def _get_map(positions: np.ndarray, key: str) -> np.ndarray:
+        if (positions < 0).any():
+            raise ValueError(f'Batch element {key} misses some rows of the batch index')
+        return positions
+
+    def get_mini_batch(self, positions: np.ndarray) -> IndexedDataBundle:
+        mini_batch = DataBundle()
+        for key, df in self.batch.bundle.data_frames.items():
+            position_map = self.position_maps[key]
+            element_positions = positions if position_map is None else position_map[positions]
+            if isinstance(df, pd.DataFrame):
+                mini_batch[key] = df.take(element_positions)
+            else:
+                mini_batch[key] = df.sample_positions(self.batch.get_index().name, element_positions)
+        return IndexedDataBundle(self.batch.index_frame.take(positions), mini_batch)
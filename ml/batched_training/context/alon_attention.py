@@ -30,9 +30,22 @@ class AlonAttention(torch.nn.Module):
         else:
             return self.hidden_network(sample)
 
-    def forward(self, inp):
+    def _get_masked_weights(self, hidden, mask):
+        mask = mask.unsqueeze(-1)
+        # The mode is defined by the attention network itself, so the objects pickled before masking are supported
+        function = self.attention_network.function
+        is_softmax = isinstance(function, partial) and function.func is torch.softmax
+        if not is_softmax:
+            return self.attention_network(hidden) * mask
+        logits = self.attention_network.linear_layer(hidden).masked_fill(~mask, -1e9)
+        return torch.softmax(logits, dim=0) * mask
+
+    def forward(self, inp, mask=None):
         hidden = self._fully_connected_step(inp)
-        weights = self.attention_network(hidden)
+        if mask is None:
+            weights = self.attention_network(hidden)
+        else:
+            weights = self._get_masked_weights(hidden, mask)
         weighted_tensor = torch.mul(hidden, weights)
         result = torch.sum(weighted_tensor, dim=[0])
         return result
\ No newline at end of file
@@ -1,4 +1,5 @@
 from .architecture import *
+import numpy as np
 
 
 class PandasAggregationFinalizer(AggregationFinalizer):
@@ -30,7 +31,39 @@ class PandasAggregationFinalizer(AggregationFinalizer):
                 result[c] = pd.Series(0, index=index.index)
         return result
 
+    def _finalize_into_array(self, index: pd.DataFrame, aggregations: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        columns = pd.Index(self.columns_)
+        result = np.zeros((index.shape[0], len(columns)), dtype=np.float64)
+        for agg_name, agg in aggregations.items():
+            if agg.columns.duplicated().any():
+                raise ValueError(f'Something wrong is happened around aggregation {agg_name}: duplicating columns')
+            rows = index.index.get_indexer(agg.index)
+            found_rows = rows >= 0
+            rows = rows[found_rows]
+            positions = columns.get_indexer([f'{agg_name}_{c}' for c in agg.columns])
+            found_columns = positions >= 0
+            if found_columns.any():
+                values = agg.to_numpy(dtype=np.float64, na_value=0)[found_rows][:, found_columns]
+                result[np.ix_(rows, positions[found_columns])] = values
+            if self.add_presence_columns:
+                presence_position = columns.get_indexer([f'{agg_name}_present_{agg_name}'])[0]
+                if presence_position >= 0:
+                    result[rows, presence_position] = 1
+        return pd.DataFrame(result, index=index.index, columns=self.columns_)
+
+    def _can_finalize_into_array(self, index: pd.DataFrame, aggregations: Dict[str, pd.DataFrame]) -> bool:
+        if not index.index.is_unique:
+            return False
+        for agg in aggregations.values():
+            if not agg.index.is_unique:
+                return False
+            if not all(pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype) for dtype in agg.dtypes):
+                return False
+        return True
+
     def finalize(self, index: pd.DataFrame, features: Dict[str, pd.DataFrame], aggregations: Dict[str, pd.DataFrame]):
+        if self._can_finalize_into_array(index, aggregations):
+            return self._finalize_into_array(index, aggregations)
         result = self._compute_intermediate_dict(index, aggregations)
         rdf = pd.DataFrame(result)
         rdf = index[[]].merge(rdf, left_index=True, right_index=True, how='left')
@@ -56,18 +89,37 @@ class GroupByAggregator(ContextAggregator):
 
 
 class PivotAggregator(ContextAggregator):
+    """
+    Puts the features of each context element into the separate columns ``{feature}_at_{offset}``.
+    The offsets are remembered in ``fit``, and the features are written by the (sample, offset) positions
+    into a zero array, which is then flattened into these columns.
+    """
     def __init__(self, presence_column=False):
         self.presence_column = presence_column
+        self.offsets_ = None  # type: Optional[List]
+
+    def fit(self, features_df):
+        self.offsets_ = list(sorted(features_df.index.get_level_values(1).unique()))
 
     def aggregate_context(self, features_df):
         names = features_df.index.names
         if names[0] is None:
             raise ValueError('There is `None` in the features df index. This aggregator requires you to set the name for index of your samples')
         columns = list(features_df.columns)
-        df = features_df.reset_index()
+        offsets = getattr(self, 'offsets_', None)
+        if offsets is None:
+            offsets = list(sorted(features_df.index.get_level_values(1).unique()))
+        samples, sample_positions = np.unique(features_df.index.get_level_values(0), return_inverse=True)
+        offset_positions = pd.Index(offsets).get_indexer(features_df.index.get_level_values(1))
+        found = offset_positions >= 0
+        values = features_df.to_numpy(dtype=np.float64, na_value=0)
         if self.presence_column:
-            df = df.assign(offset_is_presenting=1)
+            values = np.concatenate([values, np.ones((values.shape[0], 1))], axis=1)
             columns.append('offset_is_presenting')
-        df = df.pivot_table(index=names[0], columns=names[1], values=columns).fillna(0)
-        df.columns = [f'{a}_at_{b}' for a, b in df.columns]
-        return df
+        result = np.zeros((len(samples), len(columns), len(offsets)), dtype=np.float64)
+        result[sample_positions[found], :, offset_positions[found]] = values[found]
+        return pd.DataFrame(
+            result.reshape(len(samples), len(columns) * len(offsets)),
+            index=pd.Index(samples, name=names[0]),
+            columns=[f'{a}_at_{b}' for a in columns for b in offsets]
+        )
@@ -1,6 +1,7 @@
 from typing import *
 from math import ceil
 
+import numpy as np
 import pandas as pd
 import torch
 
@@ -11,15 +12,29 @@ from ...batched_training import factories as btf
 
 
 def lstm_data_transformation(index, contexts, df, conversion):
+    """
+    Builds the tensor of shape (contexts, samples, features): the rows of ``df`` (indexed by (sample, context))
+    are written by their integer coordinates into a zero tensor, so the missing (sample, context) pairs stay zero.
+    The mask of shape (contexts, samples) marks the present pairs
+    """
     names = df.index.names
     samples = list(index)
     contexts = list(contexts)
     features = list(df.columns)
     cnames = [names[1], names[0]]
-    full = pd.DataFrame([(c, s) for c in contexts for s in samples], columns=cnames).set_index(cnames)
-    full = full.merge(df.reset_index().set_index(cnames), left_index=True, right_index=True, how='left').fillna(0)
-    t = conversion(full).reshape(len(contexts), len(samples), len(features))
-    return btf.AnnotatedTensor(t, [cnames[0], cnames[1], 'features'], [contexts, samples, features])
+    sample_positions = pd.Index(samples).get_indexer(df.index.get_level_values(0))
+    context_positions = pd.Index(contexts).get_indexer(df.index.get_level_values(1))
+    found = (sample_positions >= 0) & (context_positions >= 0)
+    values = conversion(df)
+    if values.is_floating_point() and torch.isnan(values).any():
+        values = values.masked_fill(torch.isnan(values), 0)
+    t = torch.zeros((len(contexts), len(samples), len(features)), dtype=values.dtype)
+    found_positions = torch.from_numpy(np.flatnonzero(found))
+    coordinates = (torch.from_numpy(context_positions[found]), torch.from_numpy(sample_positions[found]))
+    t[coordinates] = values[found_positions]
+    mask = torch.zeros((len(contexts), len(samples)), dtype=torch.bool)
+    mask[coordinates] = True
+    return btf.AnnotatedTensor(t, [cnames[0], cnames[1], 'features'], [contexts, samples, features], mask)
 
 
 
@@ -72,6 +87,23 @@ class LSTMFinalizer(AggregationFinalizer):
         return result
 
 
+def run_lstm(lstm: torch.nn.LSTM, input: torch.Tensor, mask: Optional[torch.Tensor] = None) -> torch.Tensor:
+    """
+    Runs the LSTM over the (contexts, samples, features) tensor and returns the last hidden state of shape (samples, hidden).
+    If the (contexts, samples) mask is provided, the present elements of each sample are moved to the beginning
+    and the LSTM runs only over them with ``pack_padded_sequence``.
+    """
+    if mask is None:
+        output = lstm(input)[1][0]
+    else:
+        order = torch.sort((~mask).to(torch.int8), dim=0, stable=True).indices
+        input = input.gather(0, order.unsqueeze(-1).expand_as(input))
+        lengths = mask.sum(dim=0).clamp(min=1).cpu()
+        packed = torch.nn.utils.rnn.pack_padded_sequence(input, lengths, enforce_sorted=False)
+        output = lstm(packed)[1][0]
+    return output.reshape(output.shape[1], output.shape[2])
+
+
 class LSTMNetwork(torch.nn.Module):
     def __init__(self, context_size: Union[int, torch.Tensor], hidden_size: Union[int, Tuple, List[int]]):
         super(LSTMNetwork, self).__init__()
@@ -84,8 +116,5 @@ class LSTMNetwork(torch.nn.Module):
             hidden_size
         )
 
-    def forward(self, input):
-        lstm_output = self.lstm(input)
-        output = lstm_output[1][0]
-        output = output.reshape(output.shape[1], output.shape[2])
-        return output
+    def forward(self, input, mask: Optional[torch.Tensor] = None):
+        return run_lstm(self.lstm, input, mask)
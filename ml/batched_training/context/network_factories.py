@@ -1,4 +1,6 @@
+from typing import *
 from .. import factories as btf
+from ..data_bundle import IndexedDataBundle
 from .lstm_components import  LSTMNetwork
 from .alon_attention import AlonAttention
 from .self_attention import AttentionReccurentNetwork
@@ -14,15 +16,66 @@ class Dim3NetworkType(Enum):
     AlonAttentionWithoutFullyConnectedSigmoid = 4
     SelfAttentionAndLSTM = 5
 
+def get_context_mask(input, mask_frames: Optional[Iterable[str]]) -> Optional[torch.Tensor]:
+    """
+    Returns the union of the masks of the ``AnnotatedTensor`` among ``mask_frames`` of the batch: as the tensors of
+    several units are concatenated, the element is padding only if it is padding in all of them
+    """
+    if mask_frames is None or not isinstance(input, IndexedDataBundle):
+        return None
+    result = None
+    for frame in mask_frames:
+        if frame in input.bundle.data_frames:
+            value = input[frame]
+            if isinstance(value, btf.AnnotatedTensor) and getattr(value, 'mask', None) is not None:
+                result = value.mask if result is None else result | value.mask
+    return result
+
+
+class MaskedDim3Network(btf.FeedForwardNetwork):
+    """
+    Feed-forward network, whose last layer is the Dim3 reduction network. The mask of padded contexts
+    is taken from the input batch and passed to the last layer, so the padded elements are ignored
+    """
+    def __init__(self, mask_frames: Optional[List[str]], *networks: torch.nn.Module):
+        super(MaskedDim3Network, self).__init__(*networks)
+        self.mask_frames = mask_frames
+
+    def forward(self, input):
+        mask = get_context_mask(input, self.mask_frames)
+        if mask is None:
+            return super(MaskedDim3Network, self).forward(input)
+        for network in self.networks[:-1]:
+            input = network(input)
+        return self.networks[-1](input, mask=mask)
+
+    class Factory:
+        def __init__(self, mask_frames: Optional[List[str]], *factories):
+            self.mask_frames = mask_frames
+            self.factories = factories
+
+        def __call__(self, input):
+            network = btf.FeedForwardNetwork.Factory(*self.factories)(input)
+            return MaskedDim3Network(self.mask_frames, *network.networks)
+
+
 class Dim3NetworkFactory:
     def __init__(self,
                  input_name: str,
-                 get_custom_input_layer = None
+                 get_custom_input_layer = None,
+                 mask_frames: Optional[Iterable[str]] = None
                  ):
+        """
+        Args:
+            mask_frames: the frames of the batch containing the masks of padded contexts. By default, ``input_name``
+        """
         self.input_name = input_name
         self.droupout_rate = None
         self.network_type = Dim3NetworkType.LSTM
         self.get_custom_input_layer = get_custom_input_layer
+        if mask_frames is None and input_name is not None:
+            mask_frames = [input_name]
+        self.mask_frames = list(mask_frames) if mask_frames is not None else None
 
     def create_network_factory(self, hidden_size):
         factories = []
@@ -47,7 +100,7 @@ class Dim3NetworkFactory:
         elif self.network_type == Dim3NetworkType.SelfAttentionAndLSTM:
             factories.append(partial(AttentionReccurentNetwork, hidden_size=hidden_size))
 
-        pipeline = btf.FeedForwardNetwork.Factory(*factories)
+        pipeline = MaskedDim3Network.Factory(getattr(self, 'mask_frames', None), *factories)
         return pipeline
 
     def create_network(self, input, hidden_size):
@@ -1,6 +1,8 @@
 from typing import *
 import torch
 
+from .lstm_components import run_lstm
+
 
 class SelfAttention(torch.nn.Module):
     def __init__(self, n_features: int) -> None:
@@ -11,17 +13,19 @@ class SelfAttention(torch.nn.Module):
             for _ in range(3)
         ]
 
-        self.softmax = torch.nn.Softmax(dim = 1)
-
-    def forward(self, input: torch.Tensor) -> torch.Tensor:
+    def forward(self, input: torch.Tensor, mask: Optional[torch.Tensor] = None) -> torch.Tensor:
         context_size, batch_size, n_features = input.shape
-        
-        Q, K, V = self.query(input), self.key(input), self.value(input)
-        output = torch.Tensor(*input.shape)
-        
-        for i in range(batch_size):
-            output[:,i,:] = self.softmax((Q[:,i,:] @ K[:,i,:].T) / n_features**0.5) @ V[:,i,:]
-            
+
+        # (batch, context, features), so the attention is computed for all the samples with single bmm calls
+        batch_first = input.transpose(0, 1)
+        Q, K, V = self.query(batch_first), self.key(batch_first), self.value(batch_first)
+        scores = torch.bmm(Q, K.transpose(1, 2)) / n_features**0.5
+        if mask is not None:
+            scores = scores.masked_fill(~mask.T.unsqueeze(1), -1e9)
+        output = torch.bmm(torch.softmax(scores, dim=2), V).transpose(0, 1)
+
+        if mask is not None:
+            output = output * mask.unsqueeze(-1)
         return output
 
 
@@ -37,8 +41,6 @@ class AttentionReccurentNetwork(torch.nn.Module):
             torch.nn.LSTM(context_size, hidden_size)
         )
 
-    def forward(self, input: torch.Tensor) -> torch.Tensor:
-        lstm_output = self.model(input)
-        output = lstm_output[1][0]
-        output = output.reshape(output.shape[1], output.shape[2])
-        return output
+    def forward(self, input: torch.Tensor, mask: Optional[torch.Tensor] = None) -> torch.Tensor:
+        attention, lstm = self.model
+        return run_lstm(lstm, attention(input, mask), mask)
@@ -80,6 +80,7 @@ class ContextAssemblyPoint2(AssemblyPoint):
             return first_layer
 
     def create_network_factory(self):
+        self.network_factory.mask_frames = [unit.get_name() for unit in self.allowed_units]
         factory = self.network_factory.create_network_factory(self.hidden_size)
         return factory
 
@@ -1,27 +1,67 @@
 from typing import *
 
+import numpy as np
 import pandas as pd
 
 from ..._common import DataBundle
 
 
 class IndexedDataBundle:
-    def __init__(self, index_frame: pd.DataFrame, bundle: DataBundle):
+    """
+    The bundle with the index frame that defines the samples.
+
+    If ``positions`` are set, the index frame consists of the rows of ``index_frame`` argument at these positions.
+    In this case, the index frame is only built on the first access to ``index_frame`` field,
+    and the extractors that only need the index of the samples use ``get_index`` instead.
+    """
+    def __init__(self, index_frame: pd.DataFrame, bundle: DataBundle, positions: Optional[np.ndarray] = None):
         self.bundle = bundle
-        self.index_frame = index_frame
+        self.positions = positions
+        self._source_index_frame = index_frame
+        self._index_frame = index_frame if positions is None else None
+
+    @property
+    def index_frame(self) -> pd.DataFrame:
+        if self._index_frame is None:
+            self._index_frame = self._source_index_frame.iloc[self.positions]
+        return self._index_frame
+
+    @index_frame.setter
+    def index_frame(self, value: pd.DataFrame):
+        self.positions = None
+        self._source_index_frame = value
+        self._index_frame = value
 
-    def change_index(self, index: Union[pd.Index, pd.DataFrame]):
+    def get_index(self) -> pd.Index:
+        if self._index_frame is None:
+            return self._source_index_frame.index[self.positions]
+        return self._index_frame.index
+
+    def change_index(self, index: Union[pd.Index, pd.DataFrame, np.ndarray]):
         if isinstance(index, pd.Index):
             return IndexedDataBundle(self.index_frame.loc[index], self.bundle)
         elif isinstance(index, pd.DataFrame):
             return IndexedDataBundle(index, self.bundle)
+        elif isinstance(index, np.ndarray) and np.issubdtype(index.dtype, np.integer):
+            if self._index_frame is None:
+                return IndexedDataBundle(self._source_index_frame, self.bundle, self.positions[index])
+            return IndexedDataBundle(self.index_frame, self.bundle, index)
         else:
-            raise ValueError(f'`index` is expected to be pd.Index or pd.Dataframe, but was {type(index)}')
+            raise ValueError(f'`index` is expected to be pd.Index, pd.Dataframe or integer np.ndarray of positions, but was {type(index)}')
+
+    def with_bundle(self, bundle: DataBundle) -> 'IndexedDataBundle':
+        """
+        Returns the indexed bundle with the same index frame (still not built, if it's defined by the positions)
+        and the given bundle
+        """
+        result = IndexedDataBundle(self._source_index_frame, bundle, self.positions)
+        result._index_frame = self._index_frame
+        return result
 
     def __getitem__(self, key):
         if key=='index':
             return self.index_frame
-        return self.bundle.data_frames[key]
+        return self.bundle[key]
 
     def describe(self, limits: Optional[int] = None):
         desc = self.bundle.describe(limits)
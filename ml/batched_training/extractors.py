@@ -16,6 +16,15 @@ class _ExtractorWithDisabledFit:
     def fit(self, ibundle: IndexedDataBundle):
         Logger.info(f'Fitting of extractor {self.get_name()} is disabled')
 
+    def begin_partial_fit(self, ibundle: IndexedDataBundle):
+        pass
+
+    def supports_partial_fit(self):
+        return True
+
+    def partial_fit(self, ibundle: IndexedDataBundle):
+        pass
+
     def extract(self, ibundle: IndexedDataBundle) -> pd.DataFrame:
         return self.extractor.extract(ibundle)
 
@@ -25,6 +34,9 @@ class _ExtractorWithDisabledFit:
     def get_name(self):
         return self.extractor.get_name()
 
+    def get_required_columns(self):
+        return self.extractor.get_required_columns()
+
     def with_disabled_fit(self):
         return self
 
@@ -33,6 +45,26 @@ class Extractor:
     def fit(self, ibundle: IndexedDataBundle):
         raise NotImplementedError()
 
+    def begin_partial_fit(self, ibundle: IndexedDataBundle):
+        """
+        Starts a new partial fit, dropping the state of the previous one. ``ibundle`` is the first batch of the fit,
+        it is passed to ``partial_fit`` afterwards as well
+        """
+        pass
+
+    def supports_partial_fit(self) -> bool:
+        """
+        Returns True if the extractor can be fitted with several ``partial_fit`` calls on consecutive batches.
+        Is called after ``begin_partial_fit``
+        """
+        return False
+
+    def partial_fit(self, ibundle: IndexedDataBundle):
+        """
+        Updates the fit with one more batch
+        """
+        raise NotImplementedError()
+
     def extract(self, ibundle: IndexedDataBundle) -> pd.DataFrame:
         raise NotImplementedError()
 
@@ -45,6 +77,30 @@ class Extractor:
     def get_name(self):
         raise NotImplementedError()
 
+    def get_required_columns(self) -> Optional[Dict[str, Optional[List[str]]]]:
+        """
+        Returns the columns of the bundle's frames that the extractor reads, as a dictionary `frame name -> columns`.
+        `None` as a value means all the columns of the frame are required.
+        `None` as a result means that the extractor cannot tell, and the bundle must be loaded completely.
+        """
+        return None
+
+    @staticmethod
+    def merge_required_columns(requirements: List[Optional[Dict[str, Optional[List[str]]]]]) -> Optional[Dict[str, Optional[List[str]]]]:
+        result = {}
+        for required in requirements:
+            if required is None:
+                return None
+            for frame, columns in required.items():
+                if frame in result and result[frame] is None:
+                    continue
+                if columns is None:
+                    result[frame] = None
+                else:
+                    current = result.get(frame, [])
+                    result[frame] = current + [c for c in columns if c not in current]
+        return result
+
     def fit_extract(self, ibundle: IndexedDataBundle):
         self.fit(ibundle)
         return self.extract(ibundle)
@@ -62,7 +118,7 @@ class Extractor:
                     result[key] = value
             else:
                 result[extractor.get_name()] = rs
-        return IndexedDataBundle(ibundle.index_frame, result)
+        return ibundle.with_bundle(result)
 
 
 class UnionExtractor(Extractor):
@@ -74,9 +130,23 @@ class UnionExtractor(Extractor):
         for extractor in self.extractors:
             extractor.fit(ibundle)
 
+    def begin_partial_fit(self, ibundle: IndexedDataBundle):
+        for extractor in self.extractors:
+            extractor.begin_partial_fit(ibundle)
+
+    def supports_partial_fit(self):
+        return all(extractor.supports_partial_fit() for extractor in self.extractors)
+
+    def partial_fit(self, ibundle: IndexedDataBundle):
+        for extractor in self.extractors:
+            extractor.partial_fit(ibundle)
+
     def extract(self, ibundle: IndexedDataBundle) -> pd.DataFrame:
         return {extractor.get_name():extractor.extract(ibundle) for extractor in self.extractors}
 
+    def get_required_columns(self):
+        return Extractor.merge_required_columns([extractor.get_required_columns() for extractor in self.extractors])
+
     def get_name(self):
         return self.name
 
@@ -90,6 +160,17 @@ class CombinedExtractor(Extractor):
         for extractor in self.extractors:
             extractor.fit(ibundle)
 
+    def begin_partial_fit(self, ibundle: IndexedDataBundle):
+        for extractor in self.extractors:
+            extractor.begin_partial_fit(ibundle)
+
+    def supports_partial_fit(self):
+        return all(extractor.supports_partial_fit() for extractor in self.extractors)
+
+    def partial_fit(self, ibundle: IndexedDataBundle):
+        for extractor in self.extractors:
+            extractor.partial_fit(ibundle)
+
     @staticmethod
     def _run_extractors(ibundle: IndexedDataBundle, extractors):
         frames = []
@@ -107,5 +188,8 @@ class CombinedExtractor(Extractor):
         df = CombinedExtractor._run_extractors(ibundle, self.extractors)
         return df
 
+    def get_required_columns(self):
+        return Extractor.merge_required_columns([extractor.get_required_columns() for extractor in self.extractors])
+
     def get_name(self):
         return self.name
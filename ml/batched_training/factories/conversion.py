@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import torch
 
@@ -19,14 +20,30 @@ dtype: bool
 '''
 
 class DfConversion:
+    """
+    Converts the dataframes to tensors. The tensors own their data, so the in-place operations in the networks
+    do not change the batch. With ``copy=False``, the frames that already have the target dtype
+    (e.g. produced by the transformers with ``dtype=np.float32``) are converted without copying, and the tensor
+    shares the memory with the frame: this is only safe if neither is modified afterwards.
+    """
     @staticmethod
-    def float(df: pd.DataFrame):
-        return torch.tensor(df.astype(float).values).float()
+    def float(df: pd.DataFrame, copy: bool = True):
+        return torch.from_numpy(df.to_numpy(dtype=np.float32, copy=copy))
 
+    @staticmethod
+    def int(df: pd.DataFrame, copy: bool = True):
+        return torch.from_numpy(df.to_numpy(dtype=int, copy=copy))
 
     @staticmethod
-    def int(df: pd.DataFrame):
-        return torch.tensor(df.astype(int).values)
+    def sparse(df: pd.DataFrame):
+        """
+        Converts the dataframe of pandas sparse columns (e.g. produced by ``DataFrameTransformer`` with ``sparse_output``)
+        to the torch sparse COO float tensor
+        """
+        coo = df.sparse.to_coo()
+        indices = torch.from_numpy(np.vstack([coo.row, coo.col]).astype(np.int64))
+        values = torch.from_numpy(coo.data.astype(np.float32))
+        return torch.sparse_coo_tensor(indices, values, coo.shape)
 
     @staticmethod
     def auto(df: pd.DataFrame):
@@ -1,4 +1,5 @@
 from typing import *
+import numpy as np
 import pandas as pd
 from ....single_frame_training import ModelConstructor
 import torch
@@ -10,9 +11,15 @@ class AnnotatedTensor:
     def __init__(self,
                  tensor: torch.Tensor,
                  dim_names: Iterable[str],
-                 dim_indices: Optional[List[List]]
+                 dim_indices: Optional[List[List]],
+                 mask: Optional[torch.Tensor] = None
                  ):
+        """
+        Args:
+            mask: optional boolean tensor over the leading dimensions of ``tensor``, that is False for the padded elements
+        """
         self.tensor = tensor
+        self.mask = mask
         self.dim_names = tuple(dim_names)
         self.dim_indices = tuple(tuple(z) for z in dim_indices) if dim_indices is not None else None
         if self.dim_indices is not None:
@@ -22,11 +29,26 @@ class AnnotatedTensor:
             ]
         self.shape = tuple(tensor.shape)
 
-    def sample_index(self, index: pd.Index):
+    def get_positions(self, index: pd.Index) -> np.ndarray:
+        """
+        Returns the positions of the index's values along the axis named as the index
+        """
         axis = self.dim_names.index(index.name)
-        positions = self.dim_reverse_indices[axis].loc[index].values
-        idx = [slice(None) if i != axis else positions for i in range(len(self.dim_names))]
-        return AnnotatedTensor(self.tensor[idx], self.dim_names, None)
+        positions = self.dim_reverse_indices[axis].index.get_indexer(index)
+        if (positions < 0).any():
+            raise KeyError(f'Some values of the index are missing in the axis {index.name}')
+        return positions
+
+    def sample_positions(self, axis_name: str, positions: np.ndarray):
+        axis = self.dim_names.index(axis_name)
+        positions = torch.as_tensor(positions, dtype=torch.long)
+        mask = getattr(self, 'mask', None)
+        if mask is not None and axis < mask.dim():
+            mask = mask.index_select(axis, positions)
+        return AnnotatedTensor(self.tensor.index_select(axis, positions), self.dim_names, None, mask)
+
+    def sample_index(self, index: pd.Index):
+        return self.sample_positions(index.name, self.get_positions(index))
 
 
 class CtorAdapter:
@@ -2,6 +2,7 @@ from typing import *
 from ... import batched_training as bt
 import pandas as pd
 from .conventions import Conventions
+from .conversion import DfConversion
 import torch
 from yo_fluq_ds import Obj
 
@@ -68,7 +69,7 @@ class TorchModelHandler(bt.BatchedModelHandler):
     def _train_1_dim(self, input, labels):
         self.optimizer.zero_grad()
         result = self.network(input).flatten()
-        target = torch.tensor(input[Conventions.LabelFrame].values).float().flatten()
+        target = DfConversion.float(input[Conventions.LabelFrame]).flatten()
         loss = self.loss(result, target)
         loss.backward()
         self.optimizer.step()
@@ -77,7 +78,7 @@ class TorchModelHandler(bt.BatchedModelHandler):
     def _train_multi_dim(self, input, labels):
         self.optimizer.zero_grad()
         result = self.network(input)
-        target = torch.tensor(input[Conventions.LabelFrame].values).float()
+        target = DfConversion.float(input[Conventions.LabelFrame])
         loss = self.loss(result, target)
         loss.backward()
         self.optimizer.step()
@@ -1,5 +1,6 @@
 from typing import *
 
+import numpy as np
 import pandas as pd
 import copy
 
@@ -56,7 +57,8 @@ class PlainExractorBuilder:
               raise_if_rows_are_missing: bool = True,
               raise_if_nulls_detected: bool = True,
               coalesce_nulls: Optional = None,
-              drop_columns: Union[str, List[str], None] = None
+              drop_columns: Union[str, List[str], None] = None,
+              compile_transformer: bool = False
               ) -> 'PlainExtractor':
         if len(self.joins) == 0:
             self.joins.append(_JoinDescription(None, _JoinType.NullIndex))
@@ -68,11 +70,17 @@ class PlainExractorBuilder:
             raise_if_rows_are_missing,
             raise_if_nulls_detected,
             coalesce_nulls,
-            drop_columns
+            drop_columns,
+            compile_transformer
         )
 
 
 class PlainExtractor(Extractor):
+    """
+    If ``compile_transformer`` is set, the fitted transformer (e.g. ``DataFrameTransformerFactory``) is compiled
+    with its ``compile`` method on the first extraction, and the compiled one, producing float32 columns,
+    is used to transform the batches.
+    """
     def __init__(self,
                  name: str,
                  joins: List[_JoinDescription],
@@ -80,7 +88,8 @@ class PlainExtractor(Extractor):
                  raise_if_rows_are_missing: bool,
                  raise_if_nulls_detected: bool,
                  coalesce_nulls: Optional = None,
-                 drop_columns: Optional = None
+                 drop_columns: Optional = None,
+                 compile_transformer: bool = False
                  ):
         self.name = name
         self.joins = joins
@@ -89,13 +98,69 @@ class PlainExtractor(Extractor):
         self.raise_if_nulls_detected = raise_if_nulls_detected
         self.coalesce_nulls = coalesce_nulls
         self.drop_columns = drop_columns
+        self.compile_transformer = compile_transformer
+        self.compiled_transformer_ = None
 
     @staticmethod
     def build(name: str):
         return PlainExractorBuilder(name)
 
+    @staticmethod
+    def _get_positions(frame: pd.DataFrame, keys: Union[np.ndarray, pd.Index]) -> np.ndarray:
+        # The hash table of the frame's index is built by pandas once and cached within the index,
+        # so this lookup is the only per-batch hashing
+        if frame.index.is_unique:
+            return frame.index.get_indexer(keys)
+        positions, _ = frame.index.get_indexer_non_unique(keys)
+        return positions
+
+    @staticmethod
+    def _take(frame: pd.DataFrame, positions: np.ndarray, columns: Optional[List[str]]) -> pd.DataFrame:
+        if columns is None:
+            return frame.take(positions)
+        # Gathering column by column, so only the batch rows of the kept columns are copied
+        return pd.DataFrame(
+            {c: frame[c].take(positions).array for c in columns},
+            index=frame.index.take(positions),
+            columns=columns
+        )
+
+    @staticmethod
+    def _take_rows(frame: pd.DataFrame, positions: np.ndarray, index: pd.Index, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        found = positions >= 0
+        if found.all():
+            result = PlainExtractor._take(frame, positions, columns)
+        elif frame.shape[0] == 0:
+            if columns is not None:
+                frame = frame[columns]
+            result = frame.iloc[[]].reindex(list(range(len(positions))))
+        else:
+            result = PlainExtractor._take(frame, np.where(found, positions, 0), columns)
+            result.index = index
+            result = result.where(np.broadcast_to(found[:, np.newaxis], result.shape))
+        result.index = index
+        return result
+
+    def _join(self,
+              ibundle: IndexedDataBundle,
+              frame: pd.DataFrame,
+              keys: Union[np.ndarray, pd.Index],
+              frame_name: str,
+              columns: Optional[List[str]] = None
+              ) -> pd.DataFrame:
+        index = ibundle.get_index()
+        expected_rows = len(index)
+        positions = PlainExtractor._get_positions(frame, keys)
+        if positions.shape[0] > expected_rows:
+            raise ValueError(f'Error in extractor {self.name}: When merging with {frame_name}, more rows are produced, {positions.shape[0]} instead {expected_rows}. Is index non-unique?)')
+        if self.raise_if_rows_are_missing:
+            found_rows = (positions >= 0).sum()
+            if found_rows < expected_rows:
+                raise ValueError(f'Error in extractor {self.name}: when merging with {frame_name}, less rows are produced, {found_rows} instead {expected_rows}. Are some rows missing?')
+        return PlainExtractor._take_rows(frame, positions, index, columns)
+
     def _build_frame(self, ibundle: IndexedDataBundle):
-        if ibundle.index_frame.index.duplicated().any():
+        if not ibundle.get_index().is_unique:
             raise ValueError('`PlainExtractor` does not support extraction if samples are duplicated')
 
         current = None
@@ -103,13 +168,16 @@ class PlainExtractor(Extractor):
         if first_join.join_type == _JoinType.NullIndex:
             current = ibundle.index_frame
         elif first_join.join_type == _JoinType.Index:
-            current = ibundle.bundle[first_join.frame].loc[ibundle.index_frame.index]
+            current = self._get_join_frame(ibundle, 0)
         else:
             raise ValueError('First join must be NullIndex or Index')
         if first_join.keep_columns is not None:
             for c in first_join.keep_columns:
                 if c not in current.columns:
                     raise ValueError(f'Column {c} is not in a frame that is being joined. The columns are {list(current)}')
+        if first_join.join_type == _JoinType.Index:
+            current = self._join(ibundle, current, ibundle.get_index(), first_join.frame, first_join.keep_columns)
+        elif first_join.keep_columns is not None:
             current = current[first_join.keep_columns]
 
         for join_index, join in enumerate(self.joins[0:]):
@@ -117,28 +185,18 @@ class PlainExtractor(Extractor):
                 continue
             if join.join_type != _JoinType.Join:
                 raise ValueError('All joins except first must be Join')
-            frame = ibundle.bundle[join.frame]
+            frame = self._get_join_frame(ibundle, join_index)
             if join.keep_columns is not None:
                 missing_columns = [c for c in join.keep_columns if c not in frame.columns]
                 if len(missing_columns)>0:
                     raise ValueError(f'The following columns are missing: {missing_columns}')
-                frame = frame[join.keep_columns]
-
-            if self.raise_if_rows_are_missing:
-                how = 'inner'
-            else:
-                how = 'left'
 
             join_columns = self.joins[join_index - 1].keep_columns
-            current = current.merge(frame, left_on=join_columns, right_index=True, how=how).drop(join_columns, axis=1)
-            if current.shape[0] < ibundle.index_frame.shape[0]:
-                raise ValueError(f'Error in extractor {self.name}: when merging with {join.frame}, less rows are produced, {current.shape[0]} instead {ibundle.index_frame.shape[0]}. Are some rows missing?')
-            elif current.shape[0] > ibundle.index_frame.shape[0]:
-                raise ValueError(f'Error in extractor {self.name}: When merging with {join.frame}, more rows are produced, {current.shape[0]} instead {ibundle.index_frame.shape[0]}. Is index non-unique?)')
-            elif not (current.index == ibundle.index_frame.index).all():
-                current = current.loc[ibundle.index_frame.index]
-                if not (current.index == ibundle.index_frame.index).all():
-                    raise ValueError(f'Error in extractor {self.name}: something wrong happened when merging with {join.frame}: same amount of rows, but indices are different')
+            if len(join_columns) == 1:
+                keys = current[join_columns[0]].values
+            else:
+                keys = pd.MultiIndex.from_frame(current[join_columns])
+            current = self._join(ibundle, frame, keys, join.frame, join.keep_columns)
         if self.drop_columns is not None:
             current = current.drop(self.drop_columns, axis=1)
         return current
@@ -147,11 +205,37 @@ class PlainExtractor(Extractor):
         if self.transformer is not None:
             frame = self._build_frame(ibundle)
             self.transformer.fit(frame)
+            self.compiled_transformer_ = None
+
+    def begin_partial_fit(self, ibundle: IndexedDataBundle):
+        if self.transformer is not None and hasattr(self.transformer, 'begin_partial_fit'):
+            frame = self._build_frame(ibundle)
+            self.transformer.begin_partial_fit(frame)
+            self.compiled_transformer_ = None
+
+    def supports_partial_fit(self):
+        if self.transformer is None:
+            return True
+        supports_partial_fit = getattr(self.transformer, 'supports_partial_fit', None)
+        return supports_partial_fit is not None and supports_partial_fit()
+
+    def partial_fit(self, ibundle: IndexedDataBundle):
+        if self.transformer is not None:
+            frame = self._build_frame(ibundle)
+            self.transformer.partial_fit(frame)
+            self.compiled_transformer_ = None
+
+    def _transform(self, frame: pd.DataFrame) -> pd.DataFrame:
+        if not getattr(self, 'compile_transformer', False):
+            return self.transformer.transform(frame)
+        if getattr(self, 'compiled_transformer_', None) is None:
+            self.compiled_transformer_ = self.transformer.compile(frame)
+        return self.compiled_transformer_.transform(frame)
 
     def extract(self, ibundle: IndexedDataBundle) -> pd.DataFrame:
         frame = self._build_frame(ibundle)
         if self.transformer is not None:
-            frame = self.transformer.transform(frame)
+            frame = self._transform(frame)
         if self.raise_if_nulls_detected:
             if frame.isnull().any().any():
                 null_columns = frame.isnull().any(axis=0)
@@ -161,5 +245,33 @@ class PlainExtractor(Extractor):
             frame = frame.fillna(value = self.coalesce_nulls)
         return frame
 
+    def _get_join_columns(self, join_index: int) -> Optional[List[str]]:
+        columns = self.joins[join_index].keep_columns
+        is_last = join_index == len(self.joins) - 1
+        if columns is None and is_last and self.transformer is not None:
+            allow_list = getattr(self.transformer, 'feature_allow_list', None)
+            if allow_list is not None:
+                columns = list(allow_list)
+                if self.drop_columns is not None:
+                    drop = self.drop_columns if isinstance(self.drop_columns, list) else [self.drop_columns]
+                    columns += [c for c in drop if c not in columns]
+        return columns
+
+    def _get_join_frame(self, ibundle: IndexedDataBundle, join_index: int) -> pd.DataFrame:
+        # For the lazy frames, only the required columns are loaded, while the frame in the bundle stays complete
+        columns = self._get_join_columns(join_index)
+        frame_name = self.joins[join_index].frame
+        if columns is None:
+            return ibundle.bundle[frame_name]
+        return ibundle.bundle.load_columns(frame_name, columns)
+
+    def get_required_columns(self):
+        requirements = []
+        for join_index, join in enumerate(self.joins):
+            if join.frame is None:
+                continue
+            requirements.append({join.frame: self._get_join_columns(join_index)})
+        return Extractor.merge_required_columns(requirements)
+
     def get_name(self):
         return self.name
@@ -1,56 +1,245 @@
 from typing import *
 
+import hashlib
+import os
+import pickle
+import numpy as np
 import pandas as pd
 
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 from .extractors import Extractor, DataBundle
+from ..._common.data_bundle import FeatherFrameReference
 from .plain_extractor import PlainExtractor
 from .batcher import Batcher, IndexedDataBundle
 
 
+_worker_state = None
+
+
+def _init_precomputing_worker(extractor: Extractor, ibundle: IndexedDataBundle, batch_size: int):
+    global _worker_state
+    _worker_state = (extractor, ibundle, batch_size)
+
+
+def _get_precomputed_chunk(extractor: Extractor, ibundle: IndexedDataBundle, batch_size: int, batch_index: int) -> pd.DataFrame:
+    batch = Batcher([extractor]).get_batch(batch_size, ibundle, batch_index)
+    key = [c for c in batch.bundle.data_frames.keys() if c != 'index'][0]
+    return batch[key]
+
+
+def _precomputing_worker(batch_index: int) -> pd.DataFrame:
+    extractor, ibundle, batch_size = _worker_state
+    return _get_precomputed_chunk(extractor, ibundle, batch_size, batch_index)
+
+
+class _FrameAssembler:
+    """
+    Collects the precomputed chunks into one frame. If the chunks have the same numeric dtype in all the columns,
+    they are written into the preallocated array as they arrive, so neither the chunks nor the concatenation copy are kept.
+    Otherwise, the chunks are concatenated.
+    """
+    def __init__(self, row_count: int):
+        self.row_count = row_count
+        self.buffer = None  # type: Optional[np.ndarray]
+        self.columns = None  # type: Optional[pd.Index]
+        self.index_pieces = []  # type: List[pd.Index]
+        self.position = 0
+        self.chunks = None  # type: Optional[List[pd.DataFrame]]
+
+    def _fits_buffer(self, df: pd.DataFrame) -> bool:
+        return (
+                df.columns.equals(self.columns)
+                and (df.dtypes == self.buffer.dtype).all()
+                and self.position + df.shape[0] <= self.row_count
+        )
+
+    def _buffer_frame(self) -> pd.DataFrame:
+        if len(self.index_pieces) == 0:
+            index = None
+        else:
+            index = self.index_pieces[0].append(self.index_pieces[1:])
+        return pd.DataFrame(self.buffer[:self.position], index=index, columns=self.columns, copy=False)
+
+    def add(self, df: pd.DataFrame):
+        if self.buffer is None and self.chunks is None:
+            dtypes = df.dtypes.unique()
+            if (df.shape[1] > 0
+                    and len(dtypes) == 1
+                    and isinstance(dtypes[0], np.dtype)
+                    and (np.issubdtype(dtypes[0], np.number) or dtypes[0] == bool)):
+                self.buffer = np.empty((self.row_count, df.shape[1]), dtype=dtypes[0])
+                self.columns = df.columns
+            else:
+                self.chunks = []
+        if self.buffer is not None:
+            if self._fits_buffer(df):
+                self.buffer[self.position:self.position + df.shape[0]] = df.to_numpy()
+                self.position += df.shape[0]
+                self.index_pieces.append(df.index)
+                return
+            self.chunks = [self._buffer_frame()]
+            self.buffer = None
+        self.chunks.append(df)
+
+    def get(self) -> pd.DataFrame:
+        if self.buffer is not None:
+            return self._buffer_frame()
+        return PrecomputingExtractor._concat(self.chunks or [])
+
+
 class PrecomputingExtractor(Extractor):
+    """
+    Computes the inner extractor over the whole index of the bundle once, when the bundle is preprocessed,
+    and then extracts the batches from the precomputed frame.
+
+    If ``cache_folder`` is set, the precomputed frame is stored there, in the file named after the hashes of the fitted
+    inner extractor and of the frames and columns it reads (except the index frame). The rows are addressed by the index
+    values: on the next preprocessing, only the rows of the index absent in the file are computed and appended to it,
+    so the rows of the index must not change their data. When the read frames change, the file is recomputed,
+    and the files of the same inner extractor for the previous data are removed.
+
+    If ``precomputing_workers`` is set, the chunks of ``index_size_for_precomputing`` rows are computed on a process pool.
+    The inner extractor and the bundle are passed to the workers once, at their start.
+    """
     def __init__(self,
                  name: str,
                  inner_extractor: Extractor,
                  index_size_for_precomputing: Optional[int] = None,
                  index_filter_for_precomputing: Optional[Callable[[pd.DataFrame], pd.Index]] = None,
+                 cache_folder: Optional[Union[str, Path]] = None,
+                 precomputing_workers: Optional[int] = None,
                  ):
         self.name = name
         self.inner_extractor = inner_extractor
         self.fitted = False
         self.index_size_for_precomputing = index_size_for_precomputing
         self.index_filter_for_precomputing = index_filter_for_precomputing
+        self.cache_folder = cache_folder
+        self.precomputing_workers = precomputing_workers
         self.extractor_from_preprocessed = PlainExtractor.build(name).index(name).apply()
+        self._state_hash = None  # type: Optional[str]
 
     def _inner_fit(self, ibundle: IndexedDataBundle):
         self.inner_extractor.fit(ibundle)
         self.fitted = True
+        self._state_hash = None
 
-    def _precompute(self, ibundle: IndexedDataBundle):
+    def _get_index_for_precomputing(self, ibundle: IndexedDataBundle) -> pd.Index:
         if self.index_filter_for_precomputing is not None:
-            index = self.index_filter_for_precomputing(ibundle.index_frame)
-        else:
-            index = ibundle.index_frame.index
+            return self.index_filter_for_precomputing(ibundle.index_frame)
+        return ibundle.index_frame.index
+
+    def _iterate_chunks(self, ibundle: IndexedDataBundle, index: Optional[pd.Index]) -> Iterable[pd.DataFrame]:
+        if index is None:
+            index = self._get_index_for_precomputing(ibundle)
         if self.index_size_for_precomputing is not None:
             batch_size = self.index_size_for_precomputing
         else:
             batch_size = len(index)
         ibundle = ibundle.change_index(index)
-        batcher = Batcher([self.inner_extractor])
-        dfs = []
-        key = None
-        for i in range(batcher.get_batch_count(batch_size, ibundle)):
-            batch = batcher.get_batch(batch_size, ibundle, i)
-            if key is None:
-                key = [c for c in batch.bundle.data_frames.keys() if c != 'index'][0]
-            dfs.append(batch[key])
-        return dfs
+        batch_count = Batcher([self.inner_extractor]).get_batch_count(batch_size, ibundle)
+        if not self.precomputing_workers or batch_count <= 1:
+            for i in range(batch_count):
+                yield _get_precomputed_chunk(self.inner_extractor, ibundle, batch_size, i)
+            return
+        with ProcessPoolExecutor(
+                max_workers=self.precomputing_workers,
+                initializer=_init_precomputing_worker,
+                initargs=(self.inner_extractor, ibundle, batch_size)
+        ) as executor:
+            in_flight = deque()
+            next_batch = 0
+            while next_batch < batch_count or len(in_flight) > 0:
+                while next_batch < batch_count and len(in_flight) < 2 * self.precomputing_workers:
+                    in_flight.append(executor.submit(_precomputing_worker, next_batch))
+                    next_batch += 1
+                yield in_flight.popleft().result()
 
-    def _fill_bundle(self, ibundle: IndexedDataBundle):
-        dfs = self._precompute(ibundle)
+    def _precompute(self, ibundle: IndexedDataBundle, index: Optional[pd.Index] = None):
+        return list(self._iterate_chunks(ibundle, index))
+
+    def _precompute_frame(self, ibundle: IndexedDataBundle, index: Optional[pd.Index] = None) -> pd.DataFrame:
+        if index is None:
+            index = self._get_index_for_precomputing(ibundle)
+        assembler = _FrameAssembler(len(index))
+        for df in self._iterate_chunks(ibundle, index):
+            assembler.add(df)
+        return assembler.get()
+
+    @staticmethod
+    def _concat(dfs: List[pd.DataFrame]) -> pd.DataFrame:
         if len(dfs) > 0:
-            df = pd.concat(dfs, axis=0)
+            return pd.concat(dfs, axis=0)
+        return pd.DataFrame([])
+
+    def _get_bundle_hash(self, ibundle: IndexedDataBundle) -> str:
+        """
+        Fingerprints only the frames and columns that the inner extractor reads. The index frame is not included:
+        the precomputed rows are addressed by the index values, so the new rows of the index are appended to the same file.
+        """
+        required = self.inner_extractor.get_required_columns()
+        if required is None:
+            required = {key: None for key in ibundle.bundle.data_frames}
+        hash = hashlib.md5()
+        for key in sorted(required, key=str):
+            if key == self.name or key == 'index' or key not in ibundle.bundle.data_frames:
+                continue
+            columns = required[key]
+            value = ibundle.bundle.data_frames[key]
+            hash.update(f'{key}:{columns}'.encode('utf-8'))
+            if isinstance(value, FeatherFrameReference):
+                # Not loading the lazy frames, the file identifies the data
+                stat = os.stat(value.path)
+                hash.update(f'{value.path}:{stat.st_size}:{stat.st_mtime_ns}'.encode('utf-8'))
+                continue
+            if columns is not None:
+                value = value[[c for c in columns if c in value.columns]]
+            try:
+                hash.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+            except TypeError:
+                hash.update(pickle.dumps(value))
+        return hash.hexdigest()
+
+    def _get_cache_prefix(self) -> str:
+        if self._state_hash is None:
+            self._state_hash = hashlib.md5(pickle.dumps(self.inner_extractor)).hexdigest()
+        return f'{self.name}_{self._state_hash}_'
+
+    def _get_cache_path(self, ibundle: IndexedDataBundle) -> Path:
+        return Path(self.cache_folder) / f'{self._get_cache_prefix()}{self._get_bundle_hash(ibundle)}.pkl'
+
+    def _remove_stale_cache_files(self, path: Path):
+        # The files of the same fitted extractor, but of other data, are not reused anymore
+        prefix = self._get_cache_prefix()
+        for file in os.listdir(path.parent):
+            if file.startswith(prefix) and file.endswith('.pkl') and file != path.name:
+                os.remove(path.parent / file)
+
+    def _precompute_with_cache(self, ibundle: IndexedDataBundle) -> pd.DataFrame:
+        index = self._get_index_for_precomputing(ibundle)
+        path = self._get_cache_path(ibundle)
+        cached = pd.read_pickle(path) if path.is_file() else None
+        missing = index if cached is None else index[~index.isin(cached.index)]
+        if len(missing) > 0:
+            df = self._precompute_frame(ibundle, missing)
+            cached = df if cached is None else pd.concat([cached, df], axis=0)
+            os.makedirs(path.parent, exist_ok=True)
+            tmp_path = str(path) + '.tmp'
+            cached.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+            self._remove_stale_cache_files(path)
+        if cached is None:
+            return pd.DataFrame([])
+        return cached.loc[cached.index.isin(index)]
+
+    def _fill_bundle(self, ibundle: IndexedDataBundle):
+        if self.cache_folder is not None:
+            df = self._precompute_with_cache(ibundle)
         else:
-            df = pd.DataFrame([])
+            df = self._precompute_frame(ibundle)
         ibundle.bundle[self.name] = df
 
     def preprocess_bundle(self, ibundle: IndexedDataBundle):
@@ -63,3 +252,6 @@ class PrecomputingExtractor(Extractor):
 
     def extract(self, ibundle: IndexedDataBundle) -> pd.DataFrame:
         return self.extractor_from_preprocessed.extract(ibundle)
+
+    def get_required_columns(self):
+        return self.inner_extractor.get_required_columns()
@@ -0,0 +1,87 @@
+from typing import *
+
+from concurrent.futures import Executor, ThreadPoolExecutor, Future
+
+from .batcher import Batcher
+from .data_bundle import IndexedDataBundle
+
+
+class BatchPrefetcher:
+    """
+    Produces the batches of the ``Batcher`` in a background thread pool, so the next batches are being built
+    while the model is trained on the current one.
+
+    The sampling itself (``Batcher.get_batch_index``) is always performed in the calling thread and in the order of batch
+    indices, so the randomized samplers produce the same sequence of batches as in the synchronous mode.
+    Only the extraction is offloaded to the pool. The batches are returned strictly in the order of their indices.
+
+    If ``depth`` is None or 0, no pool is created and the batches are built synchronously on request.
+    If ``executor`` is provided, it is used instead of the own pool, and it is not shut down by ``close``:
+    this way, several prefetchers may share the same pool.
+    """
+
+    def __init__(self,
+                 batcher: Batcher,
+                 batch_size: int,
+                 db: IndexedDataBundle,
+                 batch_count: int,
+                 in_inference: bool = False,
+                 depth: Optional[int] = None,
+                 executor: Optional[Executor] = None,
+                 ):
+        self.batcher = batcher
+        self.batch_size = batch_size
+        self.db = db
+        self.batch_count = batch_count
+        self.in_inference = in_inference
+        self.depth = depth
+        self.executor = executor  # type: Optional[Executor]
+        self.owns_executor = executor is None
+        self.futures = {}  # type: Dict[int, Future]
+        self.next_to_submit = 0
+
+    def _build(self, batch_index: int) -> Future:
+        index_df = self.batcher.get_batch_index(self.batch_size, self.db, batch_index, self.in_inference)
+        return self.executor.submit(self.batcher.get_batch_from_index, self.db, index_df)
+
+    def _fill_queue(self, up_to: int):
+        up_to = min(up_to, self.batch_count)
+        while self.next_to_submit < up_to:
+            self.futures[self.next_to_submit] = self._build(self.next_to_submit)
+            self.next_to_submit += 1
+
+    def _ensure_executor(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.depth)
+
+    def start(self):
+        """
+        Starts building the first batches without waiting for the first ``get_batch`` call
+        """
+        if self.depth:
+            self._ensure_executor()
+            self._fill_queue(self.depth)
+
+    def get_batch(self, batch_index: int) -> IndexedDataBundle:
+        if not self.depth:
+            return self.batcher.get_batch(self.batch_size, self.db, batch_index, self.in_inference)
+        if batch_index < self.next_to_submit and batch_index not in self.futures:
+            raise ValueError(f'Batch {batch_index} was already requested. BatchPrefetcher only supports consecutive access')
+        self._ensure_executor()
+        self._fill_queue(batch_index + 1 + self.depth)
+        future = self.futures.pop(batch_index)
+        return future.result()
+
+    def close(self):
+        for future in self.futures.values():
+            future.cancel()
+        self.futures = {}
+        if self.executor is not None and self.owns_executor:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -10,7 +10,10 @@ class Sampler:
     def get_batch_count(self, batch_size: int, db: IndexedDataBundle) -> int:
         raise NotImplementedError()
 
-    def get_batch_index_frame(self, batch_size: int, db: IndexedDataBundle, batch_index: int) -> pd.DataFrame:
+    def get_batch_index_frame(self, batch_size: int, db: IndexedDataBundle, batch_index: int) -> Union[pd.DataFrame, np.ndarray]:
+        """
+        Returns either the index frame of the batch, or the integer positions of the batch's rows in ``db.index_frame``
+        """
         raise NotImplementedError()
 
 
@@ -23,33 +26,153 @@ class SequencialSampler(Sampler):
         return index
 
 
+class ShuffledSampler(Sampler):
+    """
+    Returns the rows of the index frame in the random order, without replacement, so each row is in exactly one batch per epoch.
+
+    The permutation is drawn once per epoch: when the batch 0 is requested, or when the index frame or the batch size changes.
+    The batches are returned as integer positions, so no index frame is copied by the sampler.
+    """
+    def __init__(self, random_state: Optional[int] = None):
+        self.random_state = random_state
+        self._random = None  # type: Optional[np.random.RandomState]
+        self._epoch_frame = None  # type: Optional[pd.DataFrame]
+        self._epoch_batch_size = None  # type: Optional[int]
+        self._epoch_permutation = None  # type: Optional[np.ndarray]
+
+    def get_batch_count(self, batch_size: int, db: IndexedDataBundle) -> int:
+        return int(math.ceil(db.index_frame.shape[0] / batch_size))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_random'] = None
+        state['_epoch_frame'] = None
+        state['_epoch_batch_size'] = None
+        state['_epoch_permutation'] = None
+        return state
+
+    def get_batch_index_frame(self, batch_size: int, db: IndexedDataBundle, batch_index: int) -> np.ndarray:
+        if batch_index == 0 or self._epoch_frame is not db.index_frame or self._epoch_batch_size != batch_size:
+            if self._random is None:
+                self._random = np.random.RandomState(self.random_state)
+            self._epoch_permutation = self._random.permutation(db.index_frame.shape[0])
+            self._epoch_frame = db.index_frame
+            self._epoch_batch_size = batch_size
+        return self._epoch_permutation[batch_size * batch_index:batch_size * (batch_index + 1)]
+
+
 class PriorityRandomSampler(Sampler):
+    """
+    Samples the rows of the index frame randomly, with the probabilities proportional to ``priority_column``
+    (or uniformly, if the column is not set).
+
+    The cumulative probability table is built once per epoch, and all the batches of the epoch are drawn in one
+    vectorized call. The epoch is redrawn when the batch 0 is requested, or when the index frame or the batch size changes.
+    The index frame is compared by identity, so changing the priorities inplace in the same frame is not detected.
+
+    If ``stratify_column`` is set, each batch contains the rows of each stratum in the amount proportional to the total priority
+    of the stratum. If ``replace`` is False, the rows are drawn without replacement within the epoch (if the epoch is longer
+    than the amount of rows with non-zero priority, the rows are reused only after all of them were drawn).
+    """
+
     def __init__(self,
                  priority_column: Optional[str] = None,
                  dataset_size_factor: float = 1.0,
                  random_state: Optional[int] = None,
-                 deduplicate=True):
+                 deduplicate=True,
+                 stratify_column: Optional[str] = None,
+                 replace: bool = True,
+                 ):
         self.priority_column = priority_column
         self.dataset_size_factor = dataset_size_factor
         self.random_state = random_state
         self.deduplicate = deduplicate
+        self.stratify_column = stratify_column
+        self.replace = replace
+        self._random = None
+        self._epoch_frame = None  # type: Optional[pd.DataFrame]
+        self._epoch_batch_size = None  # type: Optional[int]
+        self._epoch_positions = None  # type: Optional[np.ndarray]
 
     def get_batch_count(self, batch_size: int, db: IndexedDataBundle) -> int:
         return int(math.ceil(self.dataset_size_factor * db.index_frame.shape[0] / batch_size))
 
-    def get_batch_index_frame(self, batch_size: int, db: IndexedDataBundle, batch_index: int) -> pd.DataFrame:
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_random'] = None
+        state['_epoch_frame'] = None
+        state['_epoch_batch_size'] = None
+        state['_epoch_positions'] = None
+        return state
+
+    def _get_random(self):
+        if self._random is None:
+            self._random = np.random if self.random_state is None else np.random.RandomState(self.random_state)
+        return self._random
+
+    def _get_weights(self, index_frame: pd.DataFrame) -> np.ndarray:
         if self.priority_column is None:
-            probs = pd.Series([1 for _ in range(db.index_frame.shape[0])])
-        else:
-            probs = db.index_frame[self.priority_column]
-        probs = probs / probs.sum()
-        idx = list(np.random.choice(
-            list(range(len(db.index_frame.index))),
-            batch_size,
-            True,
-            probs
-        ))
-        result = db.index_frame.iloc[idx]
+            return np.ones(index_frame.shape[0], dtype=np.float64)
+        weights = index_frame[self.priority_column].to_numpy(dtype=np.float64)
+        if (weights < 0).any() or not (weights.sum() > 0):
+            raise ValueError(f'Priorities in the column `{self.priority_column}` must be non-negative with a positive sum')
+        return weights
+
+    def _draw(self, positions: np.ndarray, weights: np.ndarray, count: int) -> np.ndarray:
+        rnd = self._get_random()
+        if self.replace:
+            cumulative = np.cumsum(weights)
+            drawn = np.searchsorted(cumulative, rnd.random_sample(count) * cumulative[-1], side='right')
+            return positions[np.minimum(drawn, len(positions) - 1)]
+        non_zero = weights > 0
+        positions = positions[non_zero]
+        weights = weights[non_zero]
+        permutations = []
+        for _ in range(int(math.ceil(count / len(positions)))):
+            keys = rnd.exponential(size=len(positions)) / weights
+            permutations.append(positions[np.argsort(keys, kind='stable')])
+        return np.concatenate(permutations)[:count]
+
+    def _get_strata_counts(self, strata_weights: np.ndarray, batch_size: int) -> np.ndarray:
+        exact = batch_size * strata_weights / strata_weights.sum()
+        counts = np.floor(exact).astype(int)
+        remainder = batch_size - counts.sum()
+        if remainder > 0:
+            counts[np.argsort(-(exact - counts), kind='stable')[:remainder]] += 1
+        return counts
+
+    def _draw_epoch(self, batch_size: int, db: IndexedDataBundle) -> np.ndarray:
+        batch_count = self.get_batch_count(batch_size, db)
+        weights = self._get_weights(db.index_frame)
+        positions = np.arange(len(weights))
+        if self.stratify_column is None:
+            return self._draw(positions, weights, batch_count * batch_size).reshape(batch_count, batch_size)
+        codes, _ = pd.factorize(db.index_frame[self.stratify_column])
+        strata = np.unique(codes)
+        strata_weights = np.array([weights[codes == stratum].sum() for stratum in strata])
+        counts = self._get_strata_counts(strata_weights, batch_size)
+        parts = []
+        for stratum, count in zip(strata, counts):
+            if count == 0:
+                continue
+            in_stratum = codes == stratum
+            drawn = self._draw(positions[in_stratum], weights[in_stratum], batch_count * count)
+            parts.append(drawn.reshape(batch_count, count))
+        result = np.concatenate(parts, axis=1)
+        shuffle = np.argsort(self._get_random().random_sample(result.shape), axis=1)
+        return np.take_along_axis(result, shuffle, axis=1)
+
+    def get_batch_index_frame(self, batch_size: int, db: IndexedDataBundle, batch_index: int) -> pd.DataFrame:
+        if (
+                batch_index == 0
+                or self._epoch_frame is not db.index_frame
+                or self._epoch_batch_size != batch_size
+                or batch_index >= self._epoch_positions.shape[0]
+        ):
+            self._epoch_positions = self._draw_epoch(batch_size, db)
+            self._epoch_frame = db.index_frame
+            self._epoch_batch_size = batch_size
+        result = db.index_frame.iloc[self._epoch_positions[batch_index]]
         if self.deduplicate:
             result = result[~result.duplicated()]
         return result
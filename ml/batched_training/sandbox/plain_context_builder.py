@@ -5,44 +5,56 @@ import numpy as np
 
 
 class PlainContextBuilder(btc.ContextBuilder): #TODO sentence_id from src
+    """
+    Builds the context of the words within their sentences. The sentence limits are computed once per ``bundle.src``
+    (in ``fit`` or on the first batch of a new bundle), and the context rows are generated with numpy arithmetic
+    """
     def __init__(self,
                  include_zero_offset = False,
                  left_to_right_contexts_proportion: float = 0):
-        rows = []
-        for i in range(1, 50):
-            for j in range(1, i + 1):
-                rows.append(dict(context_length=i, offset=j))
         self.sentence_id_column_name = 'sentence_id'
         self.word_id_column_name = 'word_id'
-        self.of_df = pd.DataFrame(rows).set_index('context_length')
         self.include_zero_offset = include_zero_offset
         self.left_to_right_contexts_proportion = left_to_right_contexts_proportion
+        self._limits_src = None
+        self._sentence_limits = None
 
-    def build_partial_context(self,
-                                index_frame: pd.DataFrame,
-                                sentence_limits: pd.DataFrame,
-                                context_size: int,
-                                is_left: bool
-                           ):
-        df = index_frame.merge(sentence_limits, left_on='sentence_id', right_index=True)
+    def _get_sentence_limits(self, src: pd.DataFrame) -> pd.DataFrame:
+        if getattr(self, '_limits_src', None) is not src:
+            self._sentence_limits = (src
+                                     .groupby(self.sentence_id_column_name)
+                                     [self.word_id_column_name].aggregate(['min', 'max'])
+                                     .rename(columns=dict(min='sentence_begin', max='sentence_end'))
+                                     )
+            self._limits_src = src
+        return self._sentence_limits
 
-        if is_left:
-            df['cl'] = df.word_id - context_size
-            df.cl = np.maximum(df.cl, df.sentence_begin)
-            df.cl = df.word_id - df.cl
-        else:
-            df['cl'] = df.word_id + context_size
-            df.cl = np.minimum(df.cl, df.sentence_end)
-            df.cl = df.cl - df.word_id
+    def fit(self, ibundle: bt.IndexedDataBundle):
+        self._get_sentence_limits(ibundle.bundle.src)
 
-        df = df[['word_id', 'cl']].merge(self.of_df, left_on='cl', right_index=True)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_limits_src'] = None
+        state['_sentence_limits'] = None
+        return state
 
+    def build_partial_context(self,
+                              index: pd.Index,
+                              word_id: np.ndarray,
+                              context_length: np.ndarray,
+                              is_left: bool
+                              ) -> pd.DataFrame:
+        """
+        For each sample, generates ``context_length`` rows with the offsets 1, 2, ... (or -1, -2, ... if ``is_left``)
+        """
+        context_length = np.maximum(context_length, 0)
+        rows = np.repeat(np.arange(len(word_id)), context_length)
+        starts = np.cumsum(context_length) - context_length
+        offset = np.arange(len(rows)) - np.repeat(starts, context_length) + 1
         if is_left:
-            df.offset *= -1
-
-        df['another_word_id'] = df.word_id + df['offset']
-        df = df.set_index('offset', append=True)[['another_word_id']]
-        return df
+            offset = -offset
+        df = pd.DataFrame(dict(another_word_id=word_id[rows] + offset), index=index[rows])
+        return df.set_index(pd.Index(offset, name='offset'), append=True)
 
     def get_left_and_right_sizes(self, context_size):
         if self.include_zero_offset:
@@ -56,26 +68,24 @@ class PlainContextBuilder(btc.ContextBuilder): #TODO sentence_id from src
 
 
     def build_context(self, ibundle: bt.IndexedDataBundle, context_size) -> pd.DataFrame:
-        fake_index_frame = ibundle.index_frame[[self.sentence_id_column_name, self.word_id_column_name]]
-        fake_index_frame = fake_index_frame.rename(columns={self.sentence_id_column_name: 'sentence_id', self.word_id_column_name: 'word_id'})
-        sl_df = (ibundle.bundle.src.loc[ibundle.bundle.src.sentence_id.isin(fake_index_frame.sentence_id)]
-                .groupby('sentence_id')
-                .word_id.aggregate(['min', 'max'])
-                .rename(columns=dict(min='sentence_begin', max='sentence_end'))
-                 )
+        index_frame = ibundle.index_frame
+        limits = self._get_sentence_limits(ibundle.bundle.src)
+        positions = limits.index.get_indexer(index_frame[self.sentence_id_column_name])
+        found = positions >= 0
+        index = index_frame.index[found]
+        word_id = index_frame[self.word_id_column_name].to_numpy()
+        positions = positions[found]
         frames = []
         left_size, right_size = self.get_left_and_right_sizes(context_size)
         if self.include_zero_offset:
-            frames.append(fake_index_frame[['word_id']]
-                          .rename(columns=dict(word_id='another_word_id'))
-                          .assign(offset=0)
-                          .set_index('offset',append=True)
+            frames.append(pd.DataFrame(dict(another_word_id=word_id), index=index_frame.index)
+                          .set_index(pd.Index(np.zeros(len(word_id), dtype=np.int64), name='offset'), append=True)
                           )
+        word_id = word_id[found]
         if left_size>0:
-            frames.append(self.build_partial_context(fake_index_frame, sl_df, left_size, True))
+            begin = limits.sentence_begin.to_numpy()[positions]
+            frames.append(self.build_partial_context(index, word_id, np.minimum(left_size, word_id - begin), True))
         if right_size>0:
-            frames.append(self.build_partial_context(fake_index_frame, sl_df, right_size, False))
+            end = limits.sentence_end.to_numpy()[positions]
+            frames.append(self.build_partial_context(index, word_id, np.minimum(right_size, end - word_id), False))
         return pd.concat(frames)
-
-
-
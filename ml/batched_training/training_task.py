@@ -4,6 +4,8 @@ import copy
 import os
 import time
 
+from concurrent.futures import Executor, ThreadPoolExecutor
+
 import numpy as np
 import pandas as pd
 
@@ -11,6 +13,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 
 from .batcher import Batcher
+from .prefetcher import BatchPrefetcher
 from .data_bundle import DataBundle, IndexedDataBundle
 from .model_handler import BatchedModelHandler
 from ..training_core import AbstractTrainingTask, TrainingEnvironment, Splitter, MetricPool, DataFrameSplit, TrainingResult, ArtificierArguments, IdentitySplitter
@@ -22,6 +25,13 @@ class TrainingSettings:
     Settings of the training process
     """
 
+    # Defaults of the settings that were added later, so the settings pickled before them still work
+    prefetch_batches = None
+    evaluation_workers = None
+    evaluation_period = None
+    evaluation_sample_size = None
+    fitting_batch_count = None
+
     def __init__(self,
                  epoch_count: int = 100,
                  batch_size: int = 10000,
@@ -37,12 +47,22 @@ class TrainingSettings:
                  delay_after_iteration_in_seconds: Optional[float] = None,
                  index_frame_name_in_bundle: str = 'index',
                  skip_training_in_first_epoch: bool = False,
-                 verbose: bool = True
+                 verbose: bool = True,
+                 prefetch_batches: Optional[int] = None,
+                 evaluation_workers: Optional[int] = None,
+                 evaluation_period: Optional[int] = None,
+                 evaluation_sample_size: Optional[int] = None,
+                 fitting_batch_count: Optional[int] = None
                  ):
         """
 
         Args:
             epoch_count: for how much epochs the process should lasts
+            prefetch_batches: if set, this amount of the next training batches are built in background threads while the model is trained on the current one
+            evaluation_workers: if set, the evaluation batches of all the test splits are built concurrently by this amount of threads, while the model predicts them one by one
+            evaluation_period: if set, the evaluation is only performed at every `evaluation_period`-th training report and at the last epoch
+            evaluation_sample_size: if set, each test split is evaluated on the fixed random sample of this size, chosen once per training; `test_splits` of the training result contain the sampled index
+            fitting_batch_count: if set, the extractors that support `partial_fit` are fitted on this amount of training batches instead of the first one
         """
         self.epoch_count = epoch_count
         self.continue_training = continue_training
@@ -59,6 +79,11 @@ class TrainingSettings:
         self.index_frame_name_in_bundle = index_frame_name_in_bundle
         self.skip_training_in_first_epoch = skip_training_in_first_epoch
         self.verbose = verbose
+        self.prefetch_batches = prefetch_batches
+        self.evaluation_workers = evaluation_workers
+        self.evaluation_period = evaluation_period
+        self.evaluation_sample_size = evaluation_sample_size
+        self.fitting_batch_count = fitting_batch_count
 
     def mini_batches_are_requried(self):
         return self.mini_batch_size is not None
@@ -69,8 +94,10 @@ class _TrainingTempData:
         self.original_ibundle = ibundle
         self.env = env
         self.split = split
+        self.evaluation_tests = split.tests  # type: Dict[str, pd.Index]
         self.first_iteration = first_iteration
         self.iteration = 0
+        self.is_last_epoch = False
         self.losses = []
         self.epoch_begins_at = None  # type: Optional[datetime]
         self.train_bundle = None  # type: Optional[IndexedDataBundle]
@@ -123,7 +150,7 @@ class BatchedTrainingTask(AbstractTrainingTask):
         self.history = []
 
         Logger.info('Fitting the transformers')
-        test_batch = self.batcher.fit_extract(self.settings.batch_size, ibundle)
+        test_batch = self.batcher.fit_extract(self.settings.batch_size, ibundle, self.settings.fitting_batch_count)
 
         Logger.info('Instantiating model')
         self.model_handler.instantiate(self, test_batch)
@@ -172,6 +199,9 @@ class BatchedTrainingTask(AbstractTrainingTask):
         if self.batcher is None:
             raise ValueError('batcher was not set up in late_initialization nor in constructor')
 
+        Logger.info('Loading the columns required by batcher')
+        self.batcher.load_required_columns(ibundle)
+
         Logger.info('Preprocessing bundle by batcher')
         self.batcher.preprocess_bundle(ibundle)
 
@@ -186,7 +216,9 @@ class BatchedTrainingTask(AbstractTrainingTask):
         else:
             Logger.info('Continued training.')
             first_iteration = len(self.history)
-        return _TrainingTempData(ibundle, env, split, first_iteration)
+        temp_data = _TrainingTempData(ibundle, env, split, first_iteration)
+        temp_data.evaluation_tests = self._get_evaluation_tests(split)
+        return temp_data
 
     def generate_sample_batch_and_temp_data(self, bundle: DataBundle, batch_index: int = 0, from_split=None, force_default_strategy=False):
         temp_data = self._prepare_all(bundle, None)
@@ -221,42 +253,81 @@ class BatchedTrainingTask(AbstractTrainingTask):
 
     # region Prediction
 
-    def _evaluation_for_one_stage(self, ibundle: IndexedDataBundle, stage_name: str):
-        dfs = []
+    def _get_evaluation_tests(self, split: DataFrameSplit) -> Dict[str, pd.Index]:
+        if self.settings.evaluation_sample_size is None:
+            return split.tests
+        tests = {}
+        for stage_name, stage_index in split.tests.items():
+            if len(stage_index) > self.settings.evaluation_sample_size:
+                positions = np.random.RandomState(0).choice(len(stage_index), self.settings.evaluation_sample_size, replace=False)
+                stage_index = stage_index[np.sort(positions)]
+            tests[stage_name] = stage_index
+        return tests
+
+    def _create_evaluation_prefetcher(self, ibundle: IndexedDataBundle, executor: Optional[Executor] = None) -> BatchPrefetcher:
         batch_count = self.batcher.get_batch_count(self.settings.batch_size, ibundle, True)
         if batch_count == 0:
             raise ValueError('There is no batches!')
+        if self.settings.evaluation_batch_limit is not None:
+            batch_count = min(batch_count, self.settings.evaluation_batch_limit)
+        return BatchPrefetcher(
+            self.batcher,
+            self.settings.batch_size,
+            ibundle,
+            batch_count,
+            True,
+            self.settings.evaluation_workers,
+            executor
+        )
+
+    def _evaluation_for_one_stage(self, prefetcher: BatchPrefetcher, stage_name: str):
+        dfs = []
+        batch_count = prefetcher.batch_count
         evaluation_begin = datetime.now()
         for i in range(0, batch_count):
             self._wait_till_end_of_quite_hours()
             iteration_begin = datetime.now()
             if self.settings.evaluation_time_limit is not None and iteration_begin - evaluation_begin > self.settings.evaluation_time_limit:
                 break
-            if self.settings.evaluation_batch_limit is not None and i >= self.settings.evaluation_batch_limit:
-                break
             if self.settings.verbose:
                 Logger.info(f"Evaluating {stage_name}: {i}/{batch_count}")
-            batch = self.batcher.get_batch(self.settings.batch_size, ibundle, i, True)
+            batch = prefetcher.get_batch(i)
             df_addition = self.model_handler.predict(batch)
             dfs.append(df_addition)
         df = pd.concat(dfs, sort=False)
         return df
 
-    def _evaluation_df(self, ibundle: IndexedDataBundle, split: DataFrameSplit):
+    def _evaluation_df(self, ibundle: IndexedDataBundle, tests: Dict[str, pd.Index]):
         dfs = []
-        for stage_name, stage_index in split.tests.items():
-            bundle_with_index = ibundle.change_index(stage_index)
-            df = self._evaluation_for_one_stage(bundle_with_index, stage_name)
-            df['stage'] = stage_name
-            dfs.append(df)
+        executor = None
+        if self.settings.evaluation_workers:
+            executor = ThreadPoolExecutor(max_workers=self.settings.evaluation_workers)
+        prefetchers = {}
+        try:
+            for stage_name, stage_index in tests.items():
+                prefetchers[stage_name] = self._create_evaluation_prefetcher(ibundle.change_index(stage_index), executor)
+            for prefetcher in prefetchers.values():
+                prefetcher.start()
+            for stage_name, prefetcher in prefetchers.items():
+                df = self._evaluation_for_one_stage(prefetcher, stage_name)
+                prefetcher.close()
+                df['stage'] = stage_name
+                dfs.append(df)
+        finally:
+            for prefetcher in prefetchers.values():
+                prefetcher.close()
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
         if len(dfs)>0:
             return pd.concat(dfs, sort=False)
         return pd.DataFrame([])
 
     def predict(self, ibundle: Union[str, Path, DataBundle, IndexedDataBundle]):
         ibundle = self._ensure_bundle(ibundle, self.settings.index_frame_name_in_bundle)
+        self.batcher.load_required_columns(ibundle)
         self.batcher.preprocess_bundle(ibundle)
-        return self._evaluation_for_one_stage(ibundle, 'prediction')
+        with self._create_evaluation_prefetcher(ibundle) as prefetcher:
+            return self._evaluation_for_one_stage(prefetcher, 'prediction')
 
     # endregion
 
@@ -268,15 +339,24 @@ class BatchedTrainingTask(AbstractTrainingTask):
                 time.sleep(60)
                 Logger.info("Quite time")
 
+    def _is_evaluation_required(self, temp_data: _TrainingTempData):
+        if self.settings.evaluation_period is None or temp_data.is_last_epoch:
+            return True
+        return (temp_data.iteration + 1) % self.settings.evaluation_period == 0
+
     def _training_report(self, temp_data: _TrainingTempData):
         result = TrainingResult()
         temp_data.result = result
-        result.result_df = self._evaluation_df(temp_data.original_ibundle, temp_data.split)
+        if self._is_evaluation_required(temp_data):
+            result.result_df = self._evaluation_df(temp_data.original_ibundle, temp_data.evaluation_tests)
+        else:
+            Logger.info('Evaluation skipped because of evaluation_period')
+            result.result_df = pd.DataFrame([])
 
         result.model = self.model_handler
         result.batcher = self.batcher
         result.training_task = self
-        result.test_splits = temp_data.split.tests
+        result.test_splits = temp_data.evaluation_tests
         result.train_split = temp_data.split.train
 
         result.metrics = {}
@@ -322,21 +402,32 @@ class BatchedTrainingTask(AbstractTrainingTask):
             return False
         return True
 
+    def _create_training_prefetcher(self, temp_data: _TrainingTempData, batch_count: int) -> BatchPrefetcher:
+        return BatchPrefetcher(
+            self.batcher,
+            self.settings.batch_size,
+            temp_data.train_bundle,
+            batch_count,
+            False,
+            self.settings.prefetch_batches
+        )
+
     def _train_simple_epoch(self, temp_data: _TrainingTempData):
         temp_data.losses = []
         temp_data.epoch_begins_at = datetime.now()
         batch_count = self.batcher.get_batch_count(self.settings.batch_size, temp_data.train_bundle)
         if batch_count == 0:
             raise ValueError('There is no batches!')
-        for i in range(0, batch_count):
-            if not self._check_training_time_conditions(temp_data, i):
-                break
-            if self.settings.verbose:
-                Logger.info(f"Training: {i}/{batch_count}")
-            batch = self.batcher.get_batch(self.settings.batch_size, temp_data.train_bundle, i)
-            temp_data.batch = batch
-            loss = self.model_handler.train(batch)
-            temp_data.losses.append(loss)
+        with self._create_training_prefetcher(temp_data, batch_count) as prefetcher:
+            for i in range(0, batch_count):
+                if not self._check_training_time_conditions(temp_data, i):
+                    break
+                if self.settings.verbose:
+                    Logger.info(f"Training: {i}/{batch_count}")
+                batch = prefetcher.get_batch(i)
+                temp_data.batch = batch
+                loss = self.model_handler.train(batch)
+                temp_data.losses.append(loss)
         self._training_report(temp_data)
 
     def _train_epoch_with_minibatches(self, temp_data: _TrainingTempData):
@@ -347,28 +438,36 @@ class BatchedTrainingTask(AbstractTrainingTask):
             raise ValueError('There is no batches!')
         terminate = False
 
-        for i in range(0, batch_count):
-            if terminate:
-                break
-            batch = self.batcher.get_batch(self.settings.batch_size, temp_data.train_bundle, i)
-            temp_data.batch = batch
-            mini_epochs = self.settings.mini_epoch_count or 1
-            for j in range(0, mini_epochs):
-                if not self._check_training_time_conditions(temp_data, i):
-                    terminate = True
+        with self._create_training_prefetcher(temp_data, batch_count) as prefetcher:
+            for i in range(0, batch_count):
+                if terminate:
                     break
-                if self.settings.verbose:
-                    Logger.info(f"Training: {i}/{batch_count} batch, {j}/{mini_epochs} mini-epoch")
-                mini_indices = self.batcher.get_mini_batch_indices(self.settings.mini_batch_size, batch)
-                temp_data.mini_batch_indices = mini_indices
-                for mini_index in mini_indices:
-                    mini_batch = self.batcher.get_mini_batch(mini_index, batch)
-                    temp_data.mini_batch = mini_batch
-                    loss = self.model_handler.train(mini_batch)
-                    temp_data.losses.append(loss)
-
-                if not self.settings.mini_reporting_conventional:
-                    self._training_report(temp_data)
+                batch = prefetcher.get_batch(i)
+                temp_data.batch = batch
+                slicer = self.batcher.create_mini_batch_slicer(batch)
+                mini_epochs = self.settings.mini_epoch_count or 1
+                for j in range(0, mini_epochs):
+                    if not self._check_training_time_conditions(temp_data, i):
+                        terminate = True
+                        break
+                    if self.settings.verbose:
+                        Logger.info(f"Training: {i}/{batch_count} batch, {j}/{mini_epochs} mini-epoch")
+                    if slicer is not None:
+                        mini_indices = self.batcher.get_mini_batch_positions(self.settings.mini_batch_size, batch)
+                    else:
+                        mini_indices = self.batcher.get_mini_batch_indices(self.settings.mini_batch_size, batch)
+                    temp_data.mini_batch_indices = mini_indices
+                    for mini_index in mini_indices:
+                        if slicer is not None:
+                            mini_batch = slicer.get_mini_batch(mini_index)
+                        else:
+                            mini_batch = self.batcher.get_mini_batch(mini_index, batch)
+                        temp_data.mini_batch = mini_batch
+                        loss = self.model_handler.train(mini_batch)
+                        temp_data.losses.append(loss)
+
+                    if not self.settings.mini_reporting_conventional:
+                        self._training_report(temp_data)
 
         if self.settings.mini_reporting_conventional:
             self._training_report(temp_data)
@@ -388,6 +487,7 @@ class BatchedTrainingTask(AbstractTrainingTask):
 
         for i in range(self.settings.epoch_count):
             Logger.info(f"Epoch {i} of {self.settings.epoch_count}")
+            temp_data.is_last_epoch = i == self.settings.epoch_count - 1
             if i == 0 and self.settings.skip_training_in_first_epoch:
                 Logger.info('Training skipped for the first epoch as requested by settings')
                 self._training_report_for_evaluation_only(temp_data)
@@ -1,7 +1,9 @@
 from typing import *
 
+import numpy as np
 import pandas as pd
 
+from scipy import sparse
 from sklearn.base import BaseEstimator, TransformerMixin
 
 
@@ -23,20 +25,50 @@ class DataFrameColumnsTransformer:
         """
         raise NotImplementedError()
 
+    def partial_fit(self, df: pd.DataFrame) -> None:
+        """
+        Updates the training with one more portion of the data. After each call, the transformer is ready to transform
+        and is equivalent (exactly or approximately) to the one fitted on all the portions at once.
+        """
+        raise NotImplementedError(f'{type(self)} does not support partial_fit')
+
+    def supports_partial_fit(self) -> bool:
+        """
+        Returns True if the transformer can be fitted with ``partial_fit``
+        """
+        return False
+
+    def begin_partial_fit(self) -> None:
+        """
+        Drops the statistics accumulated by the previous ``partial_fit`` calls, so the next call starts a new fit
+        """
+        pass
+
     def get_columns(self) -> List[str]:
         """
         Returns the columns this transformer operates on
         """
         raise NotImplementedError()
 
+    def _compile(self):
+        """
+        Returns the ``CompiledStep`` that reproduces the fitted transformer with numpy,
+        or None if the transformer cannot be compiled and must run as is.
+        """
+        return None
+
 
 class DataFrameTransformer(BaseEstimator, TransformerMixin):
     """
     Sklearn transformer that processes dataframes into dataframes while preserving column names
+
+    If ``sparse_output`` is True, the blocks produced by the column transformers are assembled into a scipy CSR matrix,
+    and the result is a dataframe of pandas sparse float columns. All the blocks must be numeric in this case.
     """
 
-    def __init__(self, transformers: List[DataFrameColumnsTransformer]):
+    def __init__(self, transformers: List[DataFrameColumnsTransformer], sparse_output: bool = False):
         self.transformers = transformers
+        self.sparse_output = sparse_output
 
     def fit_transform(self, df: pd.DataFrame, y=None, **kwargs) -> pd.DataFrame:
         self.fit(df, y)
@@ -58,14 +90,60 @@ class DataFrameTransformer(BaseEstimator, TransformerMixin):
                 raise ValueError(f'Something strange has happened with dataframe with columns `{",".join(c for c in d.columns[:3])}...`: the index does not match the original frame')
         if len(buffer) == 0:
             result = df[[]]
+        elif getattr(self, 'sparse_output', False):
+            result = pd.DataFrame.sparse.from_spmatrix(
+                DataFrameTransformer._to_sparse_matrix(buffer),
+                index=df.index,
+                columns=[c for d in buffer for c in d.columns]
+            )
         else:
             result = pd.concat(buffer, axis=1)
         return result
 
+    @staticmethod
+    def _to_sparse_matrix(blocks: List[pd.DataFrame]) -> sparse.csr_matrix:
+        matrices = []
+        for block in blocks:
+            if all(isinstance(dtype, pd.SparseDtype) for dtype in block.dtypes):
+                matrices.append(block.sparse.to_coo().astype(np.float64))
+            else:
+                try:
+                    values = block.to_numpy(dtype=np.float64)
+                except (ValueError, TypeError) as ex:
+                    raise ValueError(f'Sparse output requires numeric blocks, but the block with columns `{",".join(str(c) for c in block.columns[:3])}...` is not numeric') from ex
+                matrices.append(sparse.csr_matrix(values))
+        return sparse.hstack(matrices, format='csr')
+
     def fit(self, df: pd.DataFrame, y=None):
         for transformer in self.transformers:
             transformer.fit(df)
         return self
 
+    def supports_partial_fit(self) -> bool:
+        return all(transformer.supports_partial_fit() for transformer in self.transformers)
+
+    def begin_partial_fit(self, df: Optional[pd.DataFrame] = None):
+        for transformer in self.transformers:
+            transformer.begin_partial_fit()
+        return self
+
+    def partial_fit(self, df: pd.DataFrame, y=None):
+        for transformer in self.transformers:
+            transformer.partial_fit(df)
+        return self
+
     def get_columns(self):
         return [c for tr in self.transformers for c in tr.get_columns()]
+
+    def compile(self, sample: Optional[pd.DataFrame] = None):
+        """
+        Returns ``CompiledDataFrameTransformer`` that produces the same columns as this fitted transformer,
+        as a single float32 array. The transformers that cannot be compiled are executed as is within the compiled one;
+        if ``sample`` (e.g. the data of the fit) is provided, their output columns are learnt from it at once.
+        """
+        from .compiled_transformer import CompiledDataFrameTransformer, FallbackStep
+        steps = []
+        for transformer in self.transformers:
+            step = transformer._compile()
+            steps.append(step if step is not None else FallbackStep(transformer, sample))
+        return CompiledDataFrameTransformer(steps)
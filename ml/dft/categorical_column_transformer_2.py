@@ -4,6 +4,7 @@ import pandas as pd
 import numpy as np
 
 from .architecture import DataFrameColumnsTransformer
+from .compiled_transformer import CodesStep
 
 
 class ColumnData:
@@ -20,44 +21,68 @@ class ColumnData:
         self.null_index = null_index
         self.missing_index = missing_index
 
-    def transform(self, df, ignore_missing_columns):
-        if self.input_column in df.columns:
-            series = df[self.input_column]
-        else:
+    def _get_values_index(self) -> pd.Index:
+        # Built lazily, so the objects pickled before this field was introduced still work
+        if getattr(self, 'values_index_', None) is None:
+            values = [None] * len(self.mapping)
+            for value, code in self.mapping.items():
+                values[code] = value
+            self.values_index_ = pd.Index(values, dtype='object')
+        return self.values_index_
+
+    def get_codes(self, df: pd.DataFrame, ignore_missing_columns: bool) -> np.ndarray:
+        """
+        Returns the position of the output column for each row of the dataframe
+        """
+        if self.input_column not in df.columns:
             if ignore_missing_columns:
-                series = pd.Series(None, df.index, dtype='object')
+                return np.full(df.shape[0], self.null_index, dtype=np.int64)
             else:
                 raise ValueError(f"Column {self.input_column} is not in input")
-
+        series = df[self.input_column]
         try:
-            result = pd.Series(
-                np.where(
-                    series.isnull(),
-                    self.null_index,
-                    np.where(
-                        series.isin(self.mapping),
-                        series.replace(self.mapping),
-                        self.missing_index)
-                ),
-                dtype='int',
-                index=df.index
-            )
+            codes = self._get_values_index().get_indexer(series.astype('object'))
+            codes[codes < 0] = self.missing_index
+            codes[series.isnull().values] = self.null_index
         except Exception as exp:
             raise ValueError(f'Error when processing column {self.input_column}') from exp
-        return result
+        return codes
+
+    def transform(self, df, ignore_missing_columns):
+        return pd.Series(self.get_codes(df, ignore_missing_columns), dtype='int', index=df.index)
 
 
 class CategoricalTransformer2(DataFrameColumnsTransformer):
+    """
+    Encodes the categorical columns, keeping at most ``max_values`` values per column (including OTHER and NULL).
+
+    ``output`` defines the produced frame:
+      * ``'dense'``: one-hot columns of ``dtype``
+      * ``'sparse'``: the same one-hot columns, but as pandas sparse columns
+      * ``'codes'``: one integer column per input column with the index of the value, in the order of the one-hot columns
+
+    ``dtype`` defaults to ``np.int64`` for ``'codes'`` and to ``np.float64`` otherwise.
+    """
+    TRACKED_VALUES_PER_MAX_VALUE = 100
+
     def __init__(self,
                  columns: List,
                  max_values: int,
-                 ignore_missing_columns_on_transform=True
+                 ignore_missing_columns_on_transform=True,
+                 output: str = 'dense',
+                 dtype: Any = None
                  ):
+        if output not in ('dense', 'sparse', 'codes'):
+            raise ValueError(f'`output` must be `dense`, `sparse` or `codes`, but was {output}')
         self.columns = columns
         self.max_values = max_values
         self.column_data_ = None  # type: Optional[List[ColumnData]]
         self.output_column_names_ = None  # type: Optional[List[str]]
         self.ignore_missing_columns_on_transform = ignore_missing_columns_on_transform
+        self.output = output
+        if dtype is None:
+            dtype = np.int64 if output == 'codes' else np.float64
+        self.dtype = dtype
 
     def _fit_column(self, df, column):
         if column not in df.columns:
@@ -65,17 +90,16 @@ class CategoricalTransformer2(DataFrameColumnsTransformer):
                 raise ValueError(f"Column {column} not in the dataframe")
             else:
                 return None
+        vals = df.groupby(column).size().sort_values(ascending=False).index
+        return self._create_column_data(column, vals, df[column].isnull().any())
 
-        special_values = []
+    def _create_column_data(self, column, vals: pd.Index, has_nulls: bool):
         max_values = self.max_values
-        has_nulls = False
         has_others = False
 
-        if df[column].isnull().any():
+        if has_nulls:
             max_values -= 1
-            has_nulls = True
 
-        vals = df.groupby(column).size().sort_values(ascending=False).index
         if len(vals) > max_values:
             max_values -= 1
             has_others = True
@@ -106,28 +130,118 @@ class CategoricalTransformer2(DataFrameColumnsTransformer):
             index_other
         )
 
+    def supports_partial_fit(self) -> bool:
+        return True
+
+    def begin_partial_fit(self) -> None:
+        self.value_counts_ = None
+        self.has_nulls_ = None
+
+    def partial_fit(self, df: pd.DataFrame) -> None:
+        """
+        Accumulates the counts of the values. To bound the memory, only the most frequent values are tracked
+        (``TRACKED_VALUES_PER_MAX_VALUE`` times ``max_values``), so the counts of the rare values are approximate.
+        """
+        if getattr(self, 'value_counts_', None) is None:
+            self.value_counts_ = {}  # type: Dict[Any, Dict[Any, int]]
+            self.has_nulls_ = {}  # type: Dict[Any, bool]
+        tracked_count = CategoricalTransformer2.TRACKED_VALUES_PER_MAX_VALUE * self.max_values
+        for column in self.columns:
+            if column not in df.columns:
+                if not self.ignore_missing_columns_on_transform:
+                    raise ValueError(f"Column {column} not in the dataframe")
+                continue
+            counts = self.value_counts_.setdefault(column, {})
+            for value, count in df.groupby(column).size().items():
+                counts[value] = counts.get(value, 0) + count
+            if len(counts) > 2 * tracked_count:
+                top = sorted(counts.items(), key=lambda z: -z[1])[:tracked_count]
+                self.value_counts_[column] = dict(top)
+            self.has_nulls_[column] = self.has_nulls_.get(column, False) or bool(df[column].isnull().any())
+
+        self.column_data_ = []
+        for column in self.columns:
+            if column not in self.value_counts_:
+                continue
+            vals = pd.Series(self.value_counts_[column], dtype='int64').sort_values(ascending=False, kind='stable').index
+            self.column_data_.append(self._create_column_data(column, vals, self.has_nulls_[column]))
+        self.output_column_names_ = []
+        for c in self.column_data_:
+            self.output_column_names_.extend(c.output_columns)
+
     def get_columns(self) -> List[str]:
         return self.columns
 
     def fit(self, df: pd.DataFrame) -> None:
+        self.begin_partial_fit()
         self.column_data_ = [self._fit_column(df, c) for c in self.columns]
         self.column_data_ = [c for c in self.column_data_ if c is not None]
         self.output_column_names_ = []
         for c in self.column_data_:
             self.output_column_names_.extend(c.output_columns)
 
-    def transform(self, df: pd.DataFrame) -> Iterable[Union[pd.DataFrame, pd.Series]]:
-        matrix = np.zeros((df.shape[0], len(self.output_column_names_)))
-        rows = list(range(df.shape[0]))
-        shift = 0
+    def _get_codes(self, df: pd.DataFrame) -> List[np.ndarray]:
         if self.column_data_ is None:
             raise ValueError('CategoricalTransformer2 was not fitted')
-        for c in self.column_data_:
-            if hasattr(self, 'ignore_missing_columns_on_transform'):
-                columns = c.transform(df, self.ignore_missing_columns_on_transform)
-            else:  # TODO: legacy, remove
-                columns = c.transform(df, True)
-            columns += shift
-            matrix[rows, columns] = 1
+        # TODO: legacy, remove the default
+        ignore_missing_columns = getattr(self, 'ignore_missing_columns_on_transform', True)
+        return [c.get_codes(df, ignore_missing_columns) for c in self.column_data_]
+
+    def _get_one_hot_positions(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Returns the matrix (rows x input columns) with the positions of the one-hot columns that are set to 1
+        """
+        result = np.empty((df.shape[0], len(self.column_data_)), dtype=np.int64)
+        shift = 0
+        for i, (c, codes) in enumerate(zip(self.column_data_, self._get_codes(df))):
+            result[:, i] = codes + shift
             shift += len(c.output_columns)
+        return result
+
+    def transform_into(self, df: pd.DataFrame, buffer: np.ndarray) -> np.ndarray:
+        """
+        Writes the dense one-hot encoding of the dataframe into the provided buffer of the shape (rows, output columns)
+        and of any numeric dtype, so the same buffer can be reused across batches.
+        """
+        expected_shape = (df.shape[0], len(self.output_column_names_))
+        if buffer.shape != expected_shape:
+            raise ValueError(f'Buffer is expected to have shape {expected_shape}, but has {buffer.shape}')
+        buffer[:] = 0
+        positions = self._get_one_hot_positions(df)
+        buffer[np.arange(df.shape[0])[:, np.newaxis], positions] = 1
+        return buffer
+
+    def transform(self, df: pd.DataFrame) -> Iterable[Union[pd.DataFrame, pd.Series]]:
+        output = getattr(self, 'output', 'dense')
+        dtype = getattr(self, 'dtype', np.float64)
+        if output == 'codes':
+            codes = self._get_codes(df)
+            return [pd.DataFrame({c.input_column: code.astype(dtype) for c, code in zip(self.column_data_, codes)}, index=df.index)]
+        if output == 'sparse':
+            from scipy import sparse
+            positions = self._get_one_hot_positions(df)
+            rows = np.repeat(np.arange(df.shape[0]), positions.shape[1])
+            matrix = sparse.csr_matrix(
+                (np.ones(positions.size, dtype=dtype), (rows, positions.ravel())),
+                shape=(df.shape[0], len(self.output_column_names_))
+            )
+            result = pd.DataFrame.sparse.from_spmatrix(matrix, index=df.index, columns=self.output_column_names_)
+            return [result]
+        matrix = np.zeros((df.shape[0], len(self.output_column_names_)), dtype=dtype)
+        self.transform_into(df, matrix)
         return [pd.DataFrame(matrix, columns=self.output_column_names_, index=df.index)]
+
+    def _compile(self):
+        output = getattr(self, 'output', 'dense')
+        if output == 'sparse':
+            return None
+        if self.column_data_ is None:
+            raise ValueError('CategoricalTransformer2 was not fitted')
+        one_hot = output == 'dense'
+        return CodesStep(
+            self.column_data_,
+            [len(c.output_columns) for c in self.column_data_],
+            self.output_column_names_ if one_hot else [c.input_column for c in self.column_data_],
+            one_hot,
+            getattr(self, 'ignore_missing_columns_on_transform', True)
+        )
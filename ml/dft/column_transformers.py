@@ -4,11 +4,12 @@ import pandas as pd
 import copy
 import numpy as np
 
-from sklearn.impute import SimpleImputer
-from sklearn.preprocessing import StandardScaler
+from sklearn.impute import SimpleImputer, MissingIndicator
+from sklearn.preprocessing import StandardScaler, MinMaxScaler
 
 from .architecture import DataFrameColumnsTransformer
 from .miscellaneous import MissingIndicatorWithReporting
+from .compiled_transformer import ContinuousStep
 from ..._common import Logger
 
 
@@ -23,7 +24,8 @@ class ContinousTransformer(DataFrameColumnsTransformer):
                  scaler: Any = StandardScaler(),
                  imputer: Any = SimpleImputer(),
                  missing_indicator: Any = MissingIndicatorWithReporting(),
-                 preprocessor: Optional[Callable] = None
+                 preprocessor: Optional[Callable] = None,
+                 dtype: Any = None
                  ):
         """
 
@@ -33,6 +35,7 @@ class ContinousTransformer(DataFrameColumnsTransformer):
             scaler: StandardScaler or another scaler
             imputer: SimpleImputer or another imputer
             missing_indicator: MissingIndicatorWithReporting or another missing indicator
+            dtype: dtype of the output, e.g. np.float32. If None, values are float64 and missing indicators are objects
         """
         self.columns = columns
         self.scaler = copy.deepcopy(scaler)
@@ -40,12 +43,14 @@ class ContinousTransformer(DataFrameColumnsTransformer):
         self.missing_indicator = copy.deepcopy(missing_indicator)
         self.ignore_none_columns = copy.deepcopy(ignore_none_columns)
         self.preprocessor = preprocessor
+        self.dtype = dtype
 
         self.columns_ = None
         self.columns_ignored_because_of_none_ = None
 
     def fit(self, df):
         self.columns_ = self.columns
+        self.partial_stats_ = None
 
         if self.ignore_none_columns:
             all_none_column = df[self.columns_].isnull().all(axis=0)
@@ -64,6 +69,89 @@ class ContinousTransformer(DataFrameColumnsTransformer):
             if self.missing_indicator is not None:
                 self.missing_indicator.fit(arg_df)
 
+    def _update_partial_stats(self, values: np.ndarray):
+        present = ~np.isnan(values)
+        count_b = present.sum(axis=0)
+        safe_count_b = np.maximum(count_b, 1)
+        mean_b = np.where(present, values, 0).sum(axis=0) / safe_count_b
+        m2_b = np.where(present, (values - mean_b) ** 2, 0).sum(axis=0)
+        min_b = np.where(present, values, np.inf).min(axis=0)
+        max_b = np.where(present, values, -np.inf).max(axis=0)
+
+        stats = getattr(self, 'partial_stats_', None)
+        if stats is None:
+            stats = dict(
+                count=np.zeros(values.shape[1]),
+                mean=np.zeros(values.shape[1]),
+                m2=np.zeros(values.shape[1]),
+                min=np.full(values.shape[1], np.inf),
+                max=np.full(values.shape[1], -np.inf),
+                has_nulls=np.zeros(values.shape[1], dtype=bool)
+            )
+        count = stats['count'] + count_b
+        safe_count = np.maximum(count, 1)
+        delta = mean_b - stats['mean']
+        stats['mean'] = stats['mean'] + delta * count_b / safe_count
+        stats['m2'] = stats['m2'] + m2_b + delta ** 2 * stats['count'] * count_b / safe_count
+        stats['count'] = count
+        stats['min'] = np.minimum(stats['min'], min_b)
+        stats['max'] = np.maximum(stats['max'], max_b)
+        stats['has_nulls'] = stats['has_nulls'] | (~present).any(axis=0)
+        self.partial_stats_ = stats
+
+    def _fit_from_partial_stats(self):
+        stats = self.partial_stats_
+        self.columns_ = self.columns
+        if self.ignore_none_columns:
+            self.columns_ignored_because_of_none_ = [c for c, n in zip(self.columns, stats['count']) if n == 0]
+            self.columns_ = [c for c in self.columns if c not in self.columns_ignored_because_of_none_]
+        if len(self.columns_) == 0:
+            return
+        positions = [self.columns.index(c) for c in self.columns_]
+        mean = stats['mean'][positions]
+        std = np.sqrt(stats['m2'][positions] / np.maximum(stats['count'][positions], 1))
+
+        def frame(*rows):
+            return pd.DataFrame(list(rows), columns=self.columns_)
+
+        if self.scaler is not None:
+            if type(self.scaler) == StandardScaler:
+                self.scaler.fit(frame(mean + std, mean - std))
+            elif type(self.scaler) == MinMaxScaler:
+                self.scaler.fit(frame(stats['min'][positions], stats['max'][positions]))
+            else:
+                raise ValueError(f'partial_fit only supports StandardScaler and MinMaxScaler, but scaler was {type(self.scaler)}')
+        if self.imputer is not None:
+            if type(self.imputer) != SimpleImputer or self.imputer.strategy not in ('mean', 'constant'):
+                raise ValueError(f'partial_fit only supports SimpleImputer with mean or constant strategy')
+            self.imputer.fit(frame(mean))
+        if self.missing_indicator is not None:
+            if not isinstance(self.missing_indicator, MissingIndicator):
+                raise ValueError(f'partial_fit only supports MissingIndicator, but was {type(self.missing_indicator)}')
+            self.missing_indicator.fit(frame(mean, np.where(stats['has_nulls'][positions], np.nan, mean)))
+
+    def supports_partial_fit(self) -> bool:
+        return (
+                (self.scaler is None or type(self.scaler) in (StandardScaler, MinMaxScaler))
+                and (self.imputer is None or (type(self.imputer) == SimpleImputer and self.imputer.strategy in ('mean', 'constant')))
+                and (self.missing_indicator is None or isinstance(self.missing_indicator, MissingIndicator))
+        )
+
+    def begin_partial_fit(self) -> None:
+        self.partial_stats_ = None
+
+    def partial_fit(self, df):
+        """
+        Accumulates the counts, means, variances, minimums and maximums of the columns, and refits
+        the scaler, the imputer and the missing indicator so they reproduce these statistics.
+        Only StandardScaler/MinMaxScaler and SimpleImputer with mean/constant strategy are supported.
+        """
+        arg_df = df[self.columns]
+        if self.preprocessor is not None:
+            arg_df = self.preprocessor(arg_df)
+        self._update_partial_stats(arg_df.to_numpy(dtype=np.float64, na_value=np.nan))
+        self._fit_from_partial_stats()
+
     def transform(self, df):
         warnings = []
 
@@ -76,6 +164,7 @@ class ContinousTransformer(DataFrameColumnsTransformer):
                                column=column)
                 subdf[column] = None
 
+        dtype = getattr(self, 'dtype', None)
         if len(self.columns_) > 0:
             result = subdf
             if self.preprocessor is not None:
@@ -84,16 +173,54 @@ class ContinousTransformer(DataFrameColumnsTransformer):
                 result = pd.DataFrame(self.imputer.transform(result), index=df.index, columns=self.columns_, dtype='float')
             if self.scaler is not None:
                 result = pd.DataFrame(self.scaler.transform(result), index=df.index, columns=self.columns_, dtype='float')
+            if dtype is not None:
+                result = result.astype(dtype)
             yield result
 
             if self.missing_indicator is not None:
                 missing = self.missing_indicator.transform(subdf)
                 missing_column_names = [str(self.columns_[ind]) + '_missing' for ind in self.missing_indicator.features_]
-                yield pd.DataFrame(missing, index=df.index, columns=missing_column_names, dtype='object')
+                yield pd.DataFrame(missing, index=df.index, columns=missing_column_names, dtype=dtype if dtype is not None else 'object')
 
     def get_columns(self):
         return self.columns
 
+    @staticmethod
+    def _is_nan(value):
+        return isinstance(value, float) and np.isnan(value)
+
+    def _compile(self):
+        if self.preprocessor is not None:
+            return None
+        if len(self.columns_) == 0:
+            return ContinuousStep([], None, None, None, [])
+        fill_values = None
+        if self.imputer is not None:
+            if type(self.imputer) != SimpleImputer or self.imputer.add_indicator or not self._is_nan(self.imputer.missing_values):
+                return None
+            fill_values = self.imputer.statistics_.astype(np.float64)
+            if np.isnan(fill_values).any():
+                return None
+        multiplier = None
+        addition = None
+        if self.scaler is not None:
+            if type(self.scaler) == StandardScaler:
+                scale = self.scaler.scale_ if self.scaler.with_std else 1.0
+                multiplier = np.broadcast_to(1 / np.asarray(scale, dtype=np.float64), (len(self.columns_),))
+                if self.scaler.with_mean:
+                    addition = -self.scaler.mean_ * multiplier
+            elif type(self.scaler) == MinMaxScaler and not self.scaler.clip:
+                multiplier = self.scaler.scale_.astype(np.float64)
+                addition = self.scaler.min_.astype(np.float64)
+            else:
+                return None
+        missing_positions = []
+        if self.missing_indicator is not None:
+            if not isinstance(self.missing_indicator, MissingIndicator) or not self._is_nan(self.missing_indicator.missing_values):
+                return None
+            missing_positions = list(self.missing_indicator.features_)
+        return ContinuousStep(self.columns_, fill_values, multiplier, addition, missing_positions)
+
 
 class ReplacementStrategy:
     """
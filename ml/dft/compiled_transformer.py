@@ -0,0 +1,173 @@
+from typing import *
+
+import numpy as np
+import pandas as pd
+
+from ..._common import Logger
+
+
+class CompiledStep:
+    """
+    A step of ``CompiledDataFrameTransformer``: computes the block of output columns of one ``DataFrameColumnsTransformer``
+    """
+
+    def get_output_columns(self) -> List[str]:
+        raise NotImplementedError()
+
+    def write(self, df: pd.DataFrame, out: np.ndarray) -> None:
+        """
+        Writes the block into ``out``, which is a (rows, output_columns) view of the resulting array
+        """
+        raise NotImplementedError()
+
+
+def _gather(df: pd.DataFrame, columns: List, transformer_name: str) -> np.ndarray:
+    result = np.empty((df.shape[0], len(columns)), dtype=np.float64)
+    for i, column in enumerate(columns):
+        if column in df.columns:
+            result[:, i] = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            Logger.warning(f'Missing column in {transformer_name}', column=column)
+            result[:, i] = np.nan
+    return result
+
+
+class ContinuousStep(CompiledStep):
+    """
+    Gathers the columns, replaces the missing values with ``fill_values``, applies the affine transformation
+    ``x * multiplier + addition``, and appends the missing indicators for the columns at ``missing_positions``
+    """
+
+    def __init__(self,
+                 columns: List,
+                 fill_values: Optional[np.ndarray],
+                 multiplier: Optional[np.ndarray],
+                 addition: Optional[np.ndarray],
+                 missing_positions: List[int]
+                 ):
+        self.columns = columns
+        self.fill_values = fill_values
+        self.multiplier = multiplier
+        self.addition = addition
+        self.missing_positions = missing_positions
+
+    def get_output_columns(self):
+        return list(self.columns) + [str(self.columns[i]) + '_missing' for i in self.missing_positions]
+
+    def write(self, df, out):
+        values = _gather(df, self.columns, 'ContinuousTransformer')
+        missing = np.isnan(values)
+        if len(self.missing_positions) > 0:
+            out[:, len(self.columns):] = missing[:, self.missing_positions]
+        if self.fill_values is not None:
+            values = np.where(missing, self.fill_values, values)
+        if self.multiplier is not None:
+            values *= self.multiplier
+        if self.addition is not None:
+            values += self.addition
+        out[:, :len(self.columns)] = values
+
+
+class CodesStep(CompiledStep):
+    """
+    For each input column, computes the codes of the values with ``get_codes``. If ``one_hot``, sets
+    the corresponding one-hot columns to 1, otherwise, writes the codes themselves.
+    """
+
+    def __init__(self, column_data: List, widths: List[int], output_columns: List[str], one_hot: bool, ignore_missing_columns: bool):
+        self.column_data = column_data
+        self.widths = widths
+        self.output_columns = output_columns
+        self.one_hot = one_hot
+        self.ignore_missing_columns = ignore_missing_columns
+
+    def get_output_columns(self):
+        return self.output_columns
+
+    def write(self, df, out):
+        if not self.one_hot:
+            for i, c in enumerate(self.column_data):
+                out[:, i] = c.get_codes(df, self.ignore_missing_columns)
+            return
+        out[:] = 0
+        rows = np.arange(df.shape[0])
+        shift = 0
+        for c, width in zip(self.column_data, self.widths):
+            out[rows, c.get_codes(df, self.ignore_missing_columns) + shift] = 1
+            shift += width
+
+
+class FallbackStep(CompiledStep):
+    """
+    Runs the original transformer, for the transformers that cannot be compiled.
+    If ``sample`` is provided, the output columns are learnt at compile time by transforming its first row,
+    otherwise they are only known after the first ``transform``.
+    """
+
+    def __init__(self, transformer, sample: Optional[pd.DataFrame] = None):
+        self.transformer = transformer
+        self.output_columns = None  # type: Optional[List[str]]
+        if sample is not None:
+            self.compute(sample.iloc[:1])
+
+    def get_output_columns(self):
+        if self.output_columns is None:
+            raise ValueError(f'Output columns of {type(self.transformer)} are unknown until the first transformation')
+        return self.output_columns
+
+    def compute(self, df: pd.DataFrame) -> np.ndarray:
+        blocks = []
+        columns = []
+        for res in self.transformer.transform(df):
+            if isinstance(res, pd.Series):
+                res = res.to_frame()
+            blocks.append(res.to_numpy(dtype=np.float32))
+            columns.extend(res.columns)
+        if self.output_columns is None:
+            self.output_columns = columns
+        elif self.output_columns != columns:
+            raise ValueError(f'Transformer {type(self.transformer)} has produced different columns for different inputs')
+        if len(blocks) == 0:
+            return np.empty((df.shape[0], 0), dtype=np.float32)
+        return np.concatenate(blocks, axis=1)
+
+
+class CompiledDataFrameTransformer:
+    """
+    The result of ``DataFrameTransformer.compile``. Computes the same columns as the fitted ``DataFrameTransformer``,
+    but writes all of them into a single preallocated float32 array with numpy operations,
+    without building the intermediate frames.
+    """
+
+    def __init__(self, steps: List[CompiledStep]):
+        self.steps = steps
+
+    def get_output_columns(self) -> List[str]:
+        return [c for step in self.steps for c in step.get_output_columns()]
+
+    def transform_to_array(self, df: pd.DataFrame, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Transforms the dataframe into the float32 array. If ``out`` is provided, the result is written there.
+        """
+        fallback_values = {i: step.compute(df) for i, step in enumerate(self.steps) if isinstance(step, FallbackStep)}
+        widths = [
+            fallback_values[i].shape[1] if i in fallback_values else len(step.get_output_columns())
+            for i, step in enumerate(self.steps)
+        ]
+        shape = (df.shape[0], sum(widths))
+        if out is None:
+            out = np.empty(shape, dtype=np.float32)
+        elif out.shape != shape:
+            raise ValueError(f'Output array is expected to have shape {shape}, but has {out.shape}')
+        start = 0
+        for i, (step, width) in enumerate(zip(self.steps, widths)):
+            if i in fallback_values:
+                out[:, start:start + width] = fallback_values[i]
+            else:
+                step.write(df, out[:, start:start + width])
+            start += width
+        return out
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        values = self.transform_to_array(df)
+        return pd.DataFrame(values, index=df.index, columns=self.get_output_columns(), copy=False)
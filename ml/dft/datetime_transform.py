@@ -9,9 +9,10 @@ from pandas.api.types import is_datetime64_any_dtype as is_datetime
 from datetime import datetime
 
 class DatetimeTransformer(DataFrameColumnsTransformer):
-    def __init__(self, columns: List[str], with_scaler: bool = True):
+    def __init__(self, columns: List[str], with_scaler: bool = True, dtype: Any = None):
         self.columns = columns
         self.with_scaler = with_scaler
+        self.dtype = dtype
         self.reference_column = None #type: Optional[str]
         self.scaler = None #type: Optional[StandardScaler]
 
@@ -44,6 +45,8 @@ class DatetimeTransformer(DataFrameColumnsTransformer):
             values = df.to_numpy()
         rdf = pd.DataFrame(values, columns=df.columns, index=df.index)
         rdf = rdf.fillna(0)
+        if getattr(self, 'dtype', None) is not None:
+            rdf = rdf.astype(self.dtype)
         return rdf
 
     def fit(self, df: pd.DataFrame) -> None:
@@ -54,6 +57,25 @@ class DatetimeTransformer(DataFrameColumnsTransformer):
             self.scaler = StandardScaler()
             self.scaler.fit(pdf)
 
+    def supports_partial_fit(self) -> bool:
+        return True
+
+    def begin_partial_fit(self) -> None:
+        self.reference_column = None
+        self.scaler = None
+
+    def partial_fit(self, df: pd.DataFrame) -> None:
+        """
+        The reference column is selected on the first portion of the data, the scaler is updated with every portion.
+        """
+        if self.reference_column is None:
+            self.reference_column = df[self.columns].isnull().mean().sort_values().index[0]
+        pdf = self._preprocess_df(df)
+        if self.with_scaler:
+            if self.scaler is None:
+                self.scaler = StandardScaler()
+            self.scaler.partial_fit(pdf)
+
     def transform(self, df: pd.DataFrame) -> Iterable[Union[pd.DataFrame, pd.Series]]:
         pdf = self._preprocess_df(df)
         return [self._postprocess_df(pdf)]
@@ -41,8 +41,12 @@ class MissingIndicatorWithReporting(MissingIndicator):
 
 
 class OneHotEncoderForDataframe(OneHotEncoder):
-    def __init__(self):
-        super(OneHotEncoderForDataframe, self).__init__(sparse=False)
+    """
+    OneHotEncoder that processes a series into the dataframe with named columns.
+    If ``sparse`` is True, the columns of the dataframe are pandas sparse columns.
+    """
+    def __init__(self, sparse=False):
+        super(OneHotEncoderForDataframe, self).__init__(sparse=sparse)
 
     def fit(self, X, y=None):
         X = X.values.reshape(-1, 1)
@@ -54,5 +58,7 @@ class OneHotEncoderForDataframe(OneHotEncoder):
         values = values.reshape(-1, 1)
         columns = [column_name + '_' + str(cat) for cat in self.categories_[0]]
         features = super(OneHotEncoderForDataframe, self).transform(values)
+        if self.sparse:
+            return pd.DataFrame.sparse.from_spmatrix(features, columns=columns, index=X.index)
         df = pd.DataFrame(features, columns=columns, index=X.index)
         return df
@@ -32,6 +32,8 @@ class DataFrameTransformerFactory:
         self.datetime_enabled = False
         self.scaler_in_datetime = True
 
+        self.dtype = None  # type: Optional[Any]
+
         self.transformer_ = None
 
     def with_filter(self, filter: Callable) -> 'DataFrameTransformerFactory':
@@ -89,6 +91,15 @@ class DataFrameTransformerFactory:
         return self
 
 
+    def with_dtype(self, dtype) -> 'DataFrameTransformerFactory':
+        """
+        Specifies the dtype of the features produced by the built-in transformers, e.g. np.float32.
+        It is also applied to ``ContinousTransformer`` created by the continuous factory, unless the factory sets
+        the dtype itself. Other transformers produced by custom factories are not affected.
+        """
+        self.dtype = dtype
+        return self
+
     def _create_transformer(self, df: pd.DataFrame) -> 'DataFrameTransformer':
         transformers = []
 
@@ -107,12 +118,16 @@ class DataFrameTransformerFactory:
         if len(continuous) > 0:
             if self.continuous_factory is None:
                 raise ValueError(f"Continuous features are presenting, but the factory is not set. Features are {continuous}")
-            transformers.append(self.continuous_factory(continuous))
+            transformer = self.continuous_factory(continuous)
+            dtype = getattr(self, 'dtype', None)
+            if dtype is not None and isinstance(transformer, ContinousTransformer) and transformer.dtype is None:
+                transformer.dtype = dtype
+            transformers.append(transformer)
 
         categorical = [c for c in types.index if c not in continuous and not is_datetime(df[c])]
         if len(categorical) > 0:
             if self.categorical_2_max_categories is not None:
-                transformers.append(CategoricalTransformer2(categorical, self.categorical_2_max_categories))
+                transformers.append(CategoricalTransformer2(categorical, self.categorical_2_max_categories, **self._get_dtype_kwargs()))
             else:
                 if self.categorical_rich_threshold is not None:
                     cat_value_count = {c: len(df[c].unique()) for c in categorical}
@@ -129,29 +144,69 @@ class DataFrameTransformerFactory:
 
         if self.datetime_enabled:
             columns = [c for c in df.columns if is_datetime(df[c])]
-            transformers.append(DatetimeTransformer(columns, self.scaler_in_datetime))
+            transformers.append(DatetimeTransformer(columns, self.scaler_in_datetime, **self._get_dtype_kwargs()))
 
         return DataFrameTransformer(transformers)
 
+    def _get_dtype_kwargs(self):
+        dtype = getattr(self, 'dtype', None)
+        return {} if dtype is None else dict(dtype=dtype)
+
     def fit(self, X, y=None):
         self.transformer_ = self._create_transformer(X)
         self.transformer_.fit(X, y)
         return self
 
+    def begin_partial_fit(self, X):
+        """
+        Starts a new partial fit: creates the transformer, defining the types of the features by ``X``,
+        which is the first portion of the data
+        """
+        self.transformer_ = self._create_transformer(X)
+        self.transformer_.begin_partial_fit(X)
+        return self
+
+    def supports_partial_fit(self) -> bool:
+        """
+        Returns True if the transformer created by ``begin_partial_fit`` can be fitted with ``partial_fit``
+        """
+        return self.transformer_ is not None and self.transformer_.supports_partial_fit()
+
+    def partial_fit(self, X, y=None):
+        """
+        Fits the transformer on one more portion of the data. If ``begin_partial_fit`` was not called,
+        the transformer is created on the first portion, so the types of the features are defined by it.
+        """
+        if self.transformer_ is None:
+            self.transformer_ = self._create_transformer(X)
+        self.transformer_.partial_fit(X, y)
+        return self
+
     def transform(self, X):
         if self.transformer_ is None:
             raise ValueError('Transformer is None. Did you forget to fit?')
         return self.transformer_.transform(X)
 
+    def compile(self, X=None):
+        """
+        Returns ``CompiledDataFrameTransformer`` of the fitted transformer. ``X`` is the sample of the data,
+        used to learn the output columns of the transformers that cannot be compiled.
+        """
+        if self.transformer_ is None:
+            raise ValueError('Transformer is None. Did you forget to fit?')
+        return self.transformer_.compile(X)
+
     def fit_transform(self, X, y=None):
         self.fit(X, y)
         return self.transform(X)
 
     @staticmethod
-    def default_factory(features: Optional[List] = None, max_values_per_category: Optional[int] = 25, enable_datetime = False):
+    def default_factory(features: Optional[List] = None, max_values_per_category: Optional[int] = 25, enable_datetime = False, dtype = None):
         tr = DataFrameTransformerFactory()
         if features is not None:
             tr = tr.with_feature_allow_list(features)
+        if dtype is not None:
+            tr = tr.with_dtype(dtype)
         tr = tr.on_continuous(ContinousTransformer)
         tr = tr.on_categorical_2(max_values_per_category)
         if enable_datetime:
@@ -0,0 +1,94 @@
+from unittest import TestCase
+from tg.common.datasets.access import *
+from yo_fluq_ds import Query
+from tg.common import Loc
+import datetime
+import shutil
+import os
+
+
+def _records(count):
+    return [
+        dict(
+            id=i,
+            name=f'name_{i}',
+            value=i / 2,
+            date=datetime.datetime(2020, 1, 1) + datetime.timedelta(days=i),
+            items=[dict(a=j) for j in range(i)],
+            empty=None if i < 5 else i,
+        )
+        for i in range(count)
+    ]
+
+
+class ParquetFileCacheTestCase(TestCase):
+    def setUp(self):
+        self.path = Loc.temp_path / 'tests/data_source_parquet_cache/data.parquet'
+        shutil.rmtree(self.path.parent, ignore_errors=True)
+        os.makedirs(self.path.parent)
+
+    def test_parquet_file(self):
+        records = _records(10)
+        cache = ParquetFileDataSource(self.path, buffer_size=4)
+        self.assertEqual(False, cache.is_available())
+        cache.cache_from(Query.en(records), 7)
+        self.assertEqual(True, cache.is_available())
+
+        result = cache.get_data()
+        self.assertEqual(7, result.length)
+        self.assertListEqual(records[:7], result.to_list())
+
+        self.assertEqual(2, cache.get_chunk_count())
+        self.assertListEqual(records[4:7], cache.get_chunk(1))
+        self.assertRaises(ValueError, lambda: cache.get_chunk(2))
+
+        dfs = cache.get_data_frames().to_list()
+        self.assertListEqual([4, 3], [df.shape[0] for df in dfs])
+        self.assertListEqual([4, 5, 6], list(dfs[1].id))
+        self.assertListEqual(records[5]['items'], dfs[1]['items'].iloc[1])
+
+    def test_parquet_file_missing_fields(self):
+        records = [dict(a=1, b='x'), dict(a=2), dict(a=3, b='z')]
+        cache = ParquetFileDataSource(self.path, buffer_size=2)
+        cache.cache_from(Query.en(records))
+        self.assertListEqual([dict(a=1, b='x'), dict(a=2, b=None), dict(a=3, b='z')], cache.get_data().to_list())
+
+    def test_parquet_file_errors(self):
+        cache = ParquetFileDataSource(self.path, buffer_size=2)
+        self.assertRaises(ValueError, lambda: cache.cache_from(Query.en([1, 2, 3])))
+
+    def test_parquet_file_new_field(self):
+        records = [dict(a=1), dict(a=2), dict(a=3, b='x'), dict(a=4, b=[1])]
+        cache = ParquetFileDataSource(self.path, buffer_size=2)
+        cache.cache_from(Query.en(records))
+        self.assertListEqual([dict(a=1, b=None), dict(a=2, b=None), dict(a=3, b='x'), dict(a=4, b=[1])], cache.get_data().to_list())
+        self.assertEqual(2, cache.get_chunk_count())
+
+    def test_parquet_file_promoted_field(self):
+        records = [dict(a=1, b=1), dict(a=2, b=2), dict(a=3.5, b='x'), dict(a=4, b=None)]
+        cache = ParquetFileDataSource(self.path, buffer_size=2)
+        cache.cache_from(Query.en(records))
+        result = cache.get_data().to_list()
+        self.assertListEqual([1.0, 2.0, 3.5, 4.0], [r['a'] for r in result])
+        self.assertIsInstance(result[0]['a'], float)
+        self.assertListEqual([1, 2, 'x', None], [r['b'] for r in result])
+        dfs = cache.get_data_frames().to_list()
+        self.assertListEqual([1, 2], list(dfs[0].b))
+
+    def test_parquet_file_large_ints_are_not_promoted(self):
+        big = 2 ** 53 + 1
+        records = [dict(a=big), dict(a=2), dict(a=3.5), dict(a=4)]
+        cache = ParquetFileDataSource(self.path, buffer_size=2)
+        cache.cache_from(Query.en(records))
+        self.assertListEqual([big, 2, 3.5, 4], [r['a'] for r in cache.get_data().to_list()])
+
+        records = [dict(a=1.5), dict(a=2.5), dict(a=big), dict(a=4)]
+        cache.cache_from(Query.en(records))
+        result = [r['a'] for r in cache.get_data().to_list()]
+        self.assertListEqual([1.5, 2.5, big, 4], result)
+        self.assertIsInstance(result[2], int)
+
+    def test_parquet_file_empty(self):
+        cache = ParquetFileDataSource(self.path)
+        cache.cache_from(Query.en([]))
+        self.assertListEqual([], cache.get_data().to_list())
@@ -1,6 +1,10 @@
 from unittest import TestCase
 from tg.common.datasets.access import *
+from tg.common import Loc
 from yo_fluq_ds import Query
+import os
+import shutil
+import time
 
 
 class MockSource(DataSource):
@@ -32,6 +36,22 @@ class MockUpdateSource(DataSource):
             return Query.en([])
 
 
+class MockShardSource(DataSource):
+    calls = []
+    failures = {}
+
+    def __init__(self, query):
+        self.shard = int(query.split(',')[1])
+
+    def get_data(self):
+        MockShardSource.calls.append(self.shard)
+        if MockShardSource.failures.get(self.shard, 0) > 0:
+            MockShardSource.failures[self.shard] -= 1
+            raise ValueError(f'Shard {self.shard} has failed')
+        time.sleep(0.01 * (5 - self.shard % 5))
+        return Query.en([self.shard])
+
+
 class SqlWrappersTestCase(TestCase):
     def test_int_split(self):
         MockSource.state = 0
@@ -56,3 +76,53 @@ class SqlWrappersTestCase(TestCase):
         )
         data = src.get_data().to_list()
         self.assertListEqual([], data)
+
+    def test_int_split_parallel(self):
+        MockShardSource.calls = []
+        MockShardSource.failures = {}
+        src = IntFieldShardedJob('{shard_count},{shard}', MockShardSource, 10)
+        src.max_parallel_shards = 3
+        self.assertListEqual(list(range(10)), src.get_data().to_list())
+        src.ordered = False
+        self.assertListEqual(list(range(10)), sorted(src.get_data().to_list()))
+
+    def test_int_split_retry(self):
+        MockShardSource.calls = []
+        MockShardSource.failures = {2: 2}
+        src = IntFieldShardedJob('{shard_count},{shard}', MockShardSource, 5)
+        src.retry_count = 1
+        self.assertRaises(ValueError, lambda: src.get_data().to_list())
+        MockShardSource.failures = {2: 1}
+        self.assertListEqual(list(range(5)), src.get_data().to_list())
+
+    def test_int_split_checkpoint(self):
+        folder = Loc.temp_path / 'tests/shard_checkpoint'
+        shutil.rmtree(folder, ignore_errors=True)
+        MockShardSource.calls = []
+        MockShardSource.failures = {3: 1}
+        src = IntFieldShardedJob('{shard_count},{shard}', MockShardSource, 5)
+        src.checkpoint_folder = folder
+        self.assertRaises(ValueError, lambda: src.get_data())
+        src.checkpoint_run_id = 'run'
+        self.assertRaises(ValueError, lambda: src.get_data().to_list())
+        self.assertListEqual([0, 1, 2, 3], MockShardSource.calls)
+        MockShardSource.calls = []
+        self.assertListEqual(list(range(5)), src.get_data().to_list())
+        self.assertListEqual([3, 4], MockShardSource.calls)
+        self.assertListEqual([], os.listdir(folder))
+        shutil.rmtree(folder, ignore_errors=True)
+
+    def test_int_split_checkpoint_partial_read(self):
+        folder = Loc.temp_path / 'tests/shard_checkpoint_partial'
+        shutil.rmtree(folder, ignore_errors=True)
+        MockShardSource.calls = []
+        MockShardSource.failures = {}
+        src = IntFieldShardedJob('{shard_count},{shard}', MockShardSource, 5)
+        src.checkpoint_folder = folder
+        src.checkpoint_run_id = 'run'
+        self.assertListEqual([0, 1], src.get_data().take(2).to_list())
+        self.assertListEqual([], os.listdir(folder))
+        MockShardSource.calls = []
+        self.assertListEqual(list(range(5)), src.get_data().to_list())
+        self.assertListEqual([0, 1, 2, 3, 4], MockShardSource.calls)
+        shutil.rmtree(folder, ignore_errors=True)
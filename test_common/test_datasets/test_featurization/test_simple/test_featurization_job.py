@@ -5,6 +5,8 @@ from tg.common import MemoryFileSyncer, Loc
 from unittest import TestCase
 from yo_fluq_ds import Query, Queryable
 import pandas as pd
+import queue
+import time
 
 
 class MyFeaturizerBatch(DataframeFeaturizer):
@@ -45,6 +47,59 @@ class MyFeaturizerFailing(DataframeFeaturizer):
         raise ValueError()
 
 
+class MyFeaturizerSlow(DataframeFeaturizer):
+    def __init__(self):
+        super(MyFeaturizerSlow, self).__init__()
+
+    def _featurize(self, item: Any) -> List[Any]:
+        if item['a'] == 0:
+            time.sleep(3)
+        return [item]
+
+
+class MyFeaturizerRaising(DataframeFeaturizer):
+    def __init__(self):
+        super(MyFeaturizerRaising, self).__init__()
+
+    def _featurize(self, item: Any) -> List[Any]:
+        raise ValueError('Featurizer is broken')
+
+
+class FullOnceQueue:
+    def __init__(self):
+        self.items = []
+
+    def put(self, item, timeout=None):
+        if len(self.items) == 0:
+            self.items.append(None)
+            raise queue.Full()
+        self.items.append(item)
+
+
+class FinishedWorker:
+    exitcode = 0
+
+    def is_alive(self):
+        return False
+
+
+class MySumReducer(StreamFeaturizer):
+    def start(self):
+        self.total = 0
+
+    def observe_data_point(self, item):
+        self.total += item['a']
+
+    def finish(self):
+        return pd.DataFrame(dict(total=[self.total]))
+
+    def is_reducer(self):
+        return True
+
+    def merge(self, other):
+        self.total += other.total
+
+
 data = Query.en(range(5)).select(lambda z: dict(a=z)).to_dataframe()
 
 
@@ -168,3 +223,123 @@ class BatchJobTestCase(TestCase):
         files = list(mem.cache)
         self.assertEqual(1, len(files))
         self.assertEqual('a', mem.get_parquet(0).index.name)
+
+    def test_parallel(self):
+        mem = MemoryFileSyncer()
+        many = Query.en(range(100)).select(lambda z: dict(a=z)).to_dataframe()
+        job = FeaturizationJob(
+            'test',
+            'test',
+            MockDfDataSource(many),
+            {
+                'batched': MyFeaturizerBatch(),
+                'simple': MyFeaturizerSimple()
+            },
+            mem,
+            Loc.temp_path / 'tests/featurization_job/parallel',
+            None,
+            None,
+            process_count=3,
+            records_per_chunk=7
+        )
+        job.run()
+        self.assertEqual(100, job.records_processed_)
+        stats = Query.en(mem.cache).group_by(lambda z: z.split(Loc.file_slash)[0]).to_dictionary(lambda z: z.key, lambda z: len(z.value))
+        self.assertGreaterEqual(stats['simple'], 1)
+        self.assertLessEqual(stats['simple'], 3)
+        values = sorted(v for i in range(len(mem.cache)) for v in mem.get_parquet(i).a)
+        self.assertListEqual(sorted(list(range(100)) * 2), values)
+
+    def test_parallel_failing(self):
+        mem = MemoryFileSyncer()
+        job = FeaturizationJob(
+            'test',
+            'test',
+            MockDfDataSource(data),
+            {
+                'fail': MyFeaturizerFailing()
+            },
+            mem,
+            Loc.temp_path / 'tests/featurization_job/parallel_failing',
+            None,
+            None,
+            process_count=2
+        )
+        self.assertRaises(ValueError, lambda: job.run())
+
+    def test_parallel_slow_worker(self):
+        mem = MemoryFileSyncer()
+        many = Query.en(range(10)).select(lambda z: dict(a=z)).to_dataframe()
+        job = FeaturizationJob(
+            'test',
+            'test',
+            MockDfDataSource(many),
+            {
+                'slow': MyFeaturizerSlow()
+            },
+            mem,
+            Loc.temp_path / 'tests/featurization_job/parallel_slow',
+            None,
+            None,
+            process_count=2,
+            records_per_chunk=5
+        )
+        job.run()
+        values = sorted(v for i in range(len(mem.cache)) for v in mem.get_parquet(i).a)
+        self.assertListEqual(list(range(10)), values)
+
+    def test_parallel_worker_error_is_reraised(self):
+        mem = MemoryFileSyncer()
+        many = Query.en(range(100)).select(lambda z: dict(a=z)).to_dataframe()
+        job = FeaturizationJob(
+            'test',
+            'test',
+            MockDfDataSource(many),
+            {
+                'raising': MyFeaturizerRaising()
+            },
+            mem,
+            Loc.temp_path / 'tests/featurization_job/parallel_raising',
+            None,
+            None,
+            process_count=2,
+            records_per_chunk=1
+        )
+        self.assertRaisesRegex(ValueError, 'Featurizer is broken', lambda: job.run())
+
+    def test_results_drained_while_putting_are_kept(self):
+        job = FeaturizationJob('test', 'test', MockDfDataSource(data), {'sum': MySumReducer()}, MemoryFileSyncer(), Loc.temp_path / 'tests/featurization_job/drained', None, None)
+        output_queue = queue.Queue()
+        output_queue.put((0, 'done', 'state'))
+        workers = [FinishedWorker()]
+        results = {}
+        job._put_to_workers(FullOnceQueue(), output_queue, None, workers, results)
+        self.assertListEqual(['state'], job._get_worker_results(output_queue, workers, results))
+
+    def test_parallel_reducer(self):
+        mem = MemoryFileSyncer()
+        job = FeaturizationJob(
+            'test',
+            'test',
+            MockDfDataSource(data),
+            {
+                'sum': MySumReducer()
+            },
+            mem,
+            Loc.temp_path / 'tests/featurization_job/parallel_reducer',
+            None,
+            None,
+            process_count=2,
+            records_per_chunk=1
+        )
+        job.run()
+        self.assertEqual(1, len(mem.cache))
+        self.assertListEqual([10], list(mem.get_parquet(0).total))
+
+    def test_row_selector(self):
+        from tg.common.datasets.selectors import Selector
+        featurizer = DataframeFeaturizer(row_selector=Selector().select('a'))
+        dfs = featurizer.run_iter([dict(a=1, b=2), dict(a=3, b=4)]).to_list()
+        self.assertEqual(1, len(dfs))
+        self.assertListEqual(['a'], list(dfs[0].columns))
+        self.assertListEqual([1, 3], list(dfs[0].a))
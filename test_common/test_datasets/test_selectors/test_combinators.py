@@ -92,3 +92,19 @@ class CombinatorsTestCase(TestCase):
             dict(a='4', b='5'),
             ppl(dict(a=4, b=5))
         )
+
+    def test_compiled(self):
+        selector = Pipeline(
+            FieldGetter('a'),
+            Listwise(Ensemble(x=FieldGetter('x'), y=Pipeline(FieldGetter('y'), FunctionFeed(lambda z: z * 2)))),
+        )
+        obj = {'a': [{'x': 1, 'y': 2}, {'x': 3, 'y': 4}]}
+        self.assertListEqual([{'x': 1, 'y': 4}, {'x': 3, 'y': 8}], selector.compile()(obj))
+        self.assertDictEqual({'p': 2, 'q': 3}, Dictwise(lambda z: z + 1).compile()({'p': 1, 'q': 2}))
+
+    def test_compiled_falls_back_to_tracing(self):
+        compiled = Pipeline(lambda z: z * 2, _throwing).compile()
+        self.assertRaises(SelectorException, lambda: compiled(1))
+        compiled = Ensemble(lambda z: {'a': z}, lambda z: {'a': z}).compile()
+        self.assertRaises(SelectorException, lambda: compiled(1))
+        self.assertIsNone(FieldGetter('missing').compile()({'a': 1}))
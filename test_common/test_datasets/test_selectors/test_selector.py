@@ -2,6 +2,7 @@ from unittest import TestCase
 from tg.common.datasets.selectors import *
 from pprint import pprint
 import json
+import pandas as pd
 
 data = {
     'a': {
@@ -25,10 +26,13 @@ class SelectorTestCase(TestCase):
         if pr:
             print(json.dumps(selector.simple_repr(), indent=2))
         result = selector(data)
+        compiled_result = selector.compile()(data)
         if isinstance(value, dict):
             self.assertDictEqual(value, result)
+            self.assertDictEqual(value, compiled_result)
         else:
             self.assertEqual(value, result)
+            self.assertEqual(value, compiled_result)
 
     def test_simple(self):
         self.assertSelect(
@@ -100,3 +104,19 @@ class SelectorTestCase(TestCase):
             {'b': 4, 'x': '51', 'u': 1},
             Selector().select(['b', f], x=['b', str, f]).with_prefix('a.x').select('u')
         )
+
+    def test_select_many(self):
+        selector = Selector().with_prefix('a.y').select('v', z='w').select('b', 'd')
+        records = [data, {'a': {'y': {'v': 10, 'w': 11}}, 'b': 12}]
+        df = selector.select_many(records)
+        self.assertListEqual(['z', 'v', 'b', 'd'], list(df.columns))
+        self.assertListEqual([2, 10], list(df.v))
+        self.assertListEqual([3, 11], list(df.z))
+        self.assertListEqual([5, 12], list(df.b))
+        self.assertListEqual([None, None], list(df.d))
+        self.assertListEqual(list(pd.DataFrame([selector(r) for r in records]).columns), list(df.columns))
+
+    def test_select_many_errors(self):
+        selector = Selector().select(x=['b', lambda z: 10 // z])
+        self.assertListEqual([2], list(selector.select_many([dict(b=5)]).x))
+        self.assertRaises(SelectorException, lambda: selector.select_many([dict(b=5), dict(b=0)]))
@@ -4,6 +4,8 @@ from unittest import TestCase
 import os
 import shutil
 import pandas as pd
+import numpy as np
+from tg.common.ml.dft import DataFrameTransformerFactory, ContinousTransformer, CategoricalTransformer
 
 
 def get_bundle() -> IndexedDataBundle:
@@ -32,6 +34,92 @@ class BatcherTestCase(TestCase):
         self.assertIsInstance(idx, pd.DataFrame)
         self.assertListEqual([1, 3], list(idx.index))
 
+    def test_shuffled_sampler(self):
+        db = get_bundle()
+        strategy = ShuffledSampler(random_state=0)
+        self.assertEqual(2, strategy.get_batch_count(3, db))
+        first_epoch = [strategy.get_batch_index_frame(3, db, i) for i in range(2)]
+        self.assertIsInstance(first_epoch[0], np.ndarray)
+        self.assertListEqual([0, 1, 2, 3], sorted(np.concatenate(first_epoch)))
+        second_epoch = [strategy.get_batch_index_frame(3, db, i) for i in range(2)]
+        self.assertListEqual([0, 1, 2, 3], sorted(np.concatenate(second_epoch)))
+
+        other = ShuffledSampler(random_state=0)
+        self.assertListEqual(list(first_epoch[0]), list(other.get_batch_index_frame(3, db, 0)))
+
+    def test_batching_on_positions(self):
+        db = get_bundle()
+        batcher = Batcher([PlainExtractor.build('df1').index().join('df1', 'df1').apply()])
+        batch = batcher.get_batch_from_index(db, np.array([3, 1]))
+        self.assertListEqual([7, 3], list(batch['df1'].a))
+        self.assertListEqual([7, 3], list(batch['index'].index))
+
+        positional = db.change_index(np.array([3, 2, 1]))
+        self.assertListEqual([7, 5, 3], list(positional.get_index()))
+        nested = positional.change_index(np.array([0, 2]))
+        self.assertListEqual([7, 3], list(nested.get_index()))
+        self.assertListEqual(['107', '103'], list(nested.index_frame.df1))
+
+    def test_positional_batch_keeps_index_frame_lazy(self):
+        db = get_bundle()
+        db.bundle['by_index'] = pd.DataFrame(dict(x=list(range(10))))
+        batcher = Batcher([PlainExtractor.build('x').index('by_index').apply()], training_sampler=ShuffledSampler(random_state=0))
+        batch = batcher.get_batch(3, db, 0)
+        self.assertIsNone(batch._index_frame)
+        self.assertListEqual(list(batch.get_index()), list(batch['x'].index))
+        self.assertListEqual(list(batch.get_index()), list(batch.index_frame.index))
+
+    def test_mini_batch_slicer(self):
+        db = get_bundle()
+        batcher = Batcher([
+            PlainExtractor.build('df1').index().join('df1', 'df1').apply(),
+            PlainExtractor.build('df2').index().join('df2', 'df2').apply(),
+        ])
+        batch = batcher.get_batch(4, db, 0)
+        batch.bundle['df2'] = batch['df2'].iloc[::-1]
+        slicer = Batcher.create_mini_batch_slicer(batch)
+        positions = batcher.get_mini_batch_positions(3, batch)
+        indices = batcher.get_mini_batch_indices(3, batch)
+        self.assertEqual(2, len(positions))
+        for position, index in zip(positions, indices):
+            expected = batcher.get_mini_batch(index, batch)
+            actual = slicer.get_mini_batch(position)
+            for key in ['df1', 'df2']:
+                pd.testing.assert_frame_equal(expected[key], actual[key])
+            pd.testing.assert_frame_equal(expected.index_frame, actual.index_frame)
+
+    def test_fitting_on_several_batches(self):
+        db = get_bundle()
+        db = IndexedDataBundle(db.bundle.index, db.bundle)
+        db.bundle['df1'] = db.bundle.df1.assign(a=db.bundle.df1.a.astype(float))
+        batcher = Batcher([
+            PlainExtractor.build('df1').index().join('df1', 'df1').apply(transformer=DataFrameTransformerFactory.default_factory()),
+        ])
+        batcher.fit_extract(4, db)
+        self.assertEqual(1.5, batcher.extractors[0].transformer.transformer_.transformers[0].scaler.mean_[0])
+        batcher = Batcher([
+            PlainExtractor.build('df1').index().join('df1', 'df1').apply(transformer=DataFrameTransformerFactory.default_factory()),
+        ])
+        batcher.fit_extract(4, db, fitting_batch_count=3)
+        self.assertEqual(4.5, batcher.extractors[0].transformer.transformer_.transformers[0].scaler.mean_[0])
+
+        other = IndexedDataBundle(db.bundle.index, DataBundle(index=db.bundle.index, df1=db.bundle.df1.assign(a=db.bundle.df1.a + 1000)))
+        batcher.fit_extract(4, other, fitting_batch_count=3)
+        transformer = batcher.extractors[0].transformer.transformer_.transformers[0]
+        self.assertEqual(1004.5, transformer.scaler.mean_[0])
+        self.assertEqual(10, transformer.partial_stats_['count'][0])
+
+    def test_fitting_on_several_batches_falls_back_to_fit(self):
+        db = get_bundle()
+        db = IndexedDataBundle(db.bundle.index, db.bundle)
+        db.bundle['df1'] = db.bundle.df1.assign(a=db.bundle.df1.a.astype(float), c=db.bundle.df1.a.astype(str))
+        factory = DataFrameTransformerFactory().on_continuous(ContinousTransformer).on_categorical(CategoricalTransformer)
+        batcher = Batcher([
+            PlainExtractor.build('df1').index().join('df1', 'df1').apply(transformer=factory),
+        ])
+        batcher.fit_extract(4, db, fitting_batch_count=3)
+        self.assertEqual(1.5, batcher.extractors[0].transformer.transformer_.transformers[0].scaler.mean_[0])
+
     def test_batching(self):
         db = get_bundle()
         strategy = SequencialSampler()
@@ -62,6 +150,22 @@ class BatcherTestCase(TestCase):
         self.assertListEqual(['a'], list(bundle1.data_frames['df1'].columns))
         self.assertListEqual(['b'], list(bundle1.data_frames['df2'].columns))
 
+    def test_loading_feather(self):
+        bundle = get_bundle().bundle
+        folder = Loc.temp_path.joinpath('tests/dbbundle_feather')
+        if os.path.isdir(folder):
+            shutil.rmtree(folder)
+        os.makedirs(folder)
+        bundle.save(folder, format='feather')
+        bundle1 = DataBundle.load(folder)
+        self.assertSetEqual({'index', 'df1', 'df2'}, set(bundle1.data_frames.keys()))
+        self.assertNotIsInstance(bundle1.data_frames['df1'], pd.DataFrame)
+        self.assertEqual((10, 1), bundle1.describe()['df1']['shape'])
+        self.assertListEqual(['a'], list(bundle1['df1'].columns))
+        self.assertListEqual(list(bundle.df1.index), list(bundle1.df1.index))
+        self.assertIsInstance(bundle1.data_frames['df1'], pd.DataFrame)
+        self.assertListEqual(list(bundle.df2.b), list(bundle1.df2.b))
+
     def _unwrap(self, batch_size, batcher: Batcher, db, strategy):
         result = []
         for i in range(batcher.get_batch_count(batch_size, db, strategy)):
@@ -84,3 +188,54 @@ class BatcherTestCase(TestCase):
         db.index_frame = db.bundle.index.iloc[[0, 1, 2, 3, 4]]
         self.assertEqual(3, batcher.get_batch_count(2, db, strategy))
         self.assertListEqual([0, 1, 2, 3, 4], self._unwrap(2, batcher, db, strategy))
+
+    def test_prefetching(self):
+        batcher = Batcher([
+            PlainExtractor.build('df1').join('df1', 'df1').apply(),
+            PlainExtractor.build('df2').join('df2', 'df2').apply(),
+            ])
+        db = get_bundle()
+        db.index_frame = db.bundle.index
+        result = []
+        with BatchPrefetcher(batcher, 3, db, 4, depth=2) as prefetcher:
+            for i in range(4):
+                batch = prefetcher.get_batch(i)
+                result.extend(list(batch['df1']['a']))
+        self.assertListEqual(list(range(10)), result)
+
+    def test_prefetching_stops_early(self):
+        batcher = Batcher([PlainExtractor.build('df1').join('df1', 'df1').apply()])
+        db = get_bundle()
+        db.index_frame = db.bundle.index
+        prefetcher = BatchPrefetcher(batcher, 1, db, 10, depth=3)
+        self.assertListEqual([0], list(prefetcher.get_batch(0)['df1']['a']))
+        self.assertEqual(3, len(prefetcher.futures))
+        prefetcher.close()
+        self.assertIsNone(prefetcher.executor)
+        self.assertEqual(0, len(prefetcher.futures))
+
+    def test_loading_required_columns(self):
+        bundle = get_bundle().bundle
+        bundle['df1']['unused'] = bundle['df1']['a']
+        folder = Loc.temp_path.joinpath('tests/dbbundle_projection')
+        if os.path.isdir(folder):
+            shutil.rmtree(folder)
+        os.makedirs(folder)
+        bundle.save(folder, format='feather')
+        bundle1 = DataBundle.load(folder)
+        batcher = Batcher([
+            PlainExtractor.build('df1').join('df1', 'df1').apply(take_columns='a'),
+            ])
+        self.assertDictEqual({'df1': ['a']}, Extractor.merge_required_columns([e.get_required_columns() for e in batcher.extractors]))
+        db = IndexedDataBundle(bundle1.index, bundle1)
+        batcher.load_required_columns(db)
+        reference = bundle1.data_frames['df1']
+        self.assertListEqual(['a'], list(reference._loaded.columns))
+        self.assertNotIsInstance(bundle1.data_frames['df2'], pd.DataFrame)
+        batch = batcher.get_batch(2, db, 1)
+        self.assertListEqual([2, 3], list(batch['df1'].a))
+        self.assertIs(reference, bundle1.data_frames['df1'])
+
+        self.assertListEqual(['a', 'unused'], list(bundle1.load_columns('df1', ['unused']).columns))
+        self.assertListEqual(['a', 'unused'], list(bundle1.df1.columns))
+        self.assertListEqual(list(bundle.df1.unused), list(bundle1.df1.unused))
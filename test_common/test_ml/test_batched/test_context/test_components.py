@@ -46,3 +46,20 @@ class SmallComponentsTestCase(TestCase):
         expected = {'a_at_1': [1.0, 0.0, 0.0], 'a_at_2': [0.0, 1.0, 0.0], 'a_at_3': [0.0, 0.0, 0.0], 'b_at_1': [0.0, 0.0, 0.0], 'b_at_2': [1.0, 0.0, 0.0], 'b_at_3': [1.0, 1.0, 0.0], 'c_at_1': [0.0, 0.0, 1.0], 'c_at_2': [0.0, 0.0, 0.0], 'c_at_3': [0.0, 0.0, 0.0]}
         rs = {c: list(rdf[c]) for c in rdf.columns}
         self.assertDictEqual(expected, rs)
+
+    def test_pivot_aggregator_fitted(self):
+        df = pd.DataFrame(dict(
+            sample_id=[2, 2, 1, 1],
+            offset=[-1, -2, -1, -3],
+            a=[1, 2, 3, 4],
+        )).set_index(['sample_id', 'offset'])
+        agg = PivotAggregator(True)
+        agg.fit(df)
+        rdf = agg.aggregate_context(df.loc[df.index.get_level_values(1) != -3])
+        expected = {
+            'a_at_-3': [0.0, 0.0], 'a_at_-2': [0.0, 2.0], 'a_at_-1': [3.0, 1.0],
+            'offset_is_presenting_at_-3': [0.0, 0.0], 'offset_is_presenting_at_-2': [0.0, 1.0], 'offset_is_presenting_at_-1': [1.0, 1.0]
+        }
+        rs = {c: list(rdf[c]) for c in rdf.columns}
+        self.assertDictEqual(expected, rs)
+        self.assertListEqual([1, 2], list(rdf.index))
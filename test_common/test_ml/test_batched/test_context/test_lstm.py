@@ -2,6 +2,7 @@ from unittest import TestCase
 from tg.common.ml.batched_training.context import lstm_data_transformation
 from tg.common.ml.batched_training.factories import AnnotatedTensor, DfConversion
 import pandas as pd
+import numpy as np
 import torch
 
 
@@ -70,7 +71,16 @@ class LSTMContextTestCase(TestCase):
         self.assertListEqual([101,201], list(q.tensor[0,0,:]))
         self.assertListEqual([0, 0], list(q.tensor[2, 0, :]))
 
-
+    def test_nan_and_unknown_rows(self):
+        tdf = pd.DataFrame([
+            (10, 1, np.nan, 1.0),
+            (10, 4, 2.0, 2.0),
+            (30, 1, 3.0, 3.0),
+        ], columns=['sample_id','context','f1','f2']).set_index(['sample_id','context'])
+        q = lstm_data_transformation(pd.Index([10, 20]), [1, 2], tdf, DfConversion.float)
+        self.assertListEqual([2, 2, 2], list(q.tensor.shape))
+        self.assertListEqual([0, 1], cv(q.tensor[0, 0, :]))
+        self.assertEqual(1, q.tensor.sum().item())
 
     def test_torch_sampling(self):
         t = torch.Tensor([
@@ -96,3 +106,7 @@ class LSTMContextTestCase(TestCase):
         )
         s = at.sample_index(pd.Index(['b2', 'b3'], name='b'))
         self.assertListEqual([2, 2, 4], list(s.tensor.shape))
+        self.assertListEqual([[121, 122, 123, 124], [131, 132, 133, 134]], s.tensor[0].tolist())
+        self.assertListEqual([2, 1], list(at.get_positions(pd.Index(['c3', 'c2'], name='c'))))
+        s = at.sample_positions('c', np.array([2, 1]))
+        self.assertListEqual([213, 212], s.tensor[1, 0].tolist())
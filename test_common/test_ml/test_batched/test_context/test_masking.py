@@ -0,0 +1,83 @@
+from unittest import TestCase
+import pandas as pd
+import torch
+
+from tg.common.ml.batched_training import context as btc
+from tg.common.ml.batched_training.context.alon_attention import AlonAttention
+from tg.common.ml.batched_training.context.self_attention import AttentionReccurentNetwork
+from tg.common.ml.batched_training.factories import AnnotatedTensor
+from tg.common.ml.batched_training.context.network_factories import get_context_mask
+from tg.common.ml.batched_training import DataBundle, IndexedDataBundle
+
+
+def get_input():
+    torch.manual_seed(0)
+    input = torch.rand(4, 3, 5)
+    mask = torch.tensor([
+        [False, True, True],
+        [True, True, False],
+        [True, True, False],
+        [False, True, True],
+    ])
+    return input, mask
+
+
+def change_padding(input, mask):
+    return torch.where(mask.unsqueeze(-1), input, torch.rand(*input.shape))
+
+
+class MaskingTestCase(TestCase):
+    def check_padding_is_ignored(self, network):
+        input, mask = get_input()
+        with torch.no_grad():
+            result = network(input, mask)
+            other_result = network(change_padding(input, mask), mask)
+            unmasked_result = network(input)
+        self.assertTrue(torch.allclose(result, other_result, atol=1e-6))
+        self.assertFalse(torch.allclose(result, unmasked_result, atol=1e-6))
+        self.assertTrue(torch.allclose(result[1], unmasked_result[1], atol=1e-6))
+
+    def test_lstm(self):
+        input, mask = get_input()
+        network = btc.LSTMNetwork(5, 2)
+        self.check_padding_is_ignored(network)
+        with torch.no_grad():
+            result = network(input, mask)
+            expected = network(input[[1, 2], 0:1, :])
+        self.assertTrue(torch.allclose(expected[0], result[0], atol=1e-6))
+
+    def test_alon_attention(self):
+        input, _ = get_input()
+        self.check_padding_is_ignored(AlonAttention(input, 6))
+
+    def test_alon_attention_sigmoid(self):
+        input, _ = get_input()
+        self.check_padding_is_ignored(AlonAttention(input, 6, sigmoid=True))
+
+    def test_attention_reccurent_network(self):
+        input, _ = get_input()
+        self.check_padding_is_ignored(AttentionReccurentNetwork(input, 2))
+
+    def test_annotated_tensor_sampling(self):
+        input, mask = get_input()
+        at = AnnotatedTensor(input, ['context', 'sample_id', 'features'], [[1, 2, 3, 4], [10, 20, 30], list('abcde')], mask)
+        sampled = at.sample_positions('sample_id', [2, 0])
+        self.assertListEqual(mask[:, [2, 0]].tolist(), sampled.mask.tolist())
+
+    def test_context_mask_of_two_units(self):
+        input, mask = get_input()
+        other_mask = mask.clone()
+        other_mask[0, 0] = True
+        other_mask[1, 2] = False
+        other_mask[2, 2] = True
+        dims = ['context', 'sample_id', 'features']
+        indices = [[1, 2, 3, 4], [10, 20, 30], list('abcde')]
+        bundle = DataBundle(
+            index=pd.DataFrame(dict(a=[10, 20, 30])),
+            first=AnnotatedTensor(input, dims, indices, mask),
+            second=AnnotatedTensor(input, dims, indices, other_mask)
+        )
+        ibundle = IndexedDataBundle(bundle.index, bundle)
+        self.assertListEqual((mask | other_mask).tolist(), get_context_mask(ibundle, ['first', 'second']).tolist())
+        self.assertListEqual(mask.tolist(), get_context_mask(ibundle, ['first']).tolist())
+        self.assertIsNone(get_context_mask(ibundle, ['index']))
@@ -0,0 +1,69 @@
+from unittest import TestCase
+import numpy as np
+import pandas as pd
+
+from tg.common import DataBundle
+from tg.common.ml.batched_training import IndexedDataBundle
+from tg.common.ml.batched_training.sandbox import PlainContextBuilder
+
+
+def get_bundle():
+    rows = []
+    word_id = 0
+    for sentence_id, length in enumerate([1, 3, 7, 12]):
+        for _ in range(length):
+            rows.append(dict(sentence_id=sentence_id, word_id=word_id))
+            word_id += 1
+    src = pd.DataFrame(rows)
+    src.index = list(src.word_id + 1000)
+    src.index.name = 'sample_id'
+    return DataBundle(src=src)
+
+
+def build_context_with_loops(src, index_frame, left_size, right_size, include_zero_offset):
+    limits = src.groupby('sentence_id').word_id.aggregate(['min', 'max'])
+    rows = []
+    for sample_id, row in index_frame.iterrows():
+        begin, end = limits.loc[row.sentence_id]
+        if include_zero_offset:
+            rows.append((sample_id, 0, row.word_id))
+        for offset in range(1, left_size + 1):
+            if row.word_id - offset >= begin:
+                rows.append((sample_id, -offset, row.word_id - offset))
+        for offset in range(1, right_size + 1):
+            if row.word_id + offset <= end:
+                rows.append((sample_id, offset, row.word_id + offset))
+    return pd.DataFrame(rows, columns=['sample_id', 'offset', 'another_word_id']).set_index(['sample_id', 'offset'])
+
+
+class PlainContextBuilderTestCase(TestCase):
+    def check(self, builder, context_size, left_size, right_size):
+        db = get_bundle()
+        index_frame = db.src.sample(frac=1, random_state=1)
+        builder.fit(IndexedDataBundle(db.src, db))
+        ibundle = IndexedDataBundle(index_frame, db)
+        expected = build_context_with_loops(db.src, index_frame, left_size, right_size, builder.include_zero_offset)
+        actual = builder.build_context(ibundle, context_size)
+        self.assertListEqual(['sample_id', 'offset'], list(actual.index.names))
+        self.assertListEqual(
+            sorted(zip(expected.index, expected.another_word_id)),
+            sorted(zip(actual.index, actual.another_word_id))
+        )
+
+    def test_left(self):
+        self.check(PlainContextBuilder(), 4, 4, 0)
+
+    def test_both_with_zero(self):
+        self.check(PlainContextBuilder(include_zero_offset=True, left_to_right_contexts_proportion=0.5), 7, 3, 3)
+
+    def test_right(self):
+        self.check(PlainContextBuilder(left_to_right_contexts_proportion=1), 5, 0, 5)
+
+    def test_new_bundle(self):
+        builder = PlainContextBuilder()
+        db = get_bundle()
+        builder.fit(IndexedDataBundle(db.src, db))
+        src = db.src.assign(sentence_id=0)
+        other = DataBundle(src=src)
+        result = builder.build_context(IndexedDataBundle(src.iloc[[5]], other), 10)
+        self.assertListEqual([4, 3, 2, 1, 0], list(result.another_word_id))
@@ -0,0 +1,54 @@
+from unittest import TestCase
+import time
+import torch
+
+from tg.common.ml.batched_training.context.self_attention import SelfAttention
+
+
+def self_attention_with_loop(network: SelfAttention, input: torch.Tensor) -> torch.Tensor:
+    context_size, batch_size, n_features = input.shape
+    Q, K, V = network.query(input), network.key(input), network.value(input)
+    output = torch.Tensor(*input.shape)
+    for i in range(batch_size):
+        output[:, i, :] = torch.softmax((Q[:, i, :] @ K[:, i, :].T) / n_features ** 0.5, dim=1) @ V[:, i, :]
+    return output
+
+
+def measure(method, repetitions=3):
+    begin = time.perf_counter()
+    for _ in range(repetitions):
+        method()
+    return (time.perf_counter() - begin) / repetitions
+
+
+class SelfAttentionTestCase(TestCase):
+    def test_equals_loop(self):
+        torch.manual_seed(0)
+        input = torch.rand(5, 7, 4)
+        network = SelfAttention(4)
+        with torch.no_grad():
+            self.assertTrue(torch.allclose(self_attention_with_loop(network, input), network(input), atol=1e-6))
+
+    def test_mask(self):
+        torch.manual_seed(0)
+        input = torch.rand(5, 2, 4)
+        mask = torch.ones(5, 2, dtype=torch.bool)
+        mask[3:, 0] = False
+        network = SelfAttention(4)
+        with torch.no_grad():
+            result = network(input, mask)
+            expected = self_attention_with_loop(network, input[:3, 0:1, :])
+        self.assertTrue(torch.allclose(expected[:, 0, :], result[:3, 0, :], atol=1e-6))
+        self.assertEqual(0, result[3:, 0, :].abs().sum().item())
+        self.assertTrue(torch.allclose(self_attention_with_loop(network, input)[:, 1, :], result[:, 1, :], atol=1e-6))
+
+
+if __name__ == '__main__':
+    # Timing comparison of the batched self-attention with the loop, run manually as a script
+    torch.manual_seed(0)
+    benchmark_input = torch.rand(10, 2000, 32)
+    benchmark_network = SelfAttention(32)
+    with torch.no_grad():
+        loop_time = measure(lambda: self_attention_with_loop(benchmark_network, benchmark_input))
+        batched_time = measure(lambda: benchmark_network(benchmark_input))
+    print(f'Loop: {loop_time:.4f}s, batched: {batched_time:.4f}s')
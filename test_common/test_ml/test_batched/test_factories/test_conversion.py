@@ -26,4 +26,25 @@ class DfConversionTestCase(TestCase):
 
     def test_auto_on_int_only(self):
         t = DfConversion.auto(df[['int_1', 'int_2']])
-        self.assertEqual(torch.int32, t.dtype)
\ No newline at end of file
+        self.assertEqual(torch.int32, t.dtype)
+
+    def test_sparse(self):
+        sdf = df.astype(pd.SparseDtype(float, 0))
+        t = DfConversion.sparse(sdf)
+        self.assertTrue(t.is_sparse)
+        self.assertEqual(torch.float, t.dtype)
+        self.assertListEqual(df.values.astype('float32').tolist(), t.to_dense().tolist())
+
+    def test_float_copies_by_default(self):
+        fdf = df[['float_1', 'float_2']].astype('float32')
+        t = DfConversion.float(fdf)
+        self.assertEqual(torch.float, t.dtype)
+        t[0, 0] = 5
+        self.assertAlmostEqual(1.1, fdf.iloc[0, 0], places=5)
+
+    def test_float_is_zero_copy_on_float32(self):
+        fdf = df[['float_1', 'float_2']].astype('float32')
+        t = DfConversion.float(fdf, copy=False)
+        self.assertEqual(torch.float, t.dtype)
+        fdf.iloc[0, 0] = 5
+        self.assertEqual(5, t[0, 0].item())
@@ -144,3 +144,53 @@ class PlainExtractorTestCase(TestCase):
         frame = pd.DataFrame(dict(A=[1, 2]))
         result = extractor.extract(IndexedDataBundle(frame, DataBundle()))
         self.assertListEqual([1, 2], list(result.A))
+
+    def test_non_unique_join(self):
+        frame = pd.DataFrame(dict(A=[100, 100, 200], Q=[1, 2, 3])).set_index('A')
+        extractor = PlainExtractor.build('test').index().join('q', 'A').apply()
+        self.assertRaises(
+            ValueError,
+            lambda: extractor.extract(IndexedDataBundle(ind_small, DataBundle(index=INDEX, q=frame)))
+        )
+
+    def test_missing_rows_in_second_join(self):
+        self.run_test(
+            PlainExtractor.build('test').index().join('a', 'A').join('x', 'X').apply(raise_if_rows_are_missing=False, raise_if_nulls_detected=False),
+            ind_full,
+            ['Y'],
+            Y=['A', 'B', 'A', 'NONE']
+        )
+
+    def test_take_columns_from_wide_frame(self):
+        frame = pd.DataFrame(dict(
+            A=[2, 1, 3],
+            X=pd.Series([10, 20, 30], dtype='Int64'),
+            Y=['x', 'y', 'z'],
+            W=[0.5, 1.5, 2.5]
+        )).set_index('A')
+        index = pd.DataFrame(dict(A=[1, 2, 4]))
+        extractor = PlainExtractor.build('test').index().join('wide', 'A').apply(
+            take_columns=['Y', 'X'],
+            raise_if_rows_are_missing=False,
+            raise_if_nulls_detected=False
+        )
+        df = extractor.extract(IndexedDataBundle(index, DataBundle(index=index, wide=frame)))
+        self.assertListEqual(['Y', 'X'], list(df.columns))
+        self.assertListEqual([0, 1, 2], list(df.index))
+        self.assertListEqual(['y', 'x'], list(df.Y.iloc[:2]))
+        self.assertTrue(pd.isnull(df.Y.iloc[2]))
+        self.assertEqual('Int64', str(df.X.dtype))
+        self.assertListEqual([20, 10], list(df.X.iloc[:2]))
+
+    def test_compile_transformer(self):
+        df = pd.DataFrame(dict(A=[1, 2, 3, 4], X=[1.0, None, 3.0, 4.0], Y=['a', 'b', 'a', 'c']))
+        ibundle = IndexedDataBundle(df, DataBundle(index=df))
+        factory = dft.DataFrameTransformerFactory.default_factory()
+        plain = PlainExtractor.build('test').index().apply(take_columns=['X', 'Y'], transformer=factory)
+        compiled = PlainExtractor.build('test').index().apply(take_columns=['X', 'Y'], transformer=factory, compile_transformer=True)
+        expected = plain.fit_extract(ibundle)
+        actual = compiled.fit_extract(ibundle)
+        self.assertIsNotNone(compiled.compiled_transformer_)
+        self.assertListEqual(list(expected.columns), list(actual.columns))
+        self.assertTrue((actual.dtypes == 'float32').all())
+        self.assertTrue(np.allclose(expected.astype(float).values, actual.values, atol=1e-6))
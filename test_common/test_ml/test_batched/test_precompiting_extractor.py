@@ -1,6 +1,9 @@
 from unittest import TestCase
 from tg.common.ml.batched_training import PrecomputingExtractor, DataBundle, PlainExtractor, IndexedDataBundle
 from yo_fluq_ds import *
+from tg.common import Loc
+import os
+import shutil
 
 
 class PrecomputingExtractorTestCase(TestCase):
@@ -54,3 +57,85 @@ class PrecomputingExtractorTestCase(TestCase):
         self.assertEqual(3, dfs[0].shape[0])
         self.assertEqual(2, dfs[1].shape[0])
         self.assertListEqual([60, 80], list(dfs[1].b))
+
+    def test_cache_folder(self):
+        folder = Loc.temp_path / 'tests/precomputing_extractor_cache'
+        shutil.rmtree(folder, ignore_errors=True)
+        df = Query.en(range(10)).select(lambda z: dict(a=z, b=10 * z, c=100 * z)).to_dataframe()
+        bundle = DataBundle(index=df)
+        inner_extractor = PlainExtractor.build('t').index().apply(take_columns=['a', 'b'])
+        caching_extractor = PrecomputingExtractor('test', inner_extractor, cache_folder=folder)
+        caching_extractor.fit(IndexedDataBundle(bundle.index.iloc[:6], bundle))
+        self.assertListEqual(list(range(6)), list(bundle.test.index))
+        self.assertEqual(1, len(os.listdir(folder)))
+
+        computed = []
+        original_precompute = caching_extractor._precompute_frame
+        caching_extractor._precompute_frame = lambda ibundle, index=None: computed.append(list(index)) or original_precompute(ibundle, index)
+        ibundle = IndexedDataBundle(bundle.index.iloc[4:], bundle)
+        caching_extractor.preprocess_bundle(ibundle)
+        self.assertListEqual([[6, 7, 8, 9]], computed)
+        self.assertListEqual(list(range(4, 10)), list(bundle.test.index))
+        self.assertListEqual([40, 50, 60, 70, 80, 90], list(bundle.test.b))
+
+        caching_extractor.preprocess_bundle(IndexedDataBundle(bundle.index, bundle))
+        self.assertListEqual([[6, 7, 8, 9]], computed)
+        self.assertListEqual(list(range(10)), list(bundle.test.index))
+
+        other_bundle = DataBundle(index=df, other=df.assign(b=df.b + 1))
+        caching_extractor.preprocess_bundle(IndexedDataBundle(other_bundle.index, other_bundle))
+        self.assertListEqual([[6, 7, 8, 9]], computed)
+        self.assertEqual(1, len(os.listdir(folder)))
+        shutil.rmtree(folder, ignore_errors=True)
+
+    def test_cache_folder_fingerprint(self):
+        folder = Loc.temp_path / 'tests/precomputing_extractor_cache_fingerprint'
+        shutil.rmtree(folder, ignore_errors=True)
+        index = pd.DataFrame(dict(k=[0, 1, 2, 0, 1, 2]))
+        lookup = pd.DataFrame(dict(k=[0, 1, 2], v=[10, 20, 30], unused=[1, 2, 3])).set_index('k')
+        inner_extractor = PlainExtractor.build('t').index().join('lookup', 'k').apply(take_columns='v')
+        caching_extractor = PrecomputingExtractor('test', inner_extractor, cache_folder=folder)
+        bundle = DataBundle(index=index, lookup=lookup)
+        caching_extractor.fit(IndexedDataBundle(index.iloc[:4], bundle))
+
+        computed = []
+        original_precompute = caching_extractor._precompute_frame
+        caching_extractor._precompute_frame = lambda ibundle, index=None: computed.append(list(index)) or original_precompute(ibundle, index)
+
+        bundle = DataBundle(index=index, lookup=lookup.assign(unused=lookup.unused + 1))
+        caching_extractor.preprocess_bundle(IndexedDataBundle(index, bundle))
+        self.assertListEqual([[4, 5]], computed)
+        self.assertListEqual([10, 20, 30, 10, 20, 30], list(bundle.test.v))
+        self.assertEqual(1, len(os.listdir(folder)))
+
+        bundle = DataBundle(index=index, lookup=lookup.assign(v=lookup.v + 1))
+        caching_extractor.preprocess_bundle(IndexedDataBundle(index, bundle))
+        self.assertListEqual([[4, 5], list(range(6))], computed)
+        self.assertListEqual([11, 21, 31, 11, 21, 31], list(bundle.test.v))
+        self.assertEqual(1, len(os.listdir(folder)))
+        shutil.rmtree(folder, ignore_errors=True)
+
+    def test_parallel(self):
+        df = Query.en(range(10)).select(lambda z: dict(a=z, b=10 * z, c=str(z))).to_dataframe()
+        bundle = DataBundle(index=df)
+        for columns in [['a', 'b'], ['a', 'c']]:
+            inner_extractor = PlainExtractor.build('t').index().apply(take_columns=columns)
+            caching_extractor = PrecomputingExtractor('test', inner_extractor, index_size_for_precomputing=3, precomputing_workers=2)
+            caching_extractor.fit(IndexedDataBundle(bundle.index, bundle))
+            self.assertListEqual(list(range(10)), list(bundle.test.index))
+            self.assertListEqual(columns, list(bundle.test.columns))
+            self.assertListEqual(list(range(10)), list(bundle.test.a))
+            self.assertListEqual(list(df[columns[1]]), list(bundle.test[columns[1]]))
+
+    def test_extension_dtypes(self):
+        df = Query.en(range(10)).select(lambda z: dict(a=str(z % 3), b=z)).to_dataframe()
+        df['a'] = df.a.astype('category')
+        df['b'] = df.b.astype('Int64')
+        bundle = DataBundle(index=df)
+        for column in ['a', 'b']:
+            for workers in [None, 2]:
+                inner_extractor = PlainExtractor.build('t').index().apply(take_columns=[column])
+                caching_extractor = PrecomputingExtractor('test', inner_extractor, index_size_for_precomputing=4, precomputing_workers=workers)
+                caching_extractor.fit(IndexedDataBundle(bundle.index, bundle))
+                self.assertListEqual(list(df[column]), list(bundle.test[column]))
+                self.assertEqual(df[column].dtype, bundle.test[column].dtype)
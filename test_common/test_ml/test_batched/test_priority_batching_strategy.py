@@ -48,3 +48,37 @@ class PRBSTestCase(TestCase):
         x = self.make_evening_result(5)
         self.assertLess(0.06, x.loc[1])
         self.assertLess(x.loc[3], x.loc[1])
+
+    def test_epoch_is_drawn_once(self):
+        df = pd.DataFrame(dict(prio=[1, 2, 3, 4]), index=[10, 11, 12, 13])
+        db = IndexedDataBundle(df, None)
+        strategy = PriorityRandomSampler('prio', 10, random_state=1, deduplicate=False)
+        first = strategy.get_batch_index_frame(4, db, 0)
+        positions = strategy._epoch_positions
+        self.assertEqual((10, 4), positions.shape)
+        strategy.get_batch_index_frame(4, db, 5)
+        self.assertIs(positions, strategy._epoch_positions)
+        strategy.get_batch_index_frame(4, IndexedDataBundle(df.copy(), None), 5)
+        self.assertIsNot(positions, strategy._epoch_positions)
+
+        other = PriorityRandomSampler('prio', 10, random_state=1, deduplicate=False)
+        self.assertListEqual(list(first.index), list(other.get_batch_index_frame(4, db, 0).index))
+
+    def test_without_replacement(self):
+        df = pd.DataFrame(dict(prio=[1, 2, 0, 4, 5]), index=[10, 11, 12, 13, 14])
+        db = IndexedDataBundle(df, None)
+        strategy = PriorityRandomSampler('prio', 1.6, random_state=1, deduplicate=False, replace=False)
+        batches = [strategy.get_batch_index_frame(2, db, i) for i in range(strategy.get_batch_count(2, db))]
+        indices = [i for b in batches for i in b.index]
+        self.assertEqual(8, len(indices))
+        self.assertSetEqual({10, 11, 13, 14}, set(indices[:4]))
+        self.assertSetEqual({10, 11, 13, 14}, set(indices[4:]))
+
+    def test_stratified(self):
+        df = pd.DataFrame(dict(group=['a'] * 90 + ['b'] * 10))
+        db = IndexedDataBundle(df, None)
+        strategy = PriorityRandomSampler(None, 1, random_state=1, deduplicate=False, stratify_column='group')
+        for i in range(strategy.get_batch_count(20, db)):
+            batch = strategy.get_batch_index_frame(20, db, i)
+            self.assertEqual(18, (batch.group == 'a').sum())
+            self.assertEqual(2, (batch.group == 'b').sum())
@@ -67,3 +67,19 @@ class DatetimeTransformerTestCase(TestCase):
 
 
 
+
+    def test_partial_fit(self):
+        df = pd.DataFrame(dict(
+            a=[datetime(2022, 3, 1) + timedelta(days=i * 7) for i in range(6)],
+            b=[datetime(2022, 1, 1) + timedelta(days=i * 3) if i % 2 == 0 else None for i in range(6)]
+        ))
+        full = DatetimeTransformer(['a', 'b'])
+        full.fit(df)
+        partial = DatetimeTransformer(['a', 'b'])
+        partial.partial_fit(df.iloc[:3])
+        partial.partial_fit(df.iloc[3:])
+        self.assertEqual(full.reference_column, partial.reference_column)
+        expected = full.transform(df)[0]
+        actual = partial.transform(df)[0]
+        self.assertListEqual(list(expected.columns), list(actual.columns))
+        self.assertTrue(((expected - actual).abs() < 1e-6).all().all())
@@ -1,6 +1,7 @@
 from tg.common.ml.dft import CategoricalTransformer2
 from unittest import TestCase
 import pandas as pd
+import numpy as np
 from yo_fluq_ds import *
 
 
@@ -126,3 +127,56 @@ class CategoricalTransformer2TestCase(TestCase):
         df = self.fit_train(['s'], 4, pd.DataFrame(dict(s=['1', '2', None])))
         self.assertListEqual(['s_1', 's_2', 's_3', 's_OTHER', 'cmp_val'], list(df.columns))
         self.assertListEqual(['s_1', 's_2', 's_OTHER'], list(df.cmp_val))
+
+    def test_output_formats(self):
+        columns = ['a', 'c', 'n', 'missing']
+        dense = CategoricalTransformer2(columns, 4)
+        dense.fit(A)
+        expected = dense.transform(A)[0]
+
+        uint8 = CategoricalTransformer2(columns, 4, dtype=np.uint8)
+        uint8.fit(A)
+        df = uint8.transform(A)[0]
+        self.assertTrue((df.dtypes == np.uint8).all())
+        self.assertTrue((df.values == expected.values).all())
+
+        sparse = CategoricalTransformer2(columns, 4, output='sparse')
+        sparse.fit(A)
+        df = sparse.transform(A)[0]
+        self.assertListEqual(list(expected.columns), list(df.columns))
+        self.assertTrue((df.sparse.to_dense().values == expected.values).all())
+
+        codes = CategoricalTransformer2(columns, 4, output='codes', dtype=np.int8)
+        codes.fit(A)
+        df = codes.transform(A)[0]
+        self.assertListEqual(['a', 'c', 'n'], list(df.columns))
+        self.assertListEqual([0, 1, 2, 0, 1, 0] * 2, list(df.a))
+        self.assertListEqual([0, 0, 0, 2, 3, 3, 1, 1, 3, 3, 3, 3], list(df.c))
+
+        codes = CategoricalTransformer2(columns, 4, output='codes')
+        codes.fit(A)
+        df = codes.transform(A)[0]
+        self.assertTrue((df.dtypes == np.int64).all())
+        self.assertListEqual([0, 1, 2, 0, 1, 0] * 2, list(df.a))
+
+    def test_transform_into(self):
+        tr = CategoricalTransformer2(['a', 'n'], 4)
+        tr.fit(A)
+        expected = tr.transform(A)[0]
+        buffer = np.full(expected.shape, 7, dtype=np.float32)
+        result = tr.transform_into(A, buffer)
+        self.assertIs(buffer, result)
+        self.assertTrue((buffer == expected.values).all())
+        self.assertRaises(ValueError, lambda: tr.transform_into(A, np.zeros((3, 3))))
+
+    def test_partial_fit(self):
+        for columns, max_values in [(['a', 'b'], 5), (['c'], 4), (['n'], 4), (['nn'], 2)]:
+            full = CategoricalTransformer2(columns, max_values)
+            full.fit(A)
+            partial = CategoricalTransformer2(columns, max_values)
+            for start in range(0, 12, 5):
+                partial.partial_fit(A.iloc[start:start + 5])
+            expected = full.transform(A)[0]
+            actual = partial.transform(A)[0]
+            self.assertListEqual(list(expected.columns), list(actual.columns))
+            self.assertTrue((expected.values == actual.values).all())
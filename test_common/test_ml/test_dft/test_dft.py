@@ -1,10 +1,11 @@
 from unittest import TestCase
 from tg.common.ml.dft import *
 import pandas as pd
+import numpy as np
 from sklearn.pipeline import make_pipeline
 from sklearn.linear_model import LinearRegression
 from yo_fluq_ds import Query
-from sklearn.preprocessing import MinMaxScaler
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
 from tg.common._common import Logger
 from tg.common._common.logger.log_buffer import LogBuffer
 
@@ -179,6 +180,25 @@ class EasyDftTest(TestCase):
         self.assertListEqual([0, 0, 1], list(r.y_y))
         self.assertEqual(0, buffer.parse().count())
 
+    def test_sparse_output(self):
+        df = pd.DataFrame(dict(x=['a', 'b', 'c'], y=['x', 'x', 'y'], z=[1.0, None, 3.0]))
+        tr = DataFrameTransformer([
+            CategoricalTransformer(['x'], postprocessor=OneHotEncoderForDataframe(sparse=True)),
+            CategoricalTransformer(['y'], postprocessor=OneHotEncoderForDataframe()),
+            ContinousTransformer(['z'], scaler=None),
+        ], sparse_output=True)
+        r = tr.fit_transform(df)
+        self.assertListEqual(['x_a', 'x_b', 'x_c', 'y_x', 'y_y', 'z', 'z_missing'], list(r.columns))
+        self.assertTrue(all(isinstance(dtype, pd.SparseDtype) for dtype in r.dtypes))
+        r = r.sparse.to_dense()
+        self.assertListEqual([1, 0, 0], list(r.x_a))
+        self.assertListEqual([1, 1, 0], list(r.y_x))
+        self.assertListEqual([1, 2, 3], list(r.z))
+        self.assertListEqual([0, 1, 0], list(r.z_missing))
+
+        tr = DataFrameTransformer([CategoricalTransformer(['x'])], sparse_output=True)
+        self.assertRaises(ValueError, lambda: tr.fit_transform(df))
+
     def test_top_k_strategy(self):
         df = pd.DataFrame(dict(x=['a', 'b', 'c', 'a', 'b']))
         tr = DataFrameTransformer([
@@ -194,3 +214,55 @@ class EasyDftTest(TestCase):
             CategoricalTransformer(['x'], replacement_strategy=TopKPopularStrategy(3, 'OTHER'), postprocessor=OneHotEncoderForDataframe())
         ])
         self.assertRaises(ValueError, lambda: tr.fit_transform(df))
+
+    def test_compile(self):
+        df = pd.DataFrame(dict(
+            a=[1.0, 2.0, None, 4.0, 5.0],
+            b=[0.5, None, 0.1, 0.2, 0.3],
+            c=['x', 'y', 'x', None, 'z'],
+            d=[1, 2, 3, 4, 5],
+            e=pd.to_datetime(['2020-01-01', '2020-02-01', '2020-03-01', '2020-04-01', '2020-05-01'])
+        ))
+        tr = DataFrameTransformerFactory.default_factory(max_values_per_category=3, enable_datetime=True).fit(df).transformer_
+        tr.transformers.append(ContinousTransformer(['a', 'b'], scaler=MinMaxScaler(), missing_indicator=None))
+        tr.transformers[-1].fit(df)
+        tr.transformers.append(CategoricalTransformer(['d'], postprocessor=OneHotEncoderForDataframe()))
+        tr.transformers[-1].fit(df)
+        compiled = tr.compile()
+        test_df = pd.DataFrame(dict(a=[None, 3.0], b=[0.2, None], c=['z', 'w'], d=[1, 2], e=df.e.iloc[:2]))
+        expected = tr.transform(test_df)
+        actual = compiled.transform(test_df)
+        self.assertListEqual(list(expected.columns), list(actual.columns))
+        self.assertTrue((actual.dtypes == 'float32').all())
+        self.assertTrue(np.allclose(expected.astype(float).values, actual.values, atol=1e-6))
+
+        buffer = np.zeros(actual.shape, dtype=np.float32)
+        self.assertIs(buffer, compiled.transform_to_array(test_df, buffer))
+        self.assertTrue(np.allclose(actual.values, buffer))
+
+        compiled = tr.compile(df)
+        self.assertListEqual(list(expected.columns), compiled.get_output_columns())
+        self.assertTrue(np.allclose(expected.astype(float).values, compiled.transform(test_df).values, atol=1e-6))
+
+    def test_partial_fit(self):
+        df = pd.DataFrame(dict(
+            a=[1.0, 2.0, None, 4.0, 5.0, 7.0, 3.0, None, 1.0],
+            b=[0.5, 0.4, 0.1, 0.2, 0.3, 0.9, 0.5, 0.3, 0.2],
+            c=[None, None, None, 1.0, 2.0, 3.0, 1.0, 1.0, 0.0],
+        ))
+        for scaler in [StandardScaler(), MinMaxScaler()]:
+            full = ContinousTransformer(['a', 'b', 'c'], scaler=scaler)
+            full.fit(df)
+            partial = ContinousTransformer(['a', 'b', 'c'], scaler=scaler)
+            for start in range(0, 9, 3):
+                partial.partial_fit(df.iloc[start:start + 3])
+            expected = pd.concat(list(full.transform(df)), axis=1)
+            actual = pd.concat(list(partial.transform(df)), axis=1)
+            self.assertListEqual(list(expected.columns), list(actual.columns))
+            self.assertTrue(np.allclose(expected.astype(float).values, actual.astype(float).values))
+
+        partial = ContinousTransformer(['a', 'c'])
+        partial.partial_fit(df.iloc[:3])
+        self.assertListEqual(['a'], partial.columns_)
+        partial.partial_fit(df.iloc[3:])
+        self.assertListEqual(['a', 'c'], partial.columns_)
@@ -49,3 +49,20 @@ class TransformerFactoryTestCase(TestCase):
 
         self.assertEqual(1, len(tr1.transformers[0].scaler.scale_))
         self.assertEqual(2, len(tr2.transformers[0].scaler.scale_))
+
+    def test_dtype(self):
+        df = pd.DataFrame(dict(
+            a=[1.0, None, 3.0],
+            b=['x', 'y', 'x'],
+            c=pd.to_datetime(['2020-01-01', '2020-02-01', None])
+        ))
+        tr = DataFrameTransformerFactory.default_factory(enable_datetime=True, dtype=np.float32).fit(df)
+        result = tr.transform(df)
+        self.assertTrue((result.dtypes == np.float32).all())
+        self.assertListEqual(['a', 'a_missing', 'b_x', 'b_y'], list(result.columns[:4]))
+        result = DataFrameTransformerFactory.default_factory().fit(df).transform(df)
+        self.assertEqual(np.float64, result.a.dtype)
+
+        factory = DataFrameTransformerFactory().on_continuous(ContinousTransformer).on_categorical_2(25).with_dtype(np.float32)
+        result = factory.fit(df).transform(df)
+        self.assertTrue((result.dtypes == np.float32).all())
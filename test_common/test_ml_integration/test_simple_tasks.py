@@ -3,7 +3,9 @@ from tg.common.ml.batched_training import sandbox as bts
 from tg.common.ml.batched_training import factories as btf
 from tg.common.ml import batched_training as bt
 from tg.common.ml.batched_training import InMemoryTrainingEnvironment
+from tg.common.ml.training_core import Artificier
 from sklearn.metrics import roc_auc_score
+import pickle
 
 def get_bundle_and_task():
     bundle = bts.get_binary_classification_bundle()
@@ -19,6 +21,14 @@ def get_bundle_and_task():
     return bundle, task
 
 
+class TestSplitsArtificier(Artificier):
+    def __init__(self):
+        self.test_split_sizes = []
+
+    def run_before_metrics(self, args):
+        self.test_split_sizes.append(len(args.result.test_splits['test']))
+
+
 class PytorchTestCase(TestCase):
     def test_binary_classification(self):
         bundle, task = get_bundle_and_task()
@@ -68,3 +78,40 @@ class PytorchTestCase(TestCase):
         print(env.result['metrics']['roc_auc_score_test'])
         # for s in env.message_buffer:
         #    print(s)
+
+    def test_prefetching(self):
+        bundle, task = get_bundle_and_task()
+        task.settings.batch_size = 100
+        task.settings.prefetch_batches = 2
+        env = InMemoryTrainingEnvironment()
+        task.run_with_environment(bundle, env)
+        self.assertGreater(env.result['metrics']['roc_auc_score_test'], 0.7)
+
+    def test_parallel_evaluation(self):
+        bundle, task = get_bundle_and_task()
+        task.settings.batch_size = 100
+        task.settings.epoch_count = 5
+        task.settings.evaluation_workers = 2
+        task.settings.evaluation_period = 2
+        task.settings.evaluation_sample_size = 50
+        artificier = TestSplitsArtificier()
+        task.artificiers.append(artificier)
+        env = InMemoryTrainingEnvironment()
+        task.run_with_environment(bundle, env)
+        self.assertListEqual([50] * 5, artificier.test_split_sizes)
+        evaluated = ['roc_auc_score_test' in metrics for metrics in task.history]
+        self.assertListEqual([False, True, False, True, True], evaluated)
+        self.assertEqual(50, (env.result['output']['result_df'].stage == 'test').sum())
+        self.assertGreater(env.result['metrics']['roc_auc_score_test'], 0.7)
+
+    def test_settings_pickled_before_new_fields(self):
+        settings = bt.TrainingSettings()
+        for field in ['prefetch_batches', 'evaluation_workers', 'evaluation_period', 'evaluation_sample_size', 'fitting_batch_count']:
+            del settings.__dict__[field]
+        settings = pickle.loads(pickle.dumps(settings))
+        bundle, task = get_bundle_and_task()
+        settings.epoch_count = 2
+        task.settings = settings
+        env = InMemoryTrainingEnvironment()
+        task.run_with_environment(bundle, env)
+        self.assertEqual(2, len(task.history))